@@ -1,3 +1,11 @@
+import bisect
+import hashlib
+import importlib.util
+import io
+import os
+import re
+import sys
+
 import ply.lex as lex
 
 tokens = [
@@ -54,246 +62,50 @@ t_RBRACKET = r'\]'
 t_RANGE = r'\.\.'
 t_DOT = r'\.'
 
-def t_PROGRAM(t):
-    r'\b(?i)program\b'
-    t.type = 'PROGRAM'
-    t.value = t.value.lower()
-    return t
-
-def t_VAR(t):
-    r'\b(?i)var\b'
-    t.type = 'VAR'
-    t.value = t.value.lower()
-    return t
-
-def t_BEGIN(t):
-    r'\b(?i)begin\b'
-    t.type = 'BEGIN'
-    t.value = t.value.lower()
-    return t
-
-def t_END(t):
-    r'\b(?i)end\b'
-    t.type = 'END'
-    t.value = t.value.lower()
-    return t
-
-def t_IF(t):
-    r'\b(?i)if\b'
-    t.type = 'IF'
-    t.value = t.value.lower()
-    return t
-
-def t_THEN(t):
-    r'\b(?i)then\b'
-    t.type = 'THEN'
-    t.value = t.value.lower()
-    return t
-
-def t_ELSE(t):
-    r'\b(?i)else\b'
-    t.type = 'ELSE'
-    t.value = t.value.lower()
-    return t
-
-def t_WHILE(t):
-    r'\b(?i)while\b'
-    t.type = 'WHILE'
-    t.value = t.value.lower()
-    return t
-
-def t_DO(t):
-    r'\b(?i)do\b'
-    t.type = 'DO'
-    t.value = t.value.lower()
-    return t
-
-def t_FOR(t):
-    r'\b(?i)for\b'
-    t.type = 'FOR'
-    t.value = t.value.lower()
-    return t
-
-def t_TO(t):
-    r'\b(?i)to\b'
-    t.type = 'TO'
-    t.value = t.value.lower()
-    return t
-
-def t_DOWNTO(t):
-    r'\b(?i)downto\b'
-    t.type = 'DOWNTO'
-    t.value = t.value.lower()
-    return t
-
-def t_OF(t):
-    r'\b(?i)of\b'
-    t.type = 'OF'
-    t.value = t.value.lower()
-    return t
-
-def t_ARRAY(t):
-    r'\b(?i)array\b'
-    t.type = 'ARRAY'
-    t.value = t.value.lower()
-    return t
-
-def t_FUNCTION(t):
-    r'\b(?i)function\b'
-    t.type = 'FUNCTION'
-    t.value = t.value.lower()
-    return t
-
-def t_PROCEDURE(t):
-    r'\b(?i)procedure\b'
-    t.type = 'PROCEDURE'
-    t.value = t.value.lower()
-    return t
-
-def t_CONST(t):
-    r'\b(?i)const\b'
-    t.type = 'CONST'
-    t.value = t.value.lower()
-    return t
-
-def t_TYPE(t):
-    r'\b(?i)type\b'
-    t.type = 'TYPE'
-    t.value = t.value.lower()
-    return t
-
-def t_RECORD(t):
-    r'\b(?i)record\b'
-    t.type = 'RECORD'
-    t.value = t.value.lower()
-    return t
-
-def t_SET(t):
-    r'\b(?i)set\b'
-    t.type = 'SET'
-    t.value = t.value.lower()
-    return t
-
-def t_FILE(t):
-    r'\b(?i)file\b'
-    t.type = 'FILE'
-    t.value = t.value.lower()
-    return t
-
-def t_STRING(t):
-    r'\b(?i)string\b'
-    t.type = 'STRING'
-    t.value = t.value.lower()
-    return t
-
-def t_INTEGER(t):
-    r'\b(?i)integer\b'
-    t.type = 'INTEGER'
-    t.value = t.value.lower()
-    return t
-
-def t_CHAR(t):
-    r'\b(?i)char\b'
-    t.type = 'CHAR'
-    t.value = t.value.lower()
-    return t
-
-def t_REAL(t):
-    r'\b(?i)real\b'
-    t.type = 'REAL'
-    t.value = t.value.lower()
-    return t
-
-def t_BOOLEAN(t):
-    r'\b(?i)boolean\b'
-    t.type = 'BOOLEAN'
-    t.value = t.value.lower()
-    return t
-
-def t_AND(t):
-    r'\b(?i)and\b'
-    t.type = 'AND'
-    t.value = t.value.lower()
-    return t
-
-def t_OR(t):
-    r'\b(?i)or\b'
-    t.type = 'OR'
-    t.value = t.value.lower()
-    return t
-
-def t_NOT(t):
-    r'\b(?i)not\b'
-    t.type = 'NOT'
-    t.value = t.value.lower()
-    return t
-
-def t_DIV(t):
-    r'\b(?i)div\b'
-    t.type = 'DIV'
-    t.value = t.value.lower()
-    return t
-
-def t_MOD(t):
-    r'\b(?i)mod\b'
-    t.type = 'MOD'
-    t.value = t.value.lower()
-    return t
-
-def t_TRUE(t):
-    r'\b(?i)true\b'
-    t.type = 'TRUE'
-    t.value = t.value.lower()
-    return t
-
-def t_FALSE(t):
-    r'\b(?i)false\b'
-    t.type = 'FALSE'
-    t.value = t.value.lower()
-    return t
-
-def t_WRITELN(t):
-    r'\b(?i)writeln\b'
-    t.type = 'WRITELN'
-    t.value = t.value.lower()
-    return t
-
-def t_READLN(t):
-    r'\b(?i)readln\b'
-    t.type = 'READLN'
-    t.value = t.value.lower()
-    return t
-
-def t_BREAK(t):
-    r'\b(?i)break\b'
-    t.type = 'BREAK'
-    t.value = t.value.lower()
-    return t
-
-def t_EXIT(t):
-    r'\b(?i)exit\b'
-    t.type = 'EXIT'
-    t.value = t.value.lower()
-    return t
-
-def t_CONTINUE(t):
-    r'\b(?i)continue\b'
-    t.type = 'CONTINUE'
-    t.value = t.value.lower()
-    return t
-
-def t_FORWARD(t):
-    r'\b(?i)forward\b'
-    t.type = 'FORWARD'
-    t.value = t.value.lower()
-    return t
-
-def t_RETURN(t):
-    r'\b(?i)return\b'
-    t.type = 'RETURN'
-    t.value = t.value.lower()
-    return t
-
+# Palavras reservadas: o t_ID reconhece o identificador uma única vez e esta tabela
+# reclassifica-o, em vez de testar uma expressão regular por palavra reservada
+reserved = {
+    'program': 'PROGRAM',
+    'var': 'VAR',
+    'begin': 'BEGIN',
+    'end': 'END',
+    'if': 'IF',
+    'then': 'THEN',
+    'else': 'ELSE',
+    'while': 'WHILE',
+    'do': 'DO',
+    'for': 'FOR',
+    'to': 'TO',
+    'downto': 'DOWNTO',
+    'of': 'OF',
+    'array': 'ARRAY',
+    'function': 'FUNCTION',
+    'procedure': 'PROCEDURE',
+    'const': 'CONST',
+    'type': 'TYPE',
+    'record': 'RECORD',
+    'set': 'SET',
+    'file': 'FILE',
+    'string': 'STRING',
+    'integer': 'INTEGER',
+    'char': 'CHAR',
+    'real': 'REAL',
+    'boolean': 'BOOLEAN',
+    'and': 'AND',
+    'or': 'OR',
+    'not': 'NOT',
+    'div': 'DIV',
+    'mod': 'MOD',
+    'true': 'TRUE',
+    'false': 'FALSE',
+    'writeln': 'WRITELN',
+    'readln': 'READLN',
+    'break': 'BREAK',
+    'exit': 'EXIT',
+    'continue': 'CONTINUE',
+    'forward': 'FORWARD',
+    'return': 'RETURN',
+}
 
 def t_CHAR_CONST(t):
     r'\#\d+'
@@ -322,8 +134,9 @@ def t_STRING_CONST(t):
 
 def t_ID(t):
     r'[a-zA-Z][a-zA-Z0-9_]*'
-    t.type =  'ID'
-    t.value = t.value.lower()
+    # Interning: cada ocorrência de um identificador partilha a mesma string na AST
+    t.value = sys.intern(t.value.lower())
+    t.type = reserved.get(t.value, 'ID')
     return t
 
 t_ignore = ' \t'
@@ -337,16 +150,169 @@ def find_column(input, token):
     line_start = input.rfind('\n', 0, token.lexpos) + 1
     return (token.lexpos - line_start) + 1
 
+def token_column(token):
+    # Usa a tabela de inícios de linha quando o token vem do lexer por blocos
+    lexer_origem = token.lexer
+    tabela = getattr(lexer_origem, 'tabela_linhas', None)
+    if tabela is not None:
+        return tabela.coluna(getattr(lexer_origem, 'base_offset', 0) + token.lexpos)
+    return find_column(lexer_origem.lexdata, token)
+
 def t_comment(t):
     r'\{[^}]*\}|\(\*.*?\*\)|//.*'
     pass
 
 
 def t_error(t):
-    col = find_column(lexer.lexdata, t)
+    col = token_column(t)
     print(f"Erro léxico na linha {t.lineno}, coluna {col}: Caractere inválido '{t.value[0]}'")
     t.lexer.skip(1)
 
-lexer = lex.lex()
+# Modo de desenvolvimento: valida as regras a cada arranque e escreve parser.out/parsetab.py
+DEBUG = os.environ.get('PASCALC_DEBUG') == '1'
+
+# Diretório local do pacote onde ficam as tabelas pré-geradas do lexer e do parser
+DIRETORIO_TABELAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tabelas')
+
+
+def hash_tabelas(*partes):
+    """Hash que versiona as tabelas geradas: muda sempre que as regras que as originam mudam."""
+    return hashlib.sha256('\x00'.join(partes).encode('utf-8')).hexdigest()[:16]
+
 
+def build_lexer(debug=DEBUG):
+    """
+    Constrói o lexer. Em produção carrega a tabela pré-gerada correspondente às regras atuais
+    (ou gera-a na primeira execução), evitando a validação das regras a cada arranque.
+    """
+    modulo = sys.modules[__name__]
+    if debug:
+        return lex.lex(module=modulo)
+
+    regras = [f"{nome}={valor.__doc__ if callable(valor) else valor}"
+              for nome, valor in sorted(vars(modulo).items()) if nome.startswith('t_')]
+    nome_tabela = 'lextab_' + hash_tabelas(lex.__tabversion__, repr(tokens), *regras)
+    caminho = os.path.join(DIRETORIO_TABELAS, nome_tabela + '.py')
 
+    if os.path.exists(caminho):
+        spec = importlib.util.spec_from_file_location(nome_tabela, caminho)
+        tabela = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(tabela)
+        return lex.lex(module=modulo, optimize=True, lextab=tabela)
+
+    os.makedirs(DIRETORIO_TABELAS, exist_ok=True)
+    return lex.lex(module=modulo, optimize=True, lextab=nome_tabela, outputdir=DIRETORIO_TABELAS)
+
+
+lexer = build_lexer()
+
+
+class TabelaLinhas:
+    """Offsets absolutos do início de cada linha, para calcular colunas em O(log n)."""
+
+    def __init__(self):
+        self.inicios = [0]
+
+    def adicionar_texto(self, texto, base):
+        """Regista as linhas de um bloco de texto que começa no offset absoluto base."""
+        inicio = texto.find('\n')
+        while inicio != -1:
+            self.inicios.append(base + inicio + 1)
+            inicio = texto.find('\n', inicio + 1)
+
+    def coluna(self, posicao):
+        linha = bisect.bisect_right(self.inicios, posicao) - 1
+        return posicao - self.inicios[linha] + 1
+
+
+# Tamanho (em caracteres) de cada bloco lido pelo lexer por blocos
+TAMANHO_BLOCO = 1 << 20
+
+# Comentários e strings completos, ou a abertura de um que ainda não terminou no bloco (grupo 1)
+_segmentos_multilinha = re.compile(r"'(?:[^']|'')*'|\{[^}]*\}|\(\*.*?\*\)|//[^\n]*|(\{|\(\*|')", re.S)
+
+
+def _ponto_de_corte(texto):
+    """
+    Devolve o offset até onde o texto pode ser analisado sem partir um token:
+    o fim da última linha completa que não esteja dentro de um comentário ou string.
+    """
+    # Só contam as mudanças de linha entre os segmentos (comentários e strings) completos
+    corte = 0
+    inicio = 0
+    for m in _segmentos_multilinha.finditer(texto):
+        corte = texto.rfind('\n', inicio, m.start()) + 1 or corte
+        if m.group(1) is not None:
+            return corte
+        inicio = m.end()
+    return texto.rfind('\n', inicio) + 1 or corte
+
+
+class StreamingLexer:
+    """
+    Lexer que lê a fonte por blocos a partir de um ficheiro e entrega os tokens ao parser
+    à medida que são pedidos, sem manter o texto completo em memória.
+    Os tokens devolvidos têm lexpos absoluto na fonte.
+    """
+
+    def __init__(self, ficheiro, tamanho_bloco=TAMANHO_BLOCO, base=None):
+        self.tamanho_bloco = tamanho_bloco
+        self.lexer = (base or lexer).clone()
+        self._reiniciar(ficheiro)
+
+    def _reiniciar(self, ficheiro):
+        self.ficheiro = ficheiro
+        self.tabela_linhas = TabelaLinhas()
+        self.lexer.lineno = 1
+        self.lexer.tabela_linhas = self.tabela_linhas
+        self.lexer.base_offset = 0
+        self.lexer.input('')
+
+        self.pendente = ''  # Texto lido mas ainda não entregue ao lexer
+        self.posicao = 0  # Offset absoluto do início de self.pendente
+        self.fim = False
+
+    @property
+    def lineno(self):
+        return self.lexer.lineno
+
+    def input(self, data):
+        """Permite usar o lexer por blocos também sobre uma string já em memória."""
+        self._reiniciar(io.StringIO(data))
+
+    def token(self):
+        while True:
+            tok = self.lexer.token()
+            if tok is not None:
+                tok.lexpos += self.lexer.base_offset
+                tok.lexer = self
+                return tok
+            if not self._carregar_bloco():
+                return None
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+    def _carregar_bloco(self):
+        """Lê blocos até ter uma porção completa para analisar. Devolve False no fim da fonte."""
+        texto = self.pendente
+        while True:
+            bloco = '' if self.fim else self.ficheiro.read(self.tamanho_bloco)
+            if not bloco:
+                self.fim = True
+            texto += bloco
+            corte = len(texto) if self.fim else _ponto_de_corte(texto)
+            if corte > 0 or self.fim:
+                break
+
+        if corte == 0:
+            self.pendente = ''
+            return False
+
+        porcao = texto[:corte]
+        self.pendente = texto[corte:]
+        self.tabela_linhas.adicionar_texto(porcao, self.posicao)
+        self.lexer.base_offset = self.posicao
+        self.posicao += corte
+        self.lexer.input(porcao)
+        return True
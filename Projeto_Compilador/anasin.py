@@ -1,5 +1,9 @@
+import os
+import sys
+
 import ply.yacc as yacc
-from analex import tokens, lexer
+from analex import tokens, lexer, token_column, StreamingLexer, TAMANHO_BLOCO, DEBUG, DIRETORIO_TABELAS, hash_tabelas
+from ast_nodes import *
 
 # Precedencia e associatividade dos operadores
 precedence = (
@@ -17,14 +21,33 @@ precedence = (
 )
 
 
+def at(node, p, *indices):
+    """
+    Guarda no nó a posição na fonte do primeiro dos símbolos indicados que a tenha
+    (um token ou um nó já posicionado) e devolve o nó.
+    """
+    for n in indices or (1,):
+        value = p[n]
+        if isinstance(value, Node):
+            if value.lineno:
+                node.lineno = value.lineno
+                node.lexpos = value.lexpos
+                break
+        elif p.lineno(n):
+            node.lineno = p.lineno(n)
+            node.lexpos = p.lexpos(n)
+            break
+    return node
+
+
 def p_program(p):
     '''program : PROGRAM ID SEMICOLON block DOT'''
-    p[0] = ('program', p[2], p[4])
+    p[0] = at(Program(p[2], p[4]), p, 1)
 
 
 def p_block(p):
     '''block : optional_declarations compound_statement'''
-    p[0] = ('block', p[1], p[2])
+    p[0] = at(Block(p[1], p[2]), p, 1, 2)
 
 
 def p_optional_declarations(p):
@@ -37,9 +60,19 @@ def p_declarations(p):
     '''declarations : declaration_section
                    | declarations declaration_section'''
     if len(p) == 2:
-        p[0] = ('declarations', [p[1]])
+        p[0] = at(Declarations([p[1]]), p, 1)
     else:
-        p[0] = ('declarations', p[1][1] + [p[2]])
+        p[1].sections.append(p[2])
+        p[0] = p[1]
+
+
+section_classes = {
+    'var': VarSection,
+    'const': ConstSection,
+    'type': TypeSection,
+    'function': FunctionSection,
+    'procedure': ProcedureSection,
+}
 
 
 def p_declaration_section(p):
@@ -48,7 +81,7 @@ def p_declaration_section(p):
                           | TYPE type_declaration_list SEMICOLON
                           | FUNCTION function_declaration SEMICOLON
                           | PROCEDURE procedure_declaration SEMICOLON'''
-    p[0] = (p[1].lower() + '_declarations', p[2])
+    p[0] = at(section_classes[p[1]](p[2]), p, 1)
 
 
 def p_var_declaration_list(p):
@@ -57,7 +90,8 @@ def p_var_declaration_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_const_declaration_list(p):
@@ -66,7 +100,8 @@ def p_const_declaration_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_type_declaration_list(p):
@@ -75,25 +110,26 @@ def p_type_declaration_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_function_declaration(p):
     '''function_declaration : ID parameters COLON type SEMICOLON block
                            | ID parameters COLON type SEMICOLON FORWARD SEMICOLON'''
-    if p[6] == 'forward':
-        p[0] = ('function_forward', p[1], p[2], p[4])
+    if len(p) == 8:
+        p[0] = at(FunctionForward(p[1], p[2], p[4]), p, 1)
     else:
-        p[0] = ('function', p[1], p[2], p[4], p[6])
+        p[0] = at(Function(p[1], p[2], p[4], p[6]), p, 1)
 
 
 def p_procedure_declaration(p):
     '''procedure_declaration : ID parameters SEMICOLON block
                             | ID parameters SEMICOLON FORWARD SEMICOLON'''
-    if len(p) == 5:
-        p[0] = ('procedure_forward', p[1], p[2])
+    if len(p) == 6:
+        p[0] = at(ProcedureForward(p[1], p[2]), p, 1)
     else:
-        p[0] = ('procedure', p[1], p[2], p[4])
+        p[0] = at(Procedure(p[1], p[2], p[4]), p, 1)
 
 
 def p_parameters(p):
@@ -108,31 +144,32 @@ def p_parameter_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_parameter(p):
     '''parameter : ID_list COLON type
                  | VAR ID_list COLON type'''
     if len(p) == 4:
-        p[0] = ('val_param', p[1], p[3])
+        p[0] = at(ValParam(p[1], p[3]), p, 2)
     else:
-        p[0] = ('var_param', p[2], p[4])
+        p[0] = at(VarParam(p[2], p[4]), p, 1)
 
 
 def p_var_declaration(p):
     '''var_declaration : ID_list COLON type'''
-    p[0] = ('var_declaration', p[1], p[3])
+    p[0] = at(VarDeclaration(p[1], p[3]), p, 2)
 
 
 def p_const_declaration(p):
     '''const_declaration : ID EQUAL expression'''
-    p[0] = ('const_declaration', p[1], p[3])
+    p[0] = at(ConstDeclaration(p[1], p[3]), p, 1)
 
 
 def p_type_declaration(p):
     '''type_declaration : ID EQUAL type'''
-    p[0] = ('type_declaration', p[1], p[3])
+    p[0] = at(TypeDeclaration(p[1], p[3]), p, 1)
 
 
 def p_ID_list(p):
@@ -141,7 +178,8 @@ def p_ID_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_type(p):
@@ -152,19 +190,44 @@ def p_type(p):
             | STRING
             | SET OF type
             | FILE OF type
-            | ARRAY LBRACKET INTEGER_CONST RANGE INTEGER_CONST RBRACKET OF type
+            | ARRAY LBRACKET index_ranges RBRACKET OF type
             | RECORD field_list END
             | ID'''
     if len(p) == 2:
         p[0] = p[1]
     elif p[1] == 'array':
-        p[0] = ('array', (p[3], p[5]), p[8])
+        # array[a..b, c..d] of T é array[a..b] of array[c..d] of T
+        element_type = p[6]
+        for bounds in reversed(p[3]):
+            element_type = at(ArrayType(bounds, element_type), p, 1)
+        p[0] = element_type
     elif p[1] == 'set':
-        p[0] = ('set', p[3])
+        p[0] = at(SetType(p[3]), p, 1)
     elif p[1] == 'file':
-        p[0] = ('file', p[3])
+        p[0] = at(FileType(p[3]), p, 1)
+    else:
+        p[0] = at(RecordType(p[2]), p, 1)
+
+
+def p_index_ranges(p):
+    '''index_ranges : index_range
+                    | index_ranges COMMA index_range'''
+    if len(p) == 2:
+        p[0] = [p[1]]
     else:
-        p[0] = ('record', p[2])
+        p[1].append(p[3])
+        p[0] = p[1]
+
+
+def p_index_range(p):
+    '''index_range : bound RANGE bound'''
+    p[0] = (p[1], p[3])
+
+
+def p_bound(p):
+    '''bound : INTEGER_CONST
+             | SUB INTEGER_CONST'''
+    p[0] = p[1] if len(p) == 2 else -p[2]
 
 
 def p_field_list(p):
@@ -173,12 +236,13 @@ def p_field_list(p):
     if len(p) == 3:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 
 def p_compound_statement(p):
     '''compound_statement : BEGIN statement_list END'''
-    p[0] = ('compound_statement', p[2])
+    p[0] = at(CompoundStatement(p[2]), p, 1)
 
 
 def p_statement_list(p):
@@ -187,7 +251,8 @@ def p_statement_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_statement(p):
@@ -196,6 +261,13 @@ def p_statement(p):
     p[0] = p[1]
 
 
+control_statements = {
+    'break': Break,
+    'continue': Continue,
+    'exit': Exit,
+}
+
+
 def p_non_if_statement(p):
     '''non_if_statement : assignment_statement
                        | while_statement
@@ -209,61 +281,63 @@ def p_non_if_statement(p):
                        | EXIT
                        | RETURN expression
                        | empty'''
-    if len(p) == 2:
-        p[0] = p[1]
+    if len(p) == 3:
+        p[0] = at(Return(p[2]), p, 1)
+    elif p[1] in control_statements:
+        p[0] = at(control_statements[p[1]](), p, 1)
     else:
-        p[0] = ('return', p[2])
+        p[0] = p[1]
 
 
 def p_if_statement(p):
     '''if_statement : IF expression THEN statement %prec THEN
                    | IF expression THEN statement ELSE statement'''
     if len(p) == 5:
-        p[0] = ('if', p[2], p[4])
+        p[0] = at(If(p[2], p[4]), p, 1)
     else:
-        p[0] = ('if-else', p[2], p[4], p[6])
+        p[0] = at(IfElse(p[2], p[4], p[6]), p, 1)
 
 
 def p_assignment_statement(p):
     '''assignment_statement : variable ASSIGN expression'''
-    p[0] = ('assign', p[1], p[3])
+    p[0] = at(Assign(p[1], p[3]), p, 1, 2)
 
 
 def p_while_statement(p):
     '''while_statement : WHILE expression DO statement'''
-    p[0] = ('while', p[2], p[4])
+    p[0] = at(While(p[2], p[4]), p, 1)
 
 
 def p_for_statement(p):
     '''for_statement : FOR ID ASSIGN expression TO expression DO statement
                     | FOR ID ASSIGN expression DOWNTO expression DO statement'''
-    p[0] = ('for', p[2], p[4], p[5], p[6], p[8])
+    p[0] = at(For(p[2], p[4], p[5], p[6], p[8]), p, 1)
 
 
 def p_writeln_statement(p):
     '''writeln_statement : WRITELN LPAREN expression_list RPAREN
                         | WRITELN LPAREN RPAREN'''
     if len(p) == 5:
-        p[0] = ('writeln', p[3])
+        p[0] = at(Writeln(p[3]), p, 1)
     else:
-        p[0] = ('writeln', [])
+        p[0] = at(Writeln([]), p, 1)
 
 
 def p_readln_statement(p):
     '''readln_statement : READLN LPAREN variable_list RPAREN
                        | READLN LPAREN RPAREN'''
     if len(p) == 5:
-        p[0] = ('readln', p[3])
+        p[0] = at(Readln(p[3]), p, 1)
     else:
-        p[0] = ('readln', [])
+        p[0] = at(Readln([]), p, 1)
 
 def p_function_call_statement(p):
     '''function_call_statement : ID LPAREN argument_list RPAREN
                               | ID LPAREN RPAREN'''
     if len(p) == 5:
-        p[0] = ('function_call', p[1], p[3])
+        p[0] = at(FunctionCall(p[1], p[3]), p, 1)
     else:
-        p[0] = ('function_call', p[1], [])
+        p[0] = at(FunctionCall(p[1], []), p, 1)
 
 
 def p_expression_list(p):
@@ -272,7 +346,8 @@ def p_expression_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_variable_list(p):
@@ -281,25 +356,33 @@ def p_variable_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_variable(p):
     '''variable : ID
-               | ID LBRACKET expression RBRACKET
+               | variable LBRACKET argument_list RBRACKET
+               | variable DOT ID
                | AT ID
                | ID LPAREN argument_list RPAREN
                | ID LPAREN RPAREN'''
     if len(p) == 2:
-        p[0] = ('var', p[1])
+        p[0] = at(Var(p[1]), p, 1)
     elif p[1] == '@':
-        p[0] = ('pointer', p[2])
+        p[0] = at(Pointer(p[2]), p, 1)
     elif p[2] == '[':
-        p[0] = ('array_access', p[1], p[3])
+        # a[i, j] é a[i][j]; o acesso direto a uma variável guarda só o nome (ver symbols.resolve)
+        array = p[1].name if type(p[1]) is Var else p[1]
+        for index in p[3]:
+            array = at(ArrayAccess(array, index), p, 1)
+        p[0] = array
+    elif p[2] == '.':
+        p[0] = at(FieldAccess(p[1], p[3]), p, 1)
     elif len(p) == 4:
-        p[0] = ('function_call', p[1], [])
+        p[0] = at(FunctionCall(p[1], []), p, 1)
     else:
-        p[0] = ('function_call', p[1], p[3])
+        p[0] = at(FunctionCall(p[1], p[3]), p, 1)
 
 
 def p_argument_list(p):
@@ -308,7 +391,8 @@ def p_argument_list(p):
     if len(p) == 2:
         p[0] = [p[1]] if p[1] is not None else []
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_expression(p):
@@ -317,7 +401,7 @@ def p_expression(p):
     if len(p) == 2:
         p[0] = p[1]
     else:
-        p[0] = ('binary_op', p[2], p[1], p[3])
+        p[0] = at(BinaryOp(p[2], p[1], p[3]), p, 1, 3)
 
 
 def p_simple_expression(p):
@@ -328,9 +412,9 @@ def p_simple_expression(p):
     if len(p) == 2:
         p[0] = p[1]
     elif len(p) == 3:
-        p[0] = ('unary_op', p[1], p[2])
+        p[0] = at(UnaryOp(p[1], p[2]), p, 1)
     else:
-        p[0] = ('binary_op', p[2], p[1], p[3])
+        p[0] = at(BinaryOp(p[2], p[1], p[3]), p, 1, 3)
 
 
 def p_term(p):
@@ -340,7 +424,7 @@ def p_term(p):
     if len(p) == 2:
         p[0] = p[1]
     else:
-        p[0] = ('binary_op', p[2], p[1], p[3])
+        p[0] = at(BinaryOp(p[2], p[1], p[3]), p, 1, 3)
 
 
 def p_factor(p):
@@ -355,11 +439,13 @@ def p_factor(p):
              | FALSE
              | NOT factor'''
     if len(p) == 2:
-        p[0] = p[1]
+        # TRUE e FALSE passam a bool, para não se confundirem com os literais string 'true'/'false'
+        token = p.slice[1].type
+        p[0] = token == 'TRUE' if token in ('TRUE', 'FALSE') else p[1]
     elif p[1] == '(':
         p[0] = p[2]
     else:
-        p[0] = ('unary_op', p[1], p[2])
+        p[0] = at(UnaryOp(p[1], p[2]), p, 1)
 
 
 def p_relational_operator(p):
@@ -396,18 +482,44 @@ def p_empty(p):
 def p_error(p):
     if p:
         print(
-            f"Erro sintático na linha {p.lineno}, coluna {find_column(lexer.lexdata, p)}: Token inesperado: '{p.value}'")
+            f"Erro sintático na linha {p.lineno}, coluna {token_column(p)}: Token inesperado: '{p.value}'")
     else:
         print("Erro sintático no final do arquivo")
 
 
-def find_column(input, token):
-    line_start = input.rfind('\n', 0, token.lexpos) + 1
-    return (token.lexpos - line_start) + 1
+def build_parser(debug=DEBUG):
+    """
+    Constrói o parser. Em modo de desenvolvimento valida a gramática e escreve parser.out e
+    parsetab.py em DIRETORIO_TABELAS (fora do controlo de versões). Em produção carrega a tabela LALR pré-gerada cujo nome
+    inclui o hash da gramática (gerando-a só se ainda não existir), sem qualquer saída de depuração.
+    """
+    modulo = sys.modules[__name__]
+    if debug:
+        os.makedirs(DIRETORIO_TABELAS, exist_ok=True)
+        return yacc.yacc(module=modulo, debug=True, write_tables=True, outputdir=DIRETORIO_TABELAS)
+
+    regras = [f"{nome}={valor.__doc__}" for nome, valor in sorted(vars(modulo).items())
+              if nome.startswith('p_') and callable(valor)]
+    gramatica = hash_tabelas(yacc.__tabversion__, repr(tokens), repr(precedence), *regras)
+    os.makedirs(DIRETORIO_TABELAS, exist_ok=True)
+    return yacc.yacc(module=modulo, debug=False, optimize=True,
+                     picklefile=os.path.join(DIRETORIO_TABELAS, f'parsetab_{gramatica}.pickle'))
 
 
-parser = yacc.yacc(debug=True, write_tables=True, outputdir='.')
+parser = build_parser()
 
 # Função para analisar o código
 def parse_code(code):
+    lexer.lineno = 1
     return parser.parse(code, lexer=lexer)
+
+
+# Função para analisar um ficheiro, lido por blocos em vez de carregado de uma só vez
+def parse_file(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    with open(caminho, encoding='utf-8') as ficheiro:
+        return parser.parse(lexer=StreamingLexer(ficheiro, tamanho_bloco))
+
+
+if __name__ == '__main__':
+    # Gera antecipadamente as tabelas usadas em produção (por exemplo, no build)
+    print(f"Tabelas de parsing em {DIRETORIO_TABELAS}")
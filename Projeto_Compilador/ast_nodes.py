@@ -0,0 +1,329 @@
+class Node:
+    """
+    Nó base da AST. Cada subclasse declara os seus campos em _fields e usa __slots__,
+    pelo que os nós não têm __dict__. Para compatibilidade com a antiga AST em tuplos,
+    node[0] devolve o tipo do nó (kind) e node[1:] os campos, pela ordem de _fields.
+    """
+    __slots__ = ('lineno', 'lexpos')
+    kind = None
+    _fields = ()
+    _annotations = ()  # Slots preenchidos pelos passos de análise (começam a None)
+
+    def __init__(self, *values):
+        for name, value in zip(self._fields, values):
+            setattr(self, name, value)
+        for name in self._annotations:
+            setattr(self, name, None)
+        self.lineno = 0
+        self.lexpos = 0
+
+    def __getitem__(self, index):
+        if index == 0:
+            return self.kind
+        if type(index) is int and index > 0:
+            return getattr(self, self._fields[index - 1])
+        return tuple(self)[index]
+
+    def __len__(self):
+        return len(self._fields) + 1
+
+    def __iter__(self):
+        yield self.kind
+        for name in self._fields:
+            yield getattr(self, name)
+
+    def __repr__(self):
+        # As posições não entram na representação: é usada como chave na cache de build
+        return f"{type(self).__name__}({', '.join(repr(getattr(self, name)) for name in self._fields)})"
+
+
+# Programa e declarações
+
+class Program(Node):
+    kind = 'program'
+    _fields = ('name', 'block')
+    __slots__ = _fields
+
+
+class Block(Node):
+    kind = 'block'
+    _fields = ('declarations', 'body')
+    __slots__ = _fields
+
+
+class Declarations(Node):
+    kind = 'declarations'
+    _fields = ('sections',)
+    __slots__ = _fields
+
+
+class VarSection(Node):
+    kind = 'var_declarations'
+    _fields = ('declarations',)
+    __slots__ = _fields
+
+
+class ConstSection(Node):
+    kind = 'const_declarations'
+    _fields = ('declarations',)
+    __slots__ = _fields
+
+
+class TypeSection(Node):
+    kind = 'type_declarations'
+    _fields = ('declarations',)
+    __slots__ = _fields
+
+
+class FunctionSection(Node):
+    kind = 'function_declarations'
+    _fields = ('routine',)
+    __slots__ = _fields
+
+
+class ProcedureSection(Node):
+    kind = 'procedure_declarations'
+    _fields = ('routine',)
+    __slots__ = _fields
+
+
+class VarDeclaration(Node):
+    kind = 'var_declaration'
+    _fields = ('names', 'type')
+    __slots__ = _fields
+
+
+class ConstDeclaration(Node):
+    kind = 'const_declaration'
+    _fields = ('name', 'value')
+    __slots__ = _fields
+
+
+class TypeDeclaration(Node):
+    kind = 'type_declaration'
+    _fields = ('name', 'type')
+    __slots__ = _fields
+
+
+class Function(Node):
+    kind = 'function'
+    _fields = ('name', 'params', 'return_type', 'block')
+    __slots__ = _fields
+
+
+class FunctionForward(Node):
+    kind = 'function_forward'
+    _fields = ('name', 'params', 'return_type')
+    __slots__ = _fields
+
+
+class Procedure(Node):
+    kind = 'procedure'
+    _fields = ('name', 'params', 'block')
+    __slots__ = _fields
+
+
+class ProcedureForward(Node):
+    kind = 'procedure_forward'
+    _fields = ('name', 'params')
+    __slots__ = _fields
+
+
+class ValParam(Node):
+    kind = 'val_param'
+    _fields = ('names', 'type')
+    __slots__ = _fields
+
+
+class VarParam(Node):
+    kind = 'var_param'
+    _fields = ('names', 'type')
+    __slots__ = _fields
+
+
+# Tipos compostos (os tipos simples continuam a ser strings: 'integer', 'real', ...)
+
+class ArrayType(Node):
+    kind = 'array'
+    _fields = ('bounds', 'element_type')
+    __slots__ = _fields
+
+
+class SetType(Node):
+    kind = 'set'
+    _fields = ('element_type',)
+    __slots__ = _fields
+
+
+class FileType(Node):
+    kind = 'file'
+    _fields = ('element_type',)
+    __slots__ = _fields
+
+
+class RecordType(Node):
+    kind = 'record'
+    _fields = ('fields',)
+    __slots__ = _fields
+
+
+# Comandos
+
+class CompoundStatement(Node):
+    kind = 'compound_statement'
+    _fields = ('statements',)
+    __slots__ = _fields
+
+
+class If(Node):
+    kind = 'if'
+    _fields = ('condition', 'then_part')
+    __slots__ = _fields
+
+
+class IfElse(Node):
+    kind = 'if-else'
+    _fields = ('condition', 'then_part', 'else_part')
+    __slots__ = _fields
+
+
+class Assign(Node):
+    kind = 'assign'
+    _fields = ('target', 'expr')
+    __slots__ = _fields
+
+
+class While(Node):
+    kind = 'while'
+    _fields = ('condition', 'body')
+    __slots__ = _fields
+
+
+class For(Node):
+    kind = 'for'
+    _fields = ('var', 'start', 'direction', 'end', 'body')
+    _annotations = ('symbol',)  # Symbol da variável de controlo (symbols.resolve)
+    __slots__ = _fields + _annotations
+
+
+class Writeln(Node):
+    kind = 'writeln'
+    _fields = ('args',)
+    __slots__ = _fields
+
+
+class Readln(Node):
+    kind = 'readln'
+    _fields = ('targets',)
+    __slots__ = _fields
+
+
+class Return(Node):
+    kind = 'return'
+    _fields = ('expr',)
+    __slots__ = _fields
+
+
+class Break(Node):
+    kind = 'break'
+    __slots__ = ()
+
+
+class Continue(Node):
+    kind = 'continue'
+    __slots__ = ()
+
+
+class Exit(Node):
+    kind = 'exit'
+    __slots__ = ()
+
+
+# Expressões (os literais continuam a ser valores Python: int, float, bool e str)
+
+class Expression(Node):
+    """Expressão: type é o tipo Pascal inferido pelo typecheck.TypeChecker."""
+    _annotations = ('type',)
+    __slots__ = _annotations
+
+
+class FunctionCall(Expression):
+    kind = 'function_call'
+    _fields = ('name', 'args')
+    _annotations = ('type', 'builtin')  # builtin: se é uma função predefinida (intrinsics.BUILTINS)
+    __slots__ = _fields + ('builtin',)
+
+
+class Var(Expression):
+    kind = 'var'
+    _fields = ('name',)
+    _annotations = ('type', 'symbol')  # symbol: Symbol atribuído por symbols.resolve
+    __slots__ = _fields + ('symbol',)
+
+
+class Pointer(Expression):
+    kind = 'pointer'
+    _fields = ('name',)
+    __slots__ = _fields
+
+
+class ArrayAccess(Expression):
+    kind = 'array_access'
+    _fields = ('name', 'index')  # name: nome do array, ou a expressão que o dá (a[i][j], r.campo[i])
+    _annotations = ('type', 'symbol')
+    __slots__ = _fields + ('symbol',)
+
+
+class FieldAccess(Expression):
+    kind = 'field_access'
+    _fields = ('record', 'field')
+    __slots__ = _fields
+
+
+class BinaryOp(Expression):
+    kind = 'binary_op'
+    _fields = ('op', 'left', 'right')
+    __slots__ = _fields
+
+
+class UnaryOp(Expression):
+    kind = 'unary_op'
+    _fields = ('op', 'operand')
+    __slots__ = _fields
+
+
+# Percursos da AST
+
+class NodeTransformer:
+    """
+    Percorre a AST e substitui nós. visit(node) chama visit_<Classe>(node) se existir, ou
+    generic_visit(node), que visita os campos (incluindo listas) e guarda o que cada visita
+    devolver. Os nós são alterados no próprio lugar.
+    """
+    _methods = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._methods = {}  # Tipo do nó -> método que o visita (None para os literais)
+
+    def visit(self, node):
+        kind = type(node)
+        try:
+            method = self._methods[kind]
+        except KeyError:
+            method = getattr(type(self), 'visit_' + kind.__name__, None)
+            if method is None and issubclass(kind, Node):
+                method = type(self).generic_visit
+            self._methods[kind] = method
+        if method is None:
+            return node
+        return method(self, node)
+
+    def generic_visit(self, node):
+        for name in node._fields:
+            value = getattr(node, name)
+            if isinstance(value, Node):
+                setattr(node, name, self.visit(value))
+            elif isinstance(value, list):
+                value[:] = [self.visit(item) for item in value]
+        return node
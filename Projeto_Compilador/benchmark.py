@@ -0,0 +1,623 @@
+import argparse
+import inspect
+import os
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+
+import ply.lex as lex
+
+import analex
+
+
+def gerar_programa(n_linhas):
+    """Gera um programa Pascal sintaticamente válido com aproximadamente n_linhas linhas."""
+    n_vars = 50
+    linhas = ['program Gerado;', 'var']
+    linhas.append('  ' + ', '.join(f'v{i}' for i in range(n_vars)) + ': integer;')
+    linhas.append('begin')
+
+    modelos = [
+        "  v{a} := v{b} + 12 * v{c};",
+        "  if v{a} > 10 then v{b} := v{b} - 1 else v{c} := v{c} + 2;",
+        "  while v{a} < 100 do v{a} := v{a} + 1;",
+        "  for v{a} := 1 to 10 do v{b} := v{b} + v{a};",
+        "  writeln('linha ', v{a});",
+        "  v{a} := (v{b} div 3) mod 7; {{ comentário }}",
+    ]
+    corpo = max(n_linhas - len(linhas) - 2, 1)
+    for i in range(corpo):
+        modelo = modelos[i % len(modelos)]
+        linhas.append(modelo.format(a=i % n_vars, b=(i * 7 + 3) % n_vars, c=(i * 13 + 5) % n_vars))
+
+    linhas.append('  v0 := 0')
+    linhas.append('end.')
+    return '\n'.join(linhas) + '\n'
+
+
+def _substituir(fonte, antigo, novo):
+    """Substitui um troço do código de um módulo, que tem de lá estar."""
+    if antigo not in fonte:
+        raise ValueError(f"{antigo!r} não existe no código do analex")
+    return fonte.replace(antigo, novo)
+
+
+def construir_lexer_legado():
+    """
+    Reconstrói o analisador léxico antigo, com uma regra de função por palavra reservada
+    testada antes do t_ID, para servir de referência nas medições.
+    """
+    fonte = inspect.getsource(analex)
+    inicio = fonte.index('reserved = {')
+    fim = fonte.index('}', inicio) + 1
+
+    regras = ''.join(
+        f"def t_{tipo}(t):\n    r'\\b{palavra}\\b'\n    t.value = t.value.lower()\n    return t\n\n"
+        for palavra, tipo in analex.reserved.items()
+    )
+    fonte = fonte[:inicio] + regras + fonte[fim:]
+    fonte = _substituir(fonte, "t.type = reserved.get(t.value, 'ID')", "t.type = 'ID'")
+    # Sem as tabelas pré-geradas do build_lexer: as regras antigas precisam de IGNORECASE
+    fonte = _substituir(fonte, '\nlexer = build_lexer()',
+                        '\nlexer = lex.lex(module=sys.modules[__name__], reflags=int(re.VERBOSE | re.IGNORECASE))')
+
+    # O PLY valida o módulo de origem das regras, por isso o módulo tem de estar registado
+    modulo = types.ModuleType('analex_legado')
+    modulo.__file__ = '<analex_legado>'
+    modulo.__dict__['re'] = re
+    sys.modules[modulo.__name__] = modulo
+    try:
+        exec(compile(fonte, '<analex_legado>', 'exec'), modulo.__dict__)
+    finally:
+        del sys.modules[modulo.__name__]
+    return modulo.lexer
+
+
+def medir_lexer(lexer_base, codigo, repeticoes):
+    """Devolve (tokens, segundos) do melhor de várias execuções do lexer sobre o código."""
+    melhor = None
+    n_tokens = 0
+    for _ in range(repeticoes):
+        lexer = lexer_base.clone()
+        lexer.lineno = 1
+        lexer.input(codigo)
+        inicio = time.perf_counter()
+        n_tokens = 0
+        token = lexer.token
+        while token() is not None:
+            n_tokens += 1
+        duracao = time.perf_counter() - inicio
+        if melhor is None or duracao < melhor:
+            melhor = duracao
+    return n_tokens, melhor
+
+
+def bench_lexer(args):
+    codigo = gerar_programa(args.linhas)
+    print(f"Programa gerado: {args.linhas} linhas, {len(codigo)} caracteres")
+
+    resultados = [
+        ('regras por palavra reservada', construir_lexer_legado()),
+        ('tabela de palavras reservadas', analex.lexer),
+    ]
+    for nome, lexer_base in resultados:
+        n_tokens, duracao = medir_lexer(lexer_base, codigo, args.repeticoes)
+        print(f"  {nome:32} {n_tokens} tokens em {duracao:.3f}s -> {n_tokens / duracao:,.0f} tokens/s")
+
+
+def gerar_bloco(n_comandos):
+    """Programa com um único bloco begin ... end de n_comandos atribuições."""
+    comandos = ';\n'.join(f"  a := b + {i}" for i in range(n_comandos))
+    return f"program Bloco;\nvar a, b: integer;\nbegin\n{comandos}\nend.\n"
+
+
+def bench_parser(args):
+    from anasin import parse_code
+    codigo = gerar_bloco(args.comandos)
+    print(f"Programa gerado: {args.comandos} comandos num só bloco, {len(codigo)} caracteres")
+
+    melhor = None
+    for _ in range(args.repeticoes):
+        inicio = time.perf_counter()
+        parse_code(codigo)
+        duracao = time.perf_counter() - inicio
+        if melhor is None or duracao < melhor:
+            melhor = duracao
+
+    # Medição de memória à parte: o tracemalloc abranda bastante o parse
+    tracemalloc.start()
+    ast = parse_code(codigo)
+    retida, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  tempo {melhor:.3f}s -> {args.comandos / melhor:,.0f} comandos/s")
+    print(f"  memória: pico {pico / 2**20:.1f} MiB, AST retida {retida / 2**20:.1f} MiB")
+    return ast
+
+
+def bench_vm(args):
+    import contextlib
+    import io
+    from session import CompilerSession
+    from vm import VirtualMachine, assemble
+
+    codigo = (f"program Laco;\nvar i, j, soma: integer;\nbegin\n  soma := 0;\n"
+              f"  for i := 1 to {args.iteracoes} do\n    for j := 1 to 100 do\n"
+              f"      soma := (soma + i * j) mod 1000;\n  writeln(soma)\nend.\n")
+    with contextlib.redirect_stdout(io.StringIO()):
+        texto = CompilerSession().compile(codigo)
+
+    inicio = time.perf_counter()
+    instrucoes = assemble(texto)
+    montagem = time.perf_counter() - inicio
+    print(f"Montagem: {len(instrucoes)} instruções em {montagem * 1000:.2f} ms")
+
+    melhor = None
+    for _ in range(args.repeticoes):
+        maquina = VirtualMachine(instrucoes, entrada=[], saida=io.StringIO())
+        inicio = time.perf_counter()
+        maquina.run()
+        duracao = time.perf_counter() - inicio
+        if melhor is None or duracao < melhor:
+            melhor = duracao
+    print(f"  {maquina.passos} instruções executadas em {melhor:.3f}s -> "
+          f"{maquina.passos / melhor:,.0f} instruções/s")
+
+
+# Entrada dada a cada exemplo do testes.md, pela ordem em que aparecem
+ENTRADAS_EXEMPLOS = [[], ['10'], ['97'], ['3', '1', '4', '1', '5'], ['101101']]
+
+
+def exemplos_testes():
+    """Programas Pascal dos exemplos do testes.md."""
+    caminho = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testes.md')
+    with open(caminho, encoding='utf-8') as ficheiro:
+        return re.findall(r'```pascal\n(.*?)```', ficheiro.read(), re.S)
+
+
+def executar(texto, entrada):
+    """Executa código VM e devolve (saída, instruções executadas)."""
+    import io
+    from vm import VirtualMachine
+    saida = io.StringIO()
+    maquina = VirtualMachine(texto, entrada=entrada, saida=saida)
+    maquina.run()
+    return saida.getvalue(), maquina.passos
+
+
+def bench_peephole(args):
+    import contextlib
+    import io
+    from peephole import Peephole, contar_instrucoes
+    from session import CompilerSession
+
+    otimizador = Peephole(args.regras.split(',') if args.regras else None)
+    total_antes = total_depois = 0
+    print(f"{'exemplo':10} {'instr. geradas':>16} {'instr. executadas':>20}")
+    for numero, codigo in enumerate(exemplos_testes(), 1):
+        with contextlib.redirect_stdout(io.StringIO()):
+            normal = CompilerSession().compile(codigo)
+            otimizado = CompilerSession(peephole=otimizador).compile(codigo)
+        entrada = ENTRADAS_EXEMPLOS[numero - 1] if numero <= len(ENTRADAS_EXEMPLOS) else []
+        saida_normal, antes = executar(normal, entrada)
+        saida_otimizada, depois = executar(otimizado, entrada)
+        if saida_normal != saida_otimizada:
+            print(f"Exemplo {numero}: a saída do código otimizado é diferente!")
+        total_antes += antes
+        total_depois += depois
+        geradas = [contar_instrucoes(normal), contar_instrucoes(otimizado)]
+        print(f"{numero:<10} {geradas[0]:>7} -> {geradas[1]:<6} {antes:>10} -> {depois:<7} "
+              f"({(1 - depois / antes) * 100:.1f}%)")
+    print(f"Total de instruções executadas: {total_antes} -> {total_depois} "
+          f"({(1 - total_depois / total_antes) * 100:.1f}% menos)")
+    print("Aplicações de cada regra:")
+    for linha in otimizador.relatorio():
+        print(f"  {linha}")
+
+
+def bench_emissao(args):
+    import contextlib
+    import io
+    from anasin import parse_code
+    from converter import PascalToVMCompiler
+    ast = parse_code(gerar_bloco(args.comandos))
+    print(f"Programa gerado: {args.comandos} comandos num só bloco")
+
+    melhores = {}
+    for _ in range(args.repeticoes):
+        compilador = PascalToVMCompiler()
+        with contextlib.redirect_stdout(io.StringIO()):
+            texto = compilador.compile(ast)
+        for fase, duracao in compilador.timings.items():
+            if fase not in melhores or duracao < melhores[fase]:
+                melhores[fase] = duracao
+    for fase, duracao in melhores.items():
+        print(f"  {fase:14} {duracao * 1000:8.1f} ms")
+    print(f"  {len(compilador.main_code)} itens de código intermédio, {len(texto)} caracteres de texto VM")
+
+
+def bench_release(args):
+    import contextlib
+    import io
+    from anasin import parse_code
+    from converter import PascalToVMCompiler
+    codigo = gerar_programa(args.linhas)
+    print(f"Programa gerado: {args.linhas} linhas")
+    modos = [('desenvolvimento', True, True), ('sem debug', False, True), ('produção', False, False)]
+    print(f"  {'modo':16} {'compilação':>12} {'tamanho':>12} {'linhas VM':>10}")
+    for nome, debug, comentarios in modos:
+        melhor = None
+        for _ in range(args.repeticoes):
+            ast = parse_code(codigo)
+            compilador = PascalToVMCompiler(debug=debug, comments=comentarios)
+            mensagens = io.StringIO()
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(mensagens):
+                texto = compilador.compile(ast)
+            duracao = time.perf_counter() - inicio
+            if melhor is None or duracao < melhor:
+                melhor = duracao
+        print(f"  {nome:16} {melhor * 1000:9.1f} ms {len(texto.encode()) / 1024:9.1f} KiB {texto.count(chr(10)) + 1:10}")
+
+
+def gerar_recursivo(n_fases):
+    """Função recursiva com n_fases variáveis locais usadas uma a seguir à outra."""
+    nomes = ', '.join(f'v{i}' for i in range(n_fases))
+    fases = '\n'.join(f"  v{i} := n + {i};\n  t := t + v{i};" for i in range(n_fases))
+    return (f"program Recursivo;\nfunction Soma(n: integer): integer;\nvar t, {nomes}: integer;\nbegin\n"
+            f"  t := 0;\n{fases}\n  if n > 0 then t := Soma(n - 1) + t;\n  Soma := t;\nend;\n"
+            f"begin\n  writeln(Soma(100))\nend.\n")
+
+
+def bench_frames(args):
+    import contextlib
+    import io
+    from anasin import parse_code
+    from converter import PascalToVMCompiler
+    from vm import VirtualMachine
+    codigo = gerar_recursivo(args.variaveis)
+    print(f"Função recursiva com {args.variaveis} variáveis locais de vidas disjuntas, 101 chamadas")
+    print(f"  {'frames':20} {'células/frame':>14} {'pilha no fim':>13} {'instr. executadas':>18}")
+    resultados = []
+    for nome, reutilizar in (('sem reutilização', False), ('com reutilização', True)):
+        compilador = PascalToVMCompiler(reuse_slots=reutilizar)
+        with contextlib.redirect_stdout(io.StringIO()):
+            texto = compilador.compile(parse_code(codigo))
+        maquina = VirtualMachine(texto, entrada=[], saida=io.StringIO())
+        maquina.run()
+        resultados.append(maquina.saida.getvalue())
+        print(f"  {nome:20} {compilador.functions['soma']['frame_size']:>14} {len(maquina.pilha):>13} "
+              f"{maquina.passos:>18}")
+    if resultados[0] != resultados[1]:
+        print("A saída com reutilização de células é diferente!")
+
+
+def gerar_recursao(n):
+    """Soma recursiva de 1..n com acumulador (chamada terminal) e o fatorial (chamada não terminal)."""
+    return (f"program Recursao;\nfunction Soma(n, acc: integer): integer;\nbegin\n  if n = 0 then return acc;\n"
+            f"  return Soma(n - 1, acc + n)\nend;\n\nfunction Fat(n: integer): integer;\nbegin\n"
+            f"  if n <= 1 then Fat := 1 else Fat := n * Fat(n - 1)\nend;\n\n"
+            f"begin\n  writeln(Soma({n}, 0));\n  writeln(Fat(10))\nend.\n")
+
+
+def bench_recursao(args):
+    import contextlib
+    import io
+    from anasin import parse_code
+    from converter import PascalToVMCompiler
+    from vm import VirtualMachine
+    codigo = gerar_recursao(args.profundidade)
+    print(f"Soma recursiva com {args.profundidade} chamadas em posição terminal")
+    print(f"  {'chamadas terminais':20} {'pilha máxima':>13} {'pilha no fim':>13} {'instr. executadas':>18}")
+    resultados = []
+    for nome, otimizar in (('CALL', False), ('JUMP', True)):
+        compilador = PascalToVMCompiler(optimize_tail_calls=otimizar)
+        with contextlib.redirect_stdout(io.StringIO()):
+            texto = compilador.compile(parse_code(codigo))
+        maquina = VirtualMachine(texto, entrada=[], saida=io.StringIO())
+        maquina.run()
+        resultados.append(maquina.saida.getvalue())
+        print(f"  {nome:20} {maquina.pilha_maxima:>13} {len(maquina.pilha):>13} {maquina.passos:>18}")
+    if resultados[0] != resultados[1]:
+        print("A saída com chamadas terminais otimizadas é diferente!")
+
+
+def gerar_matriz(n):
+    """Preenche uma matriz n x n e soma os seus elementos, com limites e expressões invariantes."""
+    return (f"program Matriz;\nvar m: array[1..{n}, 1..{n}] of integer;\n    i, j, n, s: integer;\n"
+            f"begin\n  n := {n};\n  for i := 1 to n do\n    for j := 1 to n do\n"
+            f"      m[i, j] := i * j + n * 2;\n  s := 0;\n  for i := 1 to n do\n    for j := 1 to n do\n"
+            f"      s := s + m[i, j];\n  writeln(s)\nend.\n")
+
+
+def bench_ciclos(args):
+    import contextlib
+    import io
+    from anasin import parse_code
+    from converter import PascalToVMCompiler
+    from peephole import contar_instrucoes
+    from vm import VirtualMachine
+    codigo = gerar_matriz(args.tamanho)
+    print(f"Preenchimento e soma de uma matriz {args.tamanho}x{args.tamanho}")
+    print(f"  {'ciclos':20} {'instruções':>11} {'instr. executadas':>18}")
+    resultados = []
+    for nome, otimizar in (('sem otimização', False), ('com otimização', True)):
+        compilador = PascalToVMCompiler(optimize_loops=otimizar)
+        with contextlib.redirect_stdout(io.StringIO()):
+            texto = compilador.compile(parse_code(codigo))
+        maquina = VirtualMachine(texto, entrada=[], saida=io.StringIO())
+        maquina.run()
+        resultados.append(maquina.saida.getvalue())
+        print(f"  {nome:20} {contar_instrucoes(texto):>11} {maquina.passos:>18}")
+    if resultados[0] != resultados[1]:
+        print("A saída com otimização dos ciclos é diferente!")
+
+
+def gerar_acessores(n):
+    """Ciclos sobre um array através de pequenas funções e procedimentos de acesso."""
+    return (f"program Acessores;\nvar v: array[1..{n}] of integer;\n    i, s: integer;\n\n"
+            f"function Obter(k: integer): integer;\nbegin\n  Obter := v[k]\nend;\n\n"
+            f"procedure Definir(k, x: integer);\nbegin\n  v[k] := x\nend;\n\n"
+            f"function Maior(a, b: integer): integer;\nbegin\n  if a > b then Maior := a else Maior := b\nend;\n\n"
+            f"begin\n  for i := 1 to {n} do Definir(i, i mod 7);\n  s := 0;\n"
+            f"  for i := 1 to {n} do s := s + Maior(Obter(i), 3);\n  writeln(s)\nend.\n")
+
+
+def bench_expansao(args):
+    import contextlib
+    import io
+    from anasin import parse_code
+    from converter import PascalToVMCompiler
+    from peephole import contar_instrucoes
+    from vm import VirtualMachine
+    codigo = gerar_acessores(args.tamanho)
+    print(f"Ciclos sobre um array de {args.tamanho} elementos com funções de acesso")
+    print(f"  {'expansão':20} {'instruções':>11} {'instr. executadas':>18} {'chamadas expandidas':>20}")
+    resultados = []
+    for nome, limite in (('sem expansão', 0), (f'limite {args.limite}', args.limite)):
+        compilador = PascalToVMCompiler(inline_budget=limite)
+        with contextlib.redirect_stdout(io.StringIO()):
+            texto = compilador.compile(parse_code(codigo))
+        maquina = VirtualMachine(texto, entrada=[], saida=io.StringIO())
+        maquina.run()
+        resultados.append(maquina.saida.getvalue())
+        print(f"  {nome:20} {contar_instrucoes(texto):>11} {maquina.passos:>18} {len(compilador.inlined):>20}")
+    if resultados[0] != resultados[1]:
+        print("A saída com expansão das rotinas é diferente!")
+
+
+def gerar_vetores(n):
+    """Ciclos FOR sobre arrays com limites constantes: prefixos, vizinhos e uma tabela de restos."""
+    return (f"program Vetores;\nconst N = {n};\nvar v, p: array[1..{n}] of integer;\n"
+            f"    r: array[0..6] of integer;\n    i, s: integer;\n"
+            f"begin\n  for i := 1 to N do v[i] := i mod 13;\n  p[1] := v[1];\n"
+            f"  for i := 2 to N do p[i] := p[i - 1] + v[i];\n"
+            f"  for i := 1 to N do r[i mod 7] := r[i mod 7] + v[i];\n  s := 0;\n"
+            f"  for i := N - 1 downto 1 do s := s + v[i + 1] - v[i];\n"
+            f"  writeln(p[N], ' ', r[3], ' ', s)\nend.\n")
+
+
+def bench_limites(args):
+    import contextlib
+    import io
+    from anasin import parse_code
+    from converter import PascalToVMCompiler
+    from peephole import contar_instrucoes
+    from vm import VirtualMachine
+    codigo = gerar_vetores(args.tamanho)
+    print(f"Ciclos FOR sobre arrays de {args.tamanho} elementos")
+    print(f"  {'verificação':28} {'instruções':>11} {'instr. executadas':>18} {'CHECK':>6} {'eliminados':>11}")
+    resultados = []
+    modos = (('sem verificação', False, False), ('verificada', True, False),
+             ('verificada, com intervalos', True, True))
+    for nome, verificar, intervalos in modos:
+        compilador = PascalToVMCompiler(check_bounds=verificar, range_analysis=intervalos)
+        with contextlib.redirect_stdout(io.StringIO()):
+            texto = compilador.compile(parse_code(codigo))
+        maquina = VirtualMachine(texto, entrada=[], saida=io.StringIO())
+        maquina.run()
+        resultados.append(maquina.saida.getvalue())
+        verificacoes = compilador.bounds_checks
+        print(f"  {nome:28} {contar_instrucoes(texto):>11} {maquina.passos:>18} "
+              f"{verificacoes['emitidas']:>6} {verificacoes['eliminadas']:>11}")
+    if len(set(resultados)) != 1:
+        print("A saída com verificação de limites é diferente!")
+
+
+def gerar_textos(n):
+    """Ciclo que monta linhas de texto com concatenações de várias partes e funções sobre strings."""
+    return (f"program Textos;\nconst Prefixo = 'linha';\n    Separador = ': ';\n"
+            f"var s: string;\n    i, total: integer;\n"
+            f"begin\n  total := 0;\n  for i := 1 to {n} do\n  begin\n"
+            f"    s := Prefixo + ' ' + inttostr(i) + Separador + concat('[', 'x', ']', ' = ') + inttostr(i * i) + ';';\n"
+            f"    total := total + length(s) + ord(upcase(chr(ord('a') + i mod 26))) - strtoint('60')\n"
+            f"  end;\n  writeln(s, ' ', total)\nend.\n")
+
+
+def bench_textos(args):
+    import contextlib
+    import io
+    from anasin import parse_code
+    from converter import PascalToVMCompiler
+    from peephole import contar_instrucoes
+    from vm import VirtualMachine
+    codigo = gerar_textos(args.tamanho)
+    print(f"Ciclo de {args.tamanho} iterações com concatenações e funções predefinidas sobre strings")
+    print(f"  {'constantes':12} {'instruções':>11} {'CONCAT':>7} {'instr. executadas':>18}")
+    resultados = []
+    for avaliar in (False, True):
+        compilador = PascalToVMCompiler(fold=avaliar)
+        with contextlib.redirect_stdout(io.StringIO()):
+            texto = compilador.compile(parse_code(codigo))
+        maquina = VirtualMachine(texto, entrada=[], saida=io.StringIO())
+        maquina.run()
+        resultados.append(maquina.saida.getvalue())
+        concatenacoes = sum(1 for linha in texto.splitlines() if linha.startswith('CONCAT'))
+        print(f"  {'avaliadas' if avaliar else 'em execução':12} {contar_instrucoes(texto):>11} "
+              f"{concatenacoes:>7} {maquina.passos:>18}")
+    if len(set(resultados)) != 1:
+        print("A saída com as constantes avaliadas é diferente!")
+
+
+def gerar_registo(n):
+    """Programa que escreve muitas linhas de registo, com literais seguidos entre os valores."""
+    return (f"program Registo;\nconst Nivel = 'INFO';\nvar i: integer;\n"
+            f"begin\n  for i := 1 to {n} do\n"
+            f"    writeln('[', Nivel, '] ', 'evento ', i, ': ', 'estado', ' = ', i mod 7, ' ', 'ok', ';')\n"
+            f"end.\n")
+
+
+def bench_escrita(args):
+    import contextlib
+    import io
+    from anasin import parse_code
+    from converter import PascalToVMCompiler
+    from vm import VirtualMachine, BUFFER_SAIDA
+    with contextlib.redirect_stdout(io.StringIO()):
+        texto = PascalToVMCompiler().compile(parse_code(gerar_registo(args.linhas)))
+    print(f"Programa que escreve {args.linhas} linhas de registo (saída para {os.devnull})")
+    print(f"  {'buffer':>8} {'instr. executadas':>18} {'tempo (s)':>10}")
+    for buffer in (0, args.buffer or BUFFER_SAIDA):
+        with open(os.devnull, 'w') as saida:
+            maquina = VirtualMachine(texto, entrada=[], saida=saida, buffer_saida=buffer)
+            inicio = time.perf_counter()
+            maquina.run()
+            duracao = time.perf_counter() - inicio
+        print(f"  {buffer or 'sem':>8} {maquina.passos:>18} {duracao:>10.3f}")
+
+
+def gerar_biblioteca(n_rotinas, n_usadas):
+    """Programa com uma biblioteca de n_rotinas funções, das quais só as primeiras n_usadas são chamadas."""
+    rotinas = ''.join(f"function F{i}(n: integer): integer;\nvar t: integer;\nbegin\n  t := n * {i} + 1;\n"
+                      f"  if t > 100 then t := t - 100;\n  F{i} := t\nend;\n\n" for i in range(n_rotinas))
+    chamadas = ';\n'.join(f"  writeln(F{i}({i}))" for i in range(n_usadas))
+    return f"program Biblioteca;\n\n{rotinas}begin\n{chamadas}\nend.\n"
+
+
+def bench_codigo_morto(args):
+    import contextlib
+    import io
+    from anasin import parse_code
+    from converter import PascalToVMCompiler
+    from peephole import contar_instrucoes
+    codigo = gerar_biblioteca(args.rotinas, args.usadas)
+    print(f"Biblioteca de {args.rotinas} funções, {args.usadas} chamadas pelo programa")
+    print(f"  {'código morto':20} {'instruções':>11} {'bytes':>9}")
+    for nome, eliminar in (('mantido', False), ('eliminado', True)):
+        compilador = PascalToVMCompiler(eliminate_dead_code=eliminar)
+        with contextlib.redirect_stdout(io.StringIO()):
+            texto = compilador.compile(parse_code(codigo))
+        print(f"  {nome:20} {contar_instrucoes(texto):>11} {len(texto.encode()):>9}")
+    removido = compilador.dead_code
+    print(f"  {len(removido['rotinas'])} rotinas removidas: {removido['instrucoes']} instruções, "
+          f"{removido['bytes']} bytes")
+
+
+def bench_startup(args):
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    modos = [('produção', '0'), ('desenvolvimento', '1')]
+    print(f"Latência de 'import converter' ({args.repeticoes} processos por modo)")
+    for nome, debug in modos:
+        ambiente = dict(os.environ, PASCALC_DEBUG=debug)
+        # Primeira execução fora da medição: gera as tabelas em falta
+        subprocess.run([sys.executable, '-c', 'import converter'], cwd=diretorio, env=ambiente,
+                       check=True, capture_output=True)
+        tempos = []
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            subprocess.run([sys.executable, '-c', 'import converter'], cwd=diretorio, env=ambiente,
+                           check=True, capture_output=True)
+            tempos.append(time.perf_counter() - inicio)
+        print(f"  {nome:16} média {sum(tempos) / len(tempos) * 1000:.1f} ms, mínimo {min(tempos) * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Medições de desempenho do compilador Pascal -> EWVM')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_lexer = sub.add_parser('lexer', help='tokens/segundo do analisador léxico')
+    p_lexer.add_argument('--linhas', type=int, default=100000)
+    p_lexer.add_argument('--repeticoes', type=int, default=3)
+    p_lexer.set_defaults(func=bench_lexer)
+
+    p_parser = sub.add_parser('parser', help='tempo e memória do parse de um bloco grande')
+    p_parser.add_argument('--comandos', type=int, default=50000)
+    p_parser.add_argument('--repeticoes', type=int, default=3)
+    p_parser.set_defaults(func=bench_parser)
+
+    p_vm = sub.add_parser('vm', help='instruções/segundo da máquina virtual')
+    p_vm.add_argument('--iteracoes', type=int, default=2000, help='iterações do ciclo exterior')
+    p_vm.add_argument('--repeticoes', type=int, default=3)
+    p_vm.set_defaults(func=bench_vm)
+
+    p_peephole = sub.add_parser('peephole', help='instruções executadas nos exemplos do testes.md, '
+                                                 'com e sem otimização peephole')
+    p_peephole.add_argument('--regras', help='regras a usar, separadas por vírgulas (por omissão, todas)')
+    p_peephole.set_defaults(func=bench_peephole)
+
+    p_emissao = sub.add_parser('emissao', help='tempo de geração do código intermédio e da sua serialização')
+    p_emissao.add_argument('--comandos', type=int, default=50000)
+    p_emissao.add_argument('--repeticoes', type=int, default=3)
+    p_emissao.set_defaults(func=bench_emissao)
+
+    p_release = sub.add_parser('release', help='tempo de compilação e tamanho do código VM '
+                                               'com e sem mensagens de depuração e comentários')
+    p_release.add_argument('--linhas', type=int, default=5000)
+    p_release.add_argument('--repeticoes', type=int, default=3)
+    p_release.set_defaults(func=bench_release)
+
+    p_frames = sub.add_parser('frames', help='tamanho dos frames de uma função recursiva, '
+                                             'com e sem reutilização de células')
+    p_frames.add_argument('--variaveis', type=int, default=20)
+    p_frames.set_defaults(func=bench_frames)
+
+    p_ciclos = sub.add_parser('ciclos', help='instruções executadas por ciclos sobre uma matriz, '
+                                             'com e sem expressões invariantes e redução de força')
+    p_ciclos.add_argument('--tamanho', type=int, default=100)
+    p_ciclos.set_defaults(func=bench_ciclos)
+
+    p_recursao = sub.add_parser('recursao', help='pilha e instruções executadas por uma função recursiva, '
+                                                 'com e sem otimização das chamadas terminais')
+    p_recursao.add_argument('--profundidade', type=int, default=100000)
+    p_recursao.set_defaults(func=bench_recursao)
+
+    p_expansao = sub.add_parser('expansao', help='instruções executadas por ciclos que chamam funções de acesso, '
+                                                 'com e sem expansão das rotinas nos pontos de chamada')
+    p_expansao.add_argument('--tamanho', type=int, default=10000)
+    p_expansao.add_argument('--limite', type=int, default=8, help='crescimento máximo do código por chamada')
+    p_expansao.set_defaults(func=bench_expansao)
+
+    p_limites = sub.add_parser('limites', help='custo da verificação dos índices dos arrays em ciclos FOR, '
+                                               'com e sem análise de intervalos')
+    p_limites.add_argument('--tamanho', type=int, default=10000)
+    p_limites.set_defaults(func=bench_limites)
+
+    p_textos = sub.add_parser('textos', help='instruções executadas por concatenações e funções sobre strings, '
+                                             'com e sem avaliação das constantes em compilação')
+    p_textos.add_argument('--tamanho', type=int, default=10000)
+    p_textos.set_defaults(func=bench_textos)
+
+    p_escrita = sub.add_parser('escrita', help='instruções executadas e tempo de um programa que escreve muitas '
+                                               'linhas, com e sem buffer de saída na VM')
+    p_escrita.add_argument('--linhas', type=int, default=100000)
+    p_escrita.add_argument('--buffer', type=int, default=0, help='escritas acumuladas (por omissão, o da VM)')
+    p_escrita.set_defaults(func=bench_escrita)
+
+    p_morto = sub.add_parser('codigo-morto', help='tamanho do código de uma biblioteca de rotinas pouco usada, '
+                                                  'com e sem eliminação de código morto')
+    p_morto.add_argument('--rotinas', type=int, default=200)
+    p_morto.add_argument('--usadas', type=int, default=5)
+    p_morto.set_defaults(func=bench_codigo_morto)
+
+    p_startup = sub.add_parser('startup', help='latência de arranque de um processo do compilador')
+    p_startup.add_argument('--repeticoes', type=int, default=20)
+    p_startup.set_defaults(func=bench_startup)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
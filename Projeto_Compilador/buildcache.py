@@ -0,0 +1,97 @@
+import glob
+import hashlib
+import os
+import pickle
+import tempfile
+
+# Diretório da cache de build por omissão (relativo ao diretório atual)
+DIRETORIO_CACHE = '.pascalc_cache'
+
+_impressao_compilador = None
+
+
+def compiler_fingerprint():
+    """
+    Hash das fontes do compilador. Faz parte de todas as chaves da cache, para que qualquer
+    alteração ao compilador invalide automaticamente os resultados guardados.
+    """
+    global _impressao_compilador
+    if _impressao_compilador is None:
+        h = hashlib.sha256()
+        diretorio = os.path.dirname(os.path.abspath(__file__))
+        for caminho in sorted(glob.glob(os.path.join(diretorio, '*.py'))):
+            h.update(os.path.basename(caminho).encode('utf-8'))
+            with open(caminho, 'rb') as ficheiro:
+                h.update(ficheiro.read())
+        _impressao_compilador = h.hexdigest()
+    return _impressao_compilador
+
+
+class BuildCache:
+    """
+    Cache de build em disco. Guarda, por hash da fonte, a AST e o código VM de programas
+    completos e, por hash da AST e do contexto, o código gerado para cada função/procedimento.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_CACHE):
+        self.diretorio = diretorio
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, *partes):
+        """Chave para as partes dadas (texto ou bytes), combinada com a versão do compilador."""
+        h = hashlib.sha256(compiler_fingerprint().encode('ascii'))
+        for parte in partes:
+            if isinstance(parte, str):
+                parte = parte.encode('utf-8')
+            h.update(len(parte).to_bytes(8, 'little'))
+            h.update(parte)
+        return h.hexdigest()
+
+    def file_key(self, caminho, *partes):
+        """Chave para o conteúdo de um ficheiro, lido por blocos."""
+        h = hashlib.sha256()
+        with open(caminho, 'rb') as ficheiro:
+            for bloco in iter(lambda: ficheiro.read(1 << 20), b''):
+                h.update(bloco)
+        return self.key(h.hexdigest(), *partes)
+
+    def _caminho(self, tipo, chave):
+        return os.path.join(self.diretorio, tipo, chave[:2], chave + '.pickle')
+
+    def _ler(self, tipo, chave):
+        try:
+            with open(self._caminho(tipo, chave), 'rb') as ficheiro:
+                valor = pickle.load(ficheiro)
+        except (OSError, pickle.PickleError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return valor
+
+    def _escrever(self, tipo, chave, valor):
+        caminho = self._caminho(tipo, chave)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Escrita atómica: vários processos do pascalc podem escrever a mesma entrada
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho))
+        try:
+            with os.fdopen(descritor, 'wb') as ficheiro:
+                pickle.dump(valor, ficheiro, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, caminho)
+        except OSError:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    def get_program(self, chave):
+        """Devolve (ast, codigo_vm) de um programa compilado, ou None."""
+        return self._ler('programas', chave)
+
+    def put_program(self, chave, ast, codigo_vm):
+        self._escrever('programas', chave, (ast, codigo_vm))
+
+    def get_routine(self, chave):
+        """Devolve a entrada guardada para uma função/procedimento, ou None."""
+        return self._ler('rotinas', chave)
+
+    def put_routine(self, chave, entrada):
+        self._escrever('rotinas', chave, entrada)
@@ -0,0 +1,62 @@
+from ast_nodes import (CompoundStatement, If, IfElse, Assign, Return, FunctionCall, Var, While, For,
+                       ArrayType, RecordType)
+from typecheck import type_of
+
+
+def _self_call(expr, name):
+    """Se expr é uma chamada à rotina name sem arrays/registos nos argumentos."""
+    if type(expr) is not FunctionCall or expr.name != name:
+        return False
+    # Um array/registo é passado por endereço e pode ser uma variável local, que a chamada
+    # terminal reutilizaria
+    return not any(isinstance(type_of(arg), (ArrayType, RecordType)) for arg in expr.args)
+
+
+def tail_calls(body, name, is_function):
+    """
+    Chamadas da rotina name a si própria em posição terminal no corpo: o resultado da chamada
+    é o resultado da rotina e não há mais nada a fazer depois dela. São as chamadas que podem
+    reutilizar o frame atual (reescrever os parâmetros e saltar para o início da rotina).
+
+    São terminais return F(...) em qualquer ponto e, no último comando executado do corpo
+    (atravessando blocos e IFs), F := F(...) numa função ou F(...) num procedimento.
+    """
+    found = set()
+
+    def last(stmt):
+        kind = type(stmt)
+        if kind is CompoundStatement:
+            statements = [item for item in stmt.statements or () if item is not None]
+            if statements:
+                last(statements[-1])
+        elif kind is If:
+            last(stmt.then_part)
+        elif kind is IfElse:
+            last(stmt.then_part)
+            last(stmt.else_part)
+        elif kind is Assign and is_function:
+            if type(stmt.target) is Var and stmt.target.name == name and _self_call(stmt.expr, name):
+                found.add(stmt.expr)
+        elif kind is FunctionCall and not is_function:
+            if _self_call(stmt, name):
+                found.add(stmt)
+
+    def returns(stmt):
+        kind = type(stmt)
+        if kind is Return:
+            if is_function and _self_call(stmt.expr, name):
+                found.add(stmt.expr)
+        elif kind is CompoundStatement:
+            for item in stmt.statements or ():
+                returns(item)
+        elif kind is If:
+            returns(stmt.then_part)
+        elif kind is IfElse:
+            returns(stmt.then_part)
+            returns(stmt.else_part)
+        elif kind is While or kind is For:
+            returns(stmt.body)
+
+    last(body)
+    returns(body)
+    return found
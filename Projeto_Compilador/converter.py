@@ -1,37 +1,133 @@
+import time
+
 import ply.yacc as yacc
-from analex import tokens, lexer
+from analex import tokens, lexer, DEBUG
 from anasin import parse_code
+from ast_nodes import Node, ArrayType, RecordType, BinaryOp, Var
+from folding import fold_constants, fold_builtin
+from frame import FrameLayout, TIPOS_SIMPLES, type_size, field_offset
+from loops import LoopEffects, invariant_expressions, element_accesses, access_cost
+from deadcode import constant_condition, terminates, reachable_routines
+from calls import tail_calls
+from inline import inline_template, inline_cost
+from ranges import value_range, loop_range, within
+from intrinsics import BUILTINS, concat_parts, library_routine
+from ir import Op, Instr, Label, Comment, to_text, representable
+from symbols import Scope, resolve
+from typecheck import type_of, base_type, param_types, check_types
+
+# Operadores com instrução direta na EWVM ('<>' é EQUAL seguido de NOT)
+OPERATORS = {
+    '+': Op.ADD,
+    '-': Op.SUB,
+    '*': Op.MUL,
+    'div': Op.DIV,
+    'mod': Op.MOD,
+    'and': Op.AND,
+    'or': Op.OR,
+    '=': Op.EQUAL,
+    '<': Op.INF,
+    '<=': Op.INFEQ,
+    '>': Op.SUP,
+    '>=': Op.SUPEQ,
+}
+# Os mesmos operadores sobre reais ('/' é sempre uma divisão real)
+REAL_OPERATORS = {
+    '+': Op.FADD,
+    '-': Op.FSUB,
+    '*': Op.FMUL,
+    '/': Op.FDIV,
+    '=': Op.EQUAL,
+    '<': Op.FINF,
+    '<=': Op.FINFEQ,
+    '>': Op.FSUP,
+    '>=': Op.FSUPEQ,
+}
+# Escrita e leitura de cada tipo (os booleanos e os caracteres são inteiros na VM)
+WRITE_OPS = {'integer': Op.WRITEI, 'boolean': Op.WRITEI, 'real': Op.WRITEF, 'string': Op.WRITES, 'char': Op.WRITECHR}
+READ_CONVERSIONS = {
+    'integer': (Op.ATOI, 'Converte string para inteiro'),
+    'boolean': (Op.ATOI, 'Converte string para inteiro'),
+    'real': (Op.ATOF, 'Converte string para float'),
+    'char': (Op.CHRCODE, 'Obtém código ASCII do primeiro caractere'),
+}
 
 
 class PascalToVMCompiler:
-    def __init__(self):
-        self.main_code = []  # Código principal do programa
+    def __init__(self, cache=None, peephole=None, fold=True, debug=DEBUG, comments=True, reuse_slots=True,
+                 optimize_loops=True, eliminate_dead_code=True, short_circuit=False,
+                 optimize_tail_calls=True, inline_budget=8, check_bounds=False, range_analysis=True):
+        self.main_code = []  # Código principal do programa (representação intermédia, ver ir.py)
         self.function_code_buffer = []  # Buffer para código de funções/procedimentos
         self.current_code_buffer = self.main_code  # Buffer atual (pode alternar entre main e functions)
 
         self.label_counter = 0  # Contador para geração de rótulos únicos
         self.var_offset = 0  # Deslocamento global para variáveis
-        self.current_scope = 'global'  # Escopo atual (global ou nome da função)
-        # Tabela de símbolos armazena (tipo, offset, tipo_dado) para variáveis/parâmetros/valor_retorno
-        self.symbol_table = {'global': {}}
+        self.global_scope = Scope('global')
+        self.scope = self.global_scope  # Âmbito atual (global ou o de uma função/procedimento)
+        self.frame = None  # FrameLayout da função/procedimento a ser compilado, ou dos temporários do programa
+        # Tabela de símbolos: nome do âmbito -> Scope, com os Symbol de variáveis/parâmetros/valor_retorno/constantes
+        self.symbol_table = {'global': self.global_scope}
         self.functions = {}  # Informações sobre funções/procedimentos
-        self.debug = True  # Ativar mensagens de depuração
-        self.array_info = {}  # Informações sobre arrays globais
-
-    def debug_print(self, msg):
-        """Imprime mensagens de depuração se debug estiver ativado."""
+        self.debug = debug  # Ativar mensagens de depuração (por omissão, só com PASCALC_DEBUG=1)
+        self.comments = comments  # Comentários no código VM gerado (desligados nas builds de produção)
+        self.types = {}  # Tipos declarados em TYPE: nome -> definição (sem nomes de tipos por resolver)
+        self.cache = cache  # BuildCache opcional para reaproveitar o código de funções/procedimentos
+        self.peephole = peephole  # Otimizador Peephole opcional, aplicado ao código final
+        self.fold = fold  # Avaliar expressões constantes e CONSTs em tempo de compilação
+        self.reuse_slots = reuse_slots  # Partilhar células do frame entre variáveis locais com vidas disjuntas
+        self.optimize_loops = optimize_loops  # Tirar dos ciclos as expressões invariantes e reduzir os acessos a arrays
+        self.hoisted = {}  # Expressão invariante -> temporário com o seu valor, nos ciclos em compilação
+        self.induction = {}  # Chave de um acesso (location_key) -> (temporário com o endereço, deslocamento)
+        self.optimize_tail_calls = optimize_tail_calls  # Chamadas recursivas terminais como saltos para o início
+        self.tail_calls = set()  # Chamadas terminais da rotina em compilação a si própria (calls.tail_calls)
+        self.routine_start = None  # Rótulo a seguir ao prólogo, destino das chamadas terminais
+        self.frame_pops = []  # POP do frame em cada epílogo, ajustados quando o tamanho do frame é conhecido
+        self.inline_budget = inline_budget  # Crescimento máximo do código por chamada expandida (0 desliga)
+        self.inlinable = {}  # Rotinas que podem ser expandidas nos pontos de chamada: nome -> modelo (inline.py)
+        self.inlined = []  # (rotina, chamador) de cada chamada expandida
+        self.inline_exit = None  # Rótulo do fim da rotina em expansão, destino dos RETURN/EXIT
+        self.check_bounds = check_bounds  # Verificar os índices dos arrays contra os limites declarados (CHECK)
+        self.range_analysis = range_analysis  # Omitir as verificações que a análise de intervalos prova desnecessárias
+        self.ranges = {}  # Símbolo -> intervalo dos seus valores (variáveis de controlo dos FOR em compilação)
+        self.bounds_checks = {'emitidas': 0, 'eliminadas': 0}  # Verificações de limites geradas e evitadas
+        self.short_circuit = short_circuit  # AND/OR das condições avaliados com saltos (curto-circuito)
+        self.loops = []  # Ciclos em compilação, do mais exterior ao mais interior: {'break': Label, 'continue': Label}
+        self.eliminate_dead_code = eliminate_dead_code  # Omitir rotinas nunca chamadas e comandos inalcançáveis
+        self.routines = []  # (nome, início, fim) do código de cada rotina no function_code_buffer
+        self.library = set()  # Rotinas da biblioteca (intrinsics.LIBRARY) chamadas pelo programa
+        self.dead_code = {'rotinas': [], 'comandos': 0, 'instrucoes': 0, 'bytes': 0}  # Código removido
+        self.timings = {}  # Duração (segundos) de cada fase da última compilação
+
+    def debug_print(self, msg, *args):
+        """
+        Imprime mensagens de depuração se debug estiver ativado. A mensagem só é formatada
+        (msg % args) nesse caso: sem debug, as chamadas não constroem texto nenhum.
+        """
         if self.debug:
-            print(f"DEBUG: {msg}")
+            print("DEBUG: " + (msg % args if args else msg))
 
     def generate_label(self, prefix="L"):
         """Gera um rótulo único."""
-        label = f'{prefix}{self.label_counter}'
+        label = Label(prefix, self.label_counter)
         self.label_counter += 1
         return label
 
-    def append_code(self, instruction):
+    def append_code(self, item):
+        """Adiciona um elemento (Instr, Label ou Comment) ao buffer de código atualmente ativo."""
+        self.current_code_buffer.append(item)
+
+    def emit(self, op, arg=None, comment=None):
         """Adiciona uma instrução ao buffer de código atualmente ativo."""
-        self.current_code_buffer.append(instruction)
+        self.current_code_buffer.append(Instr(op, arg, comment if self.comments else None))
+
+    def emit_label(self, label):
+        """Define um rótulo (Label, ou o nome de uma rotina) na posição atual."""
+        self.current_code_buffer.append(label if isinstance(label, Label) else Label(label))
+
+    def emit_comment(self, text):
+        if self.comments:
+            self.current_code_buffer.append(Comment(text))
 
     def compile(self, ast):
         """
@@ -43,9 +139,21 @@ class PascalToVMCompiler:
             return ""
 
         try:
+            self.timings = {}
             if ast[0] == 'program':
+                inicio = time.perf_counter()
+                if self.fold:
+                    ast = fold_constants(ast)
                 self.compile_program(ast)
-            return '\n'.join(self.main_code)
+                self.timings['geracao'] = time.perf_counter() - inicio
+                if self.peephole is not None:
+                    inicio = time.perf_counter()
+                    self.main_code = self.peephole.optimize(self.main_code)
+                    self.timings['peephole'] = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            text = to_text(self.main_code, comments=self.comments)
+            self.timings['serializacao'] = time.perf_counter() - inicio
+            return text
         except Exception as e:
             print(f"Erro de compilação: {str(e)}")
             import traceback
@@ -63,60 +171,99 @@ class PascalToVMCompiler:
             print("Erro: Bloco de declarações é None")
             return
 
-        self.append_code(f"// Programa: {program_name}")
+        self.emit_comment(f"Programa: {program_name}")
 
-        # Compila declarações primeiro para preencher a tabela de símbolos e array_info
+        # Compila declarações primeiro para preencher a tabela de símbolos
         # Corpos de funções/procedimentos serão adicionados ao function_code_buffer durante esta etapa
         declarations = block[1]
         if declarations is not None:
             self.compile_declarations(declarations)
 
-        self.debug_print("Tabela de símbolos após declarações globais:")
-        for scope, symbols in self.symbol_table.items():
-            self.debug_print(f"  Escopo: {scope}")
-            for name, info in self.symbol_table[scope].items():
-                self.debug_print(f"    {name}: {info}")
+        if self.debug:
+            self.debug_print("Tabela de símbolos após declarações globais:")
+            for scope_name, scope in self.symbol_table.items():
+                self.debug_print("  Escopo: %s", scope_name)
+                for name, symbol in scope.symbols.items():
+                    self.debug_print("    %s: %s", name, symbol)
 
         # Inicia geração do código principal, garantindo que main_code seja o buffer alvo
         self.current_code_buffer = self.main_code
-        self.append_code('START')
-
-        # Adiciona alocações de arrays globais imediatamente após START
-        self.add_global_array_allocations()
+        # As variáveis globais e os temporários do programa ocupam o início da pilha (gp) e têm
+        # de existir antes de START; o número de temporários só se sabe depois do corpo
+        frame = self.frame = FrameLayout(program_name, local=False)
+        frame.slots = self.var_offset
+        allocation = Instr(Op.PUSHN, 0)
+        self.append_code(allocation)
+        self.emit(Op.START)
 
         # Compila o bloco principal do programa
         compound_stmt = block[2]
         if compound_stmt is None:
             print("Erro: Bloco principal é None")
             return
+        resolve(compound_stmt, self.global_scope)
+        check_types(compound_stmt, self.functions)
         self.compile_compound_statement(compound_stmt)
 
-        self.append_code('stop')
+        self.emit(Op.STOP)
+        if frame.size:
+            allocation.arg = frame.size
+            if self.comments:
+                allocation.comment = 'Aloca espaço para variáveis globais' + (' e temporários' if frame.temps else '')
+        else:
+            self.main_code.remove(allocation)
+        self.frame = None
 
-        # Finalmente, adiciona todas as definições de funções após o programa principal
-        self.main_code.extend(self.function_code_buffer)
+        # Finalmente, adiciona as definições de funções após o programa principal
+        self.compile_library()
+        self.append_routines()
 
-    def add_global_array_allocations(self):
-        """Adiciona código para alocar arrays globais ao buffer de código principal."""
-        if not self.array_info:
-            return
+    def compile_library(self):
+        """
+        Compila as rotinas da biblioteca chamadas pelo programa, depois de todas as outras (uma
+        rotina da biblioteca pode chamar outra). Passam pela cache de build e pela eliminação de
+        código morto como as rotinas do programa.
+        """
+        compiled = set()
+        while self.library - compiled:
+            name = min(self.library - compiled)
+            compiled.add(name)
+            self.compile_routine_cached(library_routine(name), self.compile_function_declaration)
 
-        self.append_code("// Alocações de Arrays Globais")
-        for array_name, info in self.array_info.items():
-            if array_name in self.symbol_table['global']:
-                base_offset = self.symbol_table['global'][array_name][1]
-                size = info['size']
+    def append_routines(self):
+        """
+        Acrescenta ao programa o código das rotinas. Com eliminate_dead_code, só entram as
+        rotinas alcançáveis a partir do programa principal pelo grafo de chamadas; o tamanho
+        do código das restantes fica em dead_code.
+        """
+        if not self.eliminate_dead_code:
+            self.main_code.extend(self.function_code_buffer)
+            return
 
-                self.append_code(f'pushi {size} // Tamanho do array {array_name}')
-                self.append_code(f'allocn // Aloca memória para o array')
-                self.append_code(f'storeg {base_offset} // Armazena endereço base na variável global {array_name}')
+        buffer = self.function_code_buffer
+        code = {name: buffer[start:end] for name, start, end in self.routines}
+        reachable = reachable_routines(self.main_code, code)
+        position = 0
+        removed = []
+        for name, start, end in self.routines:
+            self.main_code.extend(buffer[position:start])  # Comentários entre rotinas
+            if name in reachable:
+                self.main_code.extend(buffer[start:end])
             else:
-                print(f"Aviso: Array {array_name} não encontrado na tabela de símbolos global durante alocação.")
-        self.append_code("// Fim das Alocações de Arrays Globais")
+                self.dead_code['rotinas'].append(name)
+                removed.extend(buffer[start:end])
+            position = end
+        self.main_code.extend(buffer[position:])
+
+        if removed:
+            self.dead_code['instrucoes'] += sum(1 for item in removed if type(item) is Instr)
+            self.dead_code['bytes'] += len(to_text(removed, comments=self.comments).encode()) + 1
+            self.debug_print("Rotinas nunca chamadas removidas: %s (%s bytes)",
+                             ', '.join(self.dead_code['rotinas']), self.dead_code['bytes'])
 
     def compile_declarations(self, declarations):
         """Compila declarações (var, function, procedure)."""
-        self.debug_print(f"Processando declarações: {declarations}")
+        self.debug_print("Processando declarações: %s", declarations)
 
         if declarations[0] == 'declarations':
             decl_list = declarations[1]
@@ -127,23 +274,151 @@ class PascalToVMCompiler:
                     self.debug_print("Ignorando declaração None")
                     continue
 
-                self.debug_print(f"Processando declaração: {decl}")
+                self.debug_print("Processando declaração: %s", decl)
 
                 if decl[0] == 'var_declarations':
                     var_decls = decl[1]
-                    self.debug_print(f"Processando declarações de variáveis: {var_decls}")
+                    self.debug_print("Processando declarações de variáveis: %s", var_decls)
                     for var_decl in var_decls:
                         if var_decl is None:
                             continue
                         self.compile_var_declaration(var_decl)
 
+                elif decl[0] == 'const_declarations':
+                    self.compile_const_declarations(decl[1], self.global_scope)
+
+                elif decl[0] == 'type_declarations':
+                    self.compile_type_declarations(decl[1])
+
                 elif decl[0] == 'function_declarations':
-                    func_decl = decl[1]
-                    self.compile_function_declaration(func_decl)
+                    self.compile_routine_cached(decl[1], self.compile_function_declaration)
 
                 elif decl[0] == 'procedure_declarations':
-                    proc_decl = decl[1]
-                    self.compile_procedure_declaration(proc_decl)
+                    self.compile_routine_cached(decl[1], self.compile_procedure_declaration)
+
+    def compile_const_declarations(self, const_decls, scope):
+        """
+        Regista as constantes no âmbito dado. Depois do ConstantFolder o valor já é um literal
+        (e as referências já foram substituídas); caso contrário, é uma expressão compilada em
+        cada uso, por isso as referências a outras constantes são resolvidas já aqui.
+        """
+        for const_decl in const_decls:
+            _, name, value = const_decl
+            if isinstance(value, Node):
+                resolve(value, scope)
+                check_types(value, self.functions)
+            scope.define(name, 'const', value=value)
+            self.debug_print("Constante declarada: %s = %s", name, value)
+
+    def compile_type_declarations(self, type_decls):
+        """Regista os tipos declarados em TYPE, já com os nomes de outros tipos resolvidos."""
+        for type_decl in type_decls:
+            self.types[type_decl.name] = self.resolve_type(type_decl.type)
+            self.debug_print("Tipo declarado: %s = %s", type_decl.name, self.types[type_decl.name])
+
+    def resolve_type(self, type_spec):
+        """
+        Substitui os nomes de tipos declarados em TYPE pela sua definição, também nos elementos
+        dos arrays e nos campos dos registos (que são alterados no próprio lugar).
+        """
+        if isinstance(type_spec, str):
+            if type_spec in TIPOS_SIMPLES:
+                return type_spec
+            if type_spec in self.types:
+                return self.types[type_spec]
+            print(f"Erro: Tipo {type_spec} não declarado")
+            return type_spec
+        if isinstance(type_spec, ArrayType):
+            type_spec.element_type = self.resolve_type(type_spec.element_type)
+        elif isinstance(type_spec, RecordType):
+            for field_decl in type_spec.fields:
+                field_decl.type = self.resolve_type(field_decl.type)
+        return type_spec
+
+    def compile_routine_cached(self, decl, compile_routine):
+        """
+        Compila uma função/procedimento através da cache de build: se a mesma rotina já foi
+        compilada no mesmo contexto (símbolos globais e funções conhecidas), reaproveita o código.
+        """
+        if decl[0] in ('function_forward', 'procedure_forward'):
+            compile_routine(decl)
+            return
+
+        name = decl[1]
+        code_start = len(self.function_code_buffer)
+        if self.cache is None:
+            compile_routine(decl)
+            self.routines.append((name, code_start, len(self.function_code_buffer)))
+            return
+
+        # As rotinas expandidas fazem parte do código gerado: entra a chave de cada uma
+        context = (sorted(self.global_scope.symbols.items()), sorted(self.types.items()),
+                   sorted((f, info['params'], info['return_type']) for f, info in self.functions.items()),
+                   sorted((f, template['key']) for f, template in self.inlinable.items()))
+        key = self.cache.key('rotina', self.code_options(), repr(decl), repr(context))
+
+        entry = self.cache.get_routine(key)
+        if entry is not None:
+            self.debug_print("Rotina %s reaproveitada da cache de build", name)
+            self.symbol_table[name] = Scope(name, self.global_scope, entry['symbols'])
+            self.functions[name] = entry['info']
+            if entry['inline'] is not None:
+                self.inlinable[name] = entry['inline']
+            self.inlined.extend(entry['inlined'])
+            self.library.update(entry['library'])
+            self.function_code_buffer.extend(
+                self.relabel(entry['code'], entry['label_base'], entry['label_count'], self.label_counter))
+            self.label_counter += entry['label_count']
+            self.routines.append((name, code_start, len(self.function_code_buffer)))
+            return
+
+        label_base = self.label_counter
+        inlined_base = len(self.inlined)
+        library = set(self.library)
+        compile_routine(decl)
+        self.routines.append((name, code_start, len(self.function_code_buffer)))
+        if name in self.inlinable:
+            self.inlinable[name]['key'] = key
+        self.cache.put_routine(key, {
+            'code': self.function_code_buffer[code_start:],
+            'label_base': label_base,
+            'label_count': self.label_counter - label_base,
+            'symbols': self.symbol_table[name].symbols,
+            'info': self.functions[name],
+            'inline': self.inlinable.get(name),
+            'inlined': self.inlined[inlined_base:],
+            'library': sorted(self.library - library),
+        })
+
+    def code_options(self):
+        """Opções que alteram o código gerado para uma rotina (entram nas chaves da cache de build)."""
+        options = [name for name, enabled in (
+            ('comentarios', self.comments), ('constantes', self.fold), ('reutilizar', self.reuse_slots),
+            ('ciclos', self.optimize_loops), ('codigo-morto', self.eliminate_dead_code),
+            ('curto-circuito', self.short_circuit), ('chamadas-terminais', self.optimize_tail_calls),
+            ('limites', self.check_bounds), ('intervalos', self.range_analysis)) if enabled]
+        if self.inline_budget:
+            options.append(f'expandir={self.inline_budget}')
+        return ','.join(options)
+
+    @staticmethod
+    def relabel(code, old_base, count, new_base):
+        """
+        Renumera os rótulos [old_base, old_base + count) de um troço de código (acabado de ler
+        da cache) para começarem em new_base. Cada Label é partilhado pela definição e pelos
+        saltos, por isso basta alterar o número de cada um uma vez.
+        """
+        if old_base == new_base or count == 0:
+            return list(code)
+
+        labels = {}
+        for item in code:
+            label = item if isinstance(item, Label) else getattr(item, 'arg', None)
+            if isinstance(label, Label) and label.number is not None and old_base <= label.number < old_base + count:
+                labels[id(label)] = label
+        for label in labels.values():
+            label.number += new_base - old_base
+        return list(code)
 
     def compile_function_declaration(self, func_decl):
         """Compila uma declaração de função."""
@@ -151,20 +426,20 @@ class PascalToVMCompiler:
             # Trata declaração forward apenas registrando a função
             func_name = func_decl[1]
             params = func_decl[2]
-            return_type = func_decl[3]
+            return_type = self.resolve_type(func_decl[3])
             self.functions[func_name] = {
                 'params': params,
                 'return_type': return_type,
-                'local_var_count': 0,  # Será atualizado quando a definição completa for compilada
+                'frame_size': 0,  # Será atualizado quando a definição completa for compilada
                 'param_count': sum(len(p[1]) for p in params) if params else 0,
                 'is_forward': True
             }
-            self.append_code(f'// Função forward declarada {func_name}')  # Adiciona ao buffer atual
+            self.emit_comment(f'Função forward declarada {func_name}')  # Adiciona ao buffer atual
             return
 
         func_name = func_decl[1]
         params_ast = func_decl[2]
-        return_type = func_decl[3]
+        return_type = self.resolve_type(func_decl[3])
         block = func_decl[4]
 
         # Registra informações da função
@@ -172,7 +447,7 @@ class PascalToVMCompiler:
             self.functions[func_name].update({
                 'params': params_ast,
                 'return_type': return_type,
-                'local_var_count': 0,  # Será calculado abaixo
+                'frame_size': 0,  # Será calculado abaixo
                 'param_count': sum(len(p[1]) for p in params_ast) if params_ast else 0,
                 'is_forward': False
             })
@@ -180,83 +455,12 @@ class PascalToVMCompiler:
             self.functions[func_name] = {
                 'params': params_ast,
                 'return_type': return_type,
-                'local_var_count': 0,
+                'frame_size': 0,
                 'param_count': sum(len(p[1]) for p in params_ast) if params_ast else 0,
                 'is_forward': False
             }
 
-        # Cria escopo da função na tabela de símbolos
-        self.symbol_table[func_name] = {}
-        self.current_scope = func_name
-
-        # Redireciona temporariamente a saída para o buffer de funções
-        original_code_buffer = self.current_code_buffer
-        self.current_code_buffer = self.function_code_buffer
-
-        # Adiciona rótulo da função
-        label_name = func_name
-        self.append_code(f'\n// Função {func_name}')
-        self.append_code(f'{label_name}:')
-
-        # Calcula contagem de variáveis locais e atribui offsets
-        local_offset_map = {}
-        current_local_offset = 0  # Começa de FP[0] para variáveis locais
-
-        # Processa parâmetros e atribui offsets negativos
-        param_offset_counter = -1  # Começa de FP[-1]
-        if params_ast:
-            for param_decl_item in params_ast:  # param_decl_item é como ('param_declaration', ['bin'], 'string')
-                param_names = param_decl_item[1]
-                param_data_type = param_decl_item[2]  # Obtém o tipo aqui
-                for name in param_names:
-                    # Armazena tipo junto com ('param', offset)
-                    self.symbol_table[func_name][name] = ('param', param_offset_counter, param_data_type)
-                    self.debug_print(f"  Parâmetro {name} ({param_data_type}) com offset {param_offset_counter}")
-                    param_offset_counter -= 1  # Decrementa para o próximo parâmetro
-
-        # Processa declarações de variáveis locais dentro do bloco da função
-        if block and len(block) > 1 and block[1] and block[1][0] == 'declarations':
-            for decl_item in block[1][1]:
-                if decl_item[0] == 'var_declarations':
-                    for var_decl_item in decl_item[1]:
-                        if var_decl_item[0] == 'var_declaration':
-                            var_names = var_decl_item[1]
-                            var_data_type = var_decl_item[2]  # Obtém o tipo aqui
-                            for name in var_names:
-                                # Atribui offsets específicos para estas variáveis conforme saída desejada
-                                if name == 'i':
-                                    self.symbol_table[func_name][name] = ('var', 0, var_data_type)
-                                    local_offset_map['i'] = 0
-                                elif name == 'valor':
-                                    self.symbol_table[func_name][name] = ('var', 1, var_data_type)
-                                    local_offset_map['valor'] = 1
-                                elif name == 'potencia':
-                                    self.symbol_table[func_name][name] = ('var', 2, var_data_type)
-                                    local_offset_map['potencia'] = 2
-                                else:
-                                    # Para outras variáveis locais, atribui sequencialmente
-                                    self.symbol_table[func_name][name] = ('var', current_local_offset, var_data_type)
-                                    local_offset_map[name] = current_local_offset
-                                self.debug_print(f"  Variável local {name} ({var_data_type}) com offset {self.symbol_table[func_name][name][1]}")
-                                current_local_offset += 1
-
-        self.symbol_table[func_name][func_name] = ('retval', local_offset_map.get('valor', 1), return_type)
-
-        # O número total de variáveis locais para alocar espaço é 3 (i, valor, potencia)
-        self.functions[func_name]['local_var_count'] = len(local_offset_map)
-
-        self.append_code(f'PUSHN {self.functions[func_name]["local_var_count"]} // Aloca espaço para variáveis locais e valor de retorno')
-
-        # Compila corpo da função - agora adiciona ao function_code_buffer
-        self.compile_compound_statement(block[2])  # block[2] é o bloco de comandos
-
-        self.current_scope = 'global'  # Reseta escopo
-
-        # Epílogo da função
-        self.append_code('RETURN')  # Usa RETURN em maiúsculas como no exemplo
-
-        # Restaura buffer de código original
-        self.current_code_buffer = original_code_buffer
+        self.compile_routine(func_name, params_ast, return_type, block, f'Função {func_name}')
 
     def compile_procedure_declaration(self, proc_decl):
         """Compila uma declaração de procedimento."""
@@ -267,11 +471,11 @@ class PascalToVMCompiler:
             self.functions[proc_name] = {
                 'params': params,
                 'return_type': None,
-                'local_var_count': 0,
+                'frame_size': 0,
                 'param_count': sum(len(p[1]) for p in params) if params else 0,
                 'is_forward': True
             }
-            self.append_code(f'// Procedimento forward declarado {proc_name}')  # Adiciona ao buffer atual
+            self.emit_comment(f'Procedimento forward declarado {proc_name}')  # Adiciona ao buffer atual
             return
 
         proc_name = proc_decl[1]
@@ -282,7 +486,7 @@ class PascalToVMCompiler:
         if proc_name in self.functions and self.functions[proc_name].get('is_forward'):
             self.functions[proc_name].update({
                 'params': params_ast,
-                'local_var_count': 0,  # Será calculado abaixo
+                'frame_size': 0,  # Será calculado abaixo
                 'param_count': sum(len(p[1]) for p in params_ast) if params_ast else 0,
                 'is_forward': False
             })
@@ -290,141 +494,156 @@ class PascalToVMCompiler:
             self.functions[proc_name] = {
                 'params': params_ast,
                 'return_type': None,
-                'local_var_count': 0,
+                'frame_size': 0,
                 'param_count': sum(len(p[1]) for p in params_ast) if params_ast else 0,
                 'is_forward': False
             }
 
-        # Cria escopo do procedimento
-        self.symbol_table[proc_name] = {}
-        self.current_scope = proc_name
+        self.compile_routine(proc_name, params_ast, None, block, f'Procedimento {proc_name}')
+
+    def compile_routine(self, name, params_ast, return_type, block, title):
+        """
+        Compila o corpo de uma função (return_type definido) ou procedimento para o buffer de
+        funções. A disposição do frame (parâmetros, valor de retorno, variáveis locais e
+        temporários) é calculada pelo FrameLayout depois de resolvidas as referências do corpo.
+        """
+        # Cria escopo da rotina na tabela de símbolos
+        scope = self.scope = self.symbol_table[name] = Scope(name, self.global_scope)
+        frame = self.frame = FrameLayout(name, reuse=self.reuse_slots)
+        global_types = self.types
+        self.types = dict(global_types)  # Os tipos declarados na rotina são locais
 
         # Redireciona temporariamente a saída para o buffer de funções
         original_code_buffer = self.current_code_buffer
         self.current_code_buffer = self.function_code_buffer
 
-        self.append_code(f'\n// Procedimento {proc_name}')
-        self.append_code(f'{proc_name}:')
+        self.emit_comment('')
+        self.emit_comment(title)
+        self.emit_label(name)
 
-        # Calcula contagem de variáveis locais e atribui offsets
-        local_offset_counter = 0  # Variáveis locais começam de FP[0]
-        param_offset_start = -self.functions[proc_name]['param_count']
-        param_index = 0
         if params_ast:
-            for param_type, param_names, param_data_type in params_ast:
-                for name in param_names:
-                    param_vm_offset = -(self.functions[proc_name]['param_count'] - param_index)
-                    self.symbol_table[proc_name][name] = ('param', param_vm_offset, param_data_type)  # Armazena tipo
-                    self.debug_print(f"  Parâmetro {name} ({param_data_type}) com offset {param_vm_offset}")
-                    param_index += 1
-
-        # Itera através das declarações de variáveis dentro do bloco do procedimento
-        if block and len(block) > 1 and block[1] and block[1][0] == 'declarations':
-            for decl_item in block[1][1]:
-                if decl_item[0] == 'var_declarations':
-                    for var_decl_item in decl_item[1]:
-                        if var_decl_item[0] == 'var_declaration':
-                            var_names = var_decl_item[1]
-                            var_data_type = var_decl_item[2]  # Obtém o tipo
-                            for name in var_names:
-                                self.symbol_table[proc_name][name] = ('var', local_offset_counter, var_data_type)  # Armazena tipo
-                                self.debug_print(f"  Variável local {name} ({var_data_type}) com offset {local_offset_counter}")
-                                local_offset_counter += 1
+            for param_decl in params_ast:  # ValParam/VarParam com os nomes e o tipo
+                # Os arrays e registos são passados por endereço: o parâmetro guarda o endereço
+                param_decl.type = self.resolve_type(param_decl.type)
+                for param_name in param_decl.names:
+                    frame.add_param(scope.define(param_name, 'param', type=param_decl.type))
 
-        self.functions[proc_name]['local_var_count'] = local_offset_counter
-        self.append_code(f'PUSHN {self.functions[proc_name]["local_var_count"]} // Aloca espaço para variáveis locais')
+        if return_type is not None:
+            # O resultado fica na célula reservada pelo chamador, acessível pelo nome da função
+            frame.set_result(scope.define(name, 'retval', type=return_type))
 
-        # Compila corpo do procedimento - agora adiciona ao function_code_buffer
-        self.compile_compound_statement(block[3])
-
-        self.current_scope = 'global'  # Reseta escopo
-        self.append_code('RETURN')
+        # Processa as declarações de constantes e variáveis locais dentro do bloco da rotina
+        declarations = block[1]
+        if declarations is not None and declarations[0] == 'declarations':
+            for decl_item in declarations[1]:
+                if decl_item[0] == 'const_declarations':
+                    self.compile_const_declarations(decl_item[1], scope)
+                elif decl_item[0] == 'type_declarations':
+                    self.compile_type_declarations(decl_item[1])
+                elif decl_item[0] == 'var_declarations':
+                    for var_decl_item in decl_item[1]:
+                        if var_decl_item[0] == 'var_declaration':
+                            var_decl_item.type = self.resolve_type(var_decl_item.type)
+                            for var_name in var_decl_item.names:
+                                frame.add_local(scope.define(var_name, 'var', type=var_decl_item.type))
+
+        body = block[2]
+        resolve(body, scope)
+        check_types(body, self.functions)
+        frame.allocate(body)
+        for symbol in scope.symbols.values():
+            if symbol.kind != 'const':
+                self.debug_print("  %s %s (%s) com offset %s", symbol.kind, symbol.name, symbol.type, symbol.offset)
+
+        # O tamanho do frame só fica completo depois do corpo (temporários), por isso o PUSHN e os
+        # POP dos epílogos são ajustados no fim
+        prologue = Instr(Op.PUSHN, 0)
+        prologue_index = len(self.current_code_buffer)
+        self.append_code(prologue)
+        self.frame_pops = []
+        self.tail_calls = tail_calls(body, name, return_type is not None) if self.optimize_tail_calls else set()
+        self.routine_start = None
+        if self.tail_calls:
+            self.routine_start = self.generate_label('RoutineStart')
+            self.emit_label(self.routine_start)
+
+        self.compile_compound_statement(body)
+        if not terminates(body):
+            self.emit_epilogue()
+
+        if self.inline_budget:
+            # Tamanho do corpo para o modelo de custo da expansão: sem o prólogo e os epílogos
+            overhead = set(map(id, self.frame_pops))
+            overhead.add(id(prologue))
+            size = sum(1 for item in self.current_code_buffer[prologue_index:]
+                       if type(item) is Instr and item.op is not Op.RETURN and id(item) not in overhead)
+            template = inline_template(frame, body, size)
+            if template is not None and inline_cost(template) <= self.inline_budget:
+                template['key'] = None
+                self.inlinable[name] = template
+                self.debug_print("Rotina %s expansível (custo %s)", name, inline_cost(template))
+
+        if frame.size:
+            prologue.arg = frame.size
+            if self.comments:
+                prologue.comment = f'Frame: {frame.size} células para variáveis locais e temporários'
+            for pop in self.frame_pops:
+                pop.arg = frame.size
+        else:
+            removed = set(map(id, self.frame_pops))
+            removed.add(id(prologue))
+            self.current_code_buffer[prologue_index:] = [item for item in self.current_code_buffer[prologue_index:]
+                                                         if id(item) not in removed]
+        self.functions[name]['frame_size'] = frame.size
+        self.debug_print("Frame %s", frame.report())
+
+        self.scope = self.global_scope  # Reseta escopo
+        self.frame = None
+        self.types = global_types
+        self.tail_calls = set()
+        self.frame_pops = []
 
         # Restaura buffer de código original
         self.current_code_buffer = original_code_buffer
 
+    def emit_epilogue(self):
+        """
+        Fim de uma rotina: liberta o frame (o resultado de uma função já está na célula reservada
+        pelo chamador) e volta ao chamador. Ver a convenção de chamada em frame.FrameLayout.
+        Numa rotina expandida no ponto de chamada, salta para o fim da expansão.
+        """
+        if self.inline_exit is not None:
+            self.emit(Op.JUMP, self.inline_exit, f'Fim de {self.scope.name} (expandida)')
+            return
+        pop = Instr(Op.POP, 0, 'Liberta o frame' if self.comments else None)
+        self.frame_pops.append(pop)
+        self.append_code(pop)
+        self.emit(Op.RETURN)
+
     def compile_var_declaration(self, var_decl):
-        """Compila uma declaração de variável."""
-        if not isinstance(var_decl, tuple) or len(var_decl) < 3:
+        """Compila uma declaração de variável global."""
+        if not isinstance(var_decl, Node) or len(var_decl) < 3:
             print(f"Erro: Estrutura de declaração de variável inválida: {var_decl}")
             return
 
         if var_decl[0] == 'var_declaration':
             _, var_names, type_spec = var_decl
 
-            self.debug_print(f"Nomes de variáveis: {var_names}")
-            self.debug_print(f"Especificação de tipo: {type_spec}")
+            self.debug_print("Nomes de variáveis: %s", var_names)
+            self.debug_print("Especificação de tipo: %s", type_spec)
 
-            if isinstance(type_spec, tuple) and type_spec[0] == 'array':
-                # Extrai limites e tipo do array
-                bounds = type_spec[1]
-                element_type = type_spec[2]  # Tipo do elemento (ex: 'integer', 'char')
-
-                lower_bound = bounds[0]
-                upper_bound = bounds[1]
-
-                if isinstance(var_names, list):
-                    for var_name in var_names:
-                        self.declare_array(var_name, lower_bound, upper_bound, element_type)
-                else:
-                    self.declare_array(var_names, lower_bound, upper_bound, element_type)
-            else:
-                # Declaração de variável regular
-                data_type = type_spec  # O tipo é diretamente a string (ex: 'integer', 'string')
-                if isinstance(var_names, list):
-                    for var_name in var_names:
-                        self.declare_variable(var_name, data_type)
-                else:
-                    self.declare_variable(var_names, data_type)
+            var_decl.type = data_type = self.resolve_type(type_spec)
+            for var_name in var_names:
+                self.declare_variable(var_name, data_type)
 
     def declare_variable(self, var_name, data_type):
-        """Método auxiliar para declarar uma variável regular."""
-        if self.current_scope == 'global':
-            # Armazena tipo na tabela de símbolos
-            self.symbol_table['global'][var_name] = ('var', self.var_offset, data_type)
-            self.debug_print(f"Variável global declarada: {var_name} ({data_type}) no offset {self.var_offset}")
-            self.var_offset += 1
-        else:
-            if var_name not in self.symbol_table[self.current_scope]:
-                print(f"Erro: Variável local {var_name} não tem offset pré-atribuído no escopo {self.current_scope}")
-            else:
-                # Atualiza tipo se for uma entrada genérica 'var' sem tipo específico ainda
-                current_info = self.symbol_table[self.current_scope][var_name]
-                if len(current_info) == 2:  # Se apenas (tipo, offset)
-                    self.symbol_table[self.current_scope][var_name] = (current_info[0], current_info[1], data_type)
-            self.debug_print(f"Variável local declarada: {var_name} ({data_type}) no escopo {self.current_scope}")
-
-    def declare_array(self, array_name, lower_bound, upper_bound, element_type):
-        """Declara um array na tabela de símbolos e rastreia suas informações."""
-        size = upper_bound - lower_bound + 1
-
-        if self.current_scope == 'global':
-            # Adiciona à tabela de símbolos (como uma variável normal, armazenará endereço base)
-            # Armazena o tipo geral como 'array' e o tipo do elemento
-            self.symbol_table['global'][array_name] = ('var', self.var_offset, 'array', element_type)
-
-            # Armazena informações do array para alocação posterior
-            self.array_info[array_name] = {
-                'lower_bound': lower_bound,
-                'upper_bound': upper_bound,
-                'element_type': element_type,  # Tipo dos elementos dentro do array
-                'base_offset': self.var_offset,
-                'size': size
-            }
-
-            self.debug_print(f"Array global declarado: {array_name} (tipo_elemento={element_type}) no offset {self.var_offset}"
-                             f"(tamanho={size}, limites={lower_bound}..{upper_bound})")
-            self.var_offset += 1
-        else:
-            # Arrays locais (não totalmente implementados neste modelo simplificado de VM)
-            print("Aviso: Arrays locais não são totalmente suportados neste modelo de compilador.")
-            if array_name not in self.symbol_table[self.current_scope]:
-                print(f"Erro: Array local {array_name} não tem offset pré-atribuído no escopo {self.current_scope}")
-            else:
-                current_info = self.symbol_table[self.current_scope][array_name]
-                if len(current_info) == 2:  # Se apenas (tipo, offset)
-                    self.symbol_table[self.current_scope][array_name] = (current_info[0], current_info[1], 'array', element_type)
-            self.debug_print(f"Array local declarado: {array_name} (tipo_elemento={element_type}) no escopo {self.current_scope}")
+        """
+        Declara uma variável global. Arrays e registos ocupam células contíguas da área global
+        (reservada com PUSHN antes de START), a partir do offset da variável.
+        """
+        self.global_scope.define(var_name, 'var', self.var_offset, data_type)
+        self.debug_print("Variável global declarada: %s (%s) no offset %s", var_name, data_type, self.var_offset)
+        self.var_offset += type_size(data_type)
 
     def compile_compound_statement(self, compound_stmt):
         """Compila um bloco de comandos (BEGIN...END)."""
@@ -435,17 +654,21 @@ class PascalToVMCompiler:
         _, stmt_list = compound_stmt
 
         if stmt_list:
-            for stmt in stmt_list:
+            for position, stmt in enumerate(stmt_list):
                 if stmt is None:
                     print("Aviso: Ignorando comando None")
                     continue
                 try:
-                    self.debug_print(f"Compilando comando: {stmt}")
+                    self.debug_print("Compilando comando: %s", stmt)
                     self.compile_statement(stmt)
                 except Exception as e:
                     print(f"Erro compilando comando {stmt}: {str(e)}")
                     import traceback
                     traceback.print_exc()
+                if self.eliminate_dead_code and terminates(stmt):
+                    # Os comandos seguintes (depois de RETURN, EXIT, BREAK, CONTINUE) nunca são executados
+                    self.dead_code['comandos'] += sum(1 for item in stmt_list[position + 1:] if item is not None)
+                    break
 
     def compile_statement(self, stmt):
         """Compila um único comando."""
@@ -453,12 +676,15 @@ class PascalToVMCompiler:
             print("Erro: Não é possível compilar comando None")
             return
 
-        if not isinstance(stmt, tuple) or len(stmt) == 0:
+        if isinstance(stmt, (int, float, str)):
+            # Chamada a uma função predefinida já avaliada pelo ConstantFolder: o valor é descartado
+            return
+        if not isinstance(stmt, Node) or len(stmt) == 0:
             print(f"Erro: Estrutura de comando inválida: {stmt}")
             return
 
-        stmt_type = stmt[0]
-        self.debug_print(f"Tipo de comando: {stmt_type}")
+        stmt_type = stmt.kind
+        self.debug_print("Tipo de comando: %s", stmt_type)
 
         try:
             if stmt_type == 'assign':
@@ -482,6 +708,10 @@ class PascalToVMCompiler:
                 self.compile_compound_statement(stmt)
             elif stmt_type == 'return':
                 self.compile_return(stmt)
+            elif stmt_type in ('break', 'continue'):
+                self.compile_loop_jump(stmt_type)
+            elif stmt_type == 'exit':
+                self.compile_exit()
             else:
                 print(f"Aviso: Tipo de comando desconhecido: {stmt_type}")
         except Exception as e:
@@ -496,104 +726,244 @@ class PascalToVMCompiler:
             return
 
         _, var_target, expr = assign_stmt
+        target_type = type_of(var_target)
 
-        # Compila a expressão do lado direito
-        self.compile_expression(expr)
+        if var_target.kind == 'array_access' and self.is_string_access(var_target):
+            self.compile_string_assignment(var_target, lambda: self.compile_value(expr, target_type))
+            return
 
-        if var_target[0] == 'array_access':
-            # Trata tanto arrays quanto atribuição de caracteres em strings
-            self.compile_array_assignment(var_target)
+        if var_target.kind in ('array_access', 'field_access'):
+            self.store_element(var_target, lambda: self.compile_value(expr, target_type))
             return
 
         # Trata atribuição simples de variável
-        if var_target[0] == 'var':
-            var_name = var_target[1]
-
-            # Caso especial: atribuindo ao valor de retorno da função
-            if self.current_scope != 'global' and var_name == self.current_scope:
-                return
-
-            # Procura variável no escopo atual, depois no global
-            if self.current_scope != 'global' and var_name in self.symbol_table[self.current_scope]:
-                var_info = self.symbol_table[self.current_scope][var_name]
-                if var_info[0] in ['var', 'param', 'retval']:  # Não pode atribuir a uma constante
-                    offset = var_info[1]
-                    self.append_code(f'STOREL {offset} // {var_name}')
-                else:
-                    print(f"Erro: Não é possível atribuir a {var_info[0]} {var_name}")
-            elif var_name in self.symbol_table['global']:
-                var_info = self.symbol_table['global'][var_name]
-                if var_info[0] == 'var':
-                    offset = var_info[1]
-                    self.append_code(f'STOREG {offset} // {var_name}')
-                else:
-                    print(f"Erro: Não é possível atribuir a {var_info[0]} {var_name}")
-            else:
+        if var_target.kind == 'var':
+            var_name = var_target.name
+            symbol = var_target.symbol
+            if symbol is None:
                 print(f"Erro: Variável {var_name} não encontrada para atribuição")
+            elif symbol.kind == 'const':  # Não pode atribuir a uma constante
+                print(f"Erro: Não é possível atribuir a {symbol.kind} {var_name}")
+            elif isinstance(symbol.type, (ArrayType, RecordType)):
+                print(f"Erro: Atribuição de um array/registo inteiro ({var_name}) não suportada")
+            elif expr in self.tail_calls:
+                self.compile_function_call(expr)  # F := F(...) no fim da função
+            else:
+                self.compile_value(expr, target_type)
+                self.emit(symbol.store_op, symbol.offset, var_name)
 
-    def compile_array_assignment(self, array_expr):
+    def compile_string_assignment(self, array_expr, compile_value):
         """
-        Compila atribuição a um elemento de array ou caractere de string.
-        Assume que o valor a ser armazenado já está no topo da pilha.
+        Compila a atribuição de um caractere de uma string (s[i] := c), com o valor empilhado
+        por compile_value(): a EWVM não altera strings, por isso s passa a ser a string devolvida
+        pela rotina setchar da biblioteca.
         """
-        if len(array_expr) != 3:
-            print(f"Erro: Acesso a array inválido para atribuição: {array_expr}")
-            return
+        def compile_setchar():
+            self.library.add('setchar')
+            self.emit(Op.PUSHI, 0, 'Resultado de setchar')
+            self.compile_string_base(array_expr)
+            self.compile_expression(array_expr.index)
+            compile_value()
+            self.emit(Op.PUSHA, Label('setchar'))
+            self.emit(Op.CALL)
+            self.emit(Op.POP, 3, 'Descarta os argumentos')
+
+        if type(array_expr.name) is str:
+            compile_setchar()
+            symbol = array_expr.symbol
+            self.emit(symbol.store_op, symbol.offset, array_expr.name)
+        else:
+            self.store_element(array_expr.name, compile_setchar)
+
+    def is_string_access(self, array_expr):
+        """Se o acesso indexado é a um caractere de uma string (CHARAT, ou setchar na atribuição)."""
+        if type(array_expr.name) is str:
+            symbol = array_expr.symbol
+            return symbol is not None and symbol.type == 'string'
+        return type_of(array_expr.name) == 'string'
+
+    def compile_string_base(self, array_expr):
+        """Empilha a string de um acesso a um caractere."""
+        if type(array_expr.name) is str:
+            symbol = array_expr.symbol
+            self.emit(symbol.load_op, symbol.offset, array_expr.name)
+        else:
+            self.compile_expression(array_expr.name)
 
-        _, array_name, index_expr = array_expr
-
-        is_string_access = False
-        var_found = False
-        var_info = None
-
-        # Empilha o endereço base do array
-        # Procura variável no escopo atual, depois no global
-        if self.current_scope != 'global' and array_name in self.symbol_table[self.current_scope]:
-            var_info = self.symbol_table[self.current_scope][array_name]
-            if var_info[0] == 'var' or var_info[0] == 'param':
-                offset = var_info[1]
-                self.append_code(f'PUSHL {offset} // Endereço base do array (local/parâmetro)')
-                var_found = True
-        elif array_name in self.symbol_table['global']:
-            var_info = self.symbol_table['global'][array_name]
-            if var_info[0] == 'var':
-                offset = var_info[1]
-                self.append_code(f'PUSHG {offset} // Endereço base do array (global)')
-                var_found = True
+    def element_location(self, expr, report=True):
+        """
+        Localização de uma variável, elemento de array ou campo de registo na memória:
+        (símbolo da variável, deslocamento constante, [(expressão de índice, passo, limites)], tipo).
+        Os arrays e registos são contíguos, por isso o endereço é a base da variável mais o
+        deslocamento constante mais a soma dos índices dinâmicos multiplicados pelo passo.
+        Os índices constantes são verificados e somados já em compilação; os limites de cada
+        índice dinâmico são os valores que ele pode ter (os declarados, menos a constante de a[i + c]).
+        Devolve None, depois de reportar o erro (se report), se a referência não for válida.
+        """
+        kind = expr.kind
+        if kind == 'var' or (kind == 'array_access' and type(expr.name) is str):
+            symbol = expr.symbol
+            if symbol is None:
+                return self.location_error(report, f"Erro: Variável {expr.name} não encontrada")
+            if symbol.kind not in ('var', 'param', 'retval'):
+                return self.location_error(report, f"Erro: {symbol.kind} {expr.name} não é uma variável")
+            if kind == 'var':
+                return symbol, 0, [], symbol.type
+            location = (symbol, 0, [], symbol.type)
+        elif kind == 'array_access':
+            location = self.element_location(expr.name, report)
+        elif kind == 'field_access':
+            location = self.element_location(expr.record, report)
+            if location is None:
+                return None
+            symbol, offset, terms, record = location
+            field = field_offset(record, expr.field) if isinstance(record, RecordType) else None
+            if field is None:
+                return self.location_error(report, f"Erro: Campo {expr.field} inválido")
+            return symbol, offset + field[0], terms, field[1]
+        else:
+            return self.location_error(report, f"Erro: {kind} não é uma variável")
+
+        if location is None:
+            return None
+        symbol, offset, terms, array = location
+        if not isinstance(array, ArrayType):
+            return self.location_error(report, f"Erro: {symbol.name} não é um array")
+        lower, upper = array.bounds
+        stride = type_size(array.element_type)
+        index = expr.index
+        if type(index) is int:
+            if not lower <= index <= upper and report:
+                print(f"Erro: Índice {index} fora dos limites [{lower}..{upper}] de {symbol.name}")
+            offset += (index - lower) * stride
         else:
-            print(f"Erro: Array/string {array_name} não encontrado para atribuição.")
+            # a[i + c] e a[i - c]: a constante entra no deslocamento, como se i indexasse um
+            # array com os limites deslocados de -c
+            if type(index) is BinaryOp and index.op in ('+', '-') and type(index.right) is int:
+                constant = index.right if index.op == '+' else -index.right
+                lower, upper = lower - constant, upper - constant
+                index = index.left
+            offset -= lower * stride
+            terms = terms + [(index, stride, (lower, upper))]
+        return symbol, offset, terms, array.element_type
+
+    @staticmethod
+    def location_error(report, msg):
+        if report:
+            print(msg)
+        return None
+
+    def push_location(self, symbol, offset, terms, check=True):
+        """
+        Empilha o endereço base da variável e o deslocamento do elemento, como esperado por
+        LOADN/STOREN. Os arrays e registos passados como parâmetro guardam o seu endereço.
+        Com check_bounds, cada índice é verificado (se check) antes de ser multiplicado pelo passo.
+        """
+        if symbol.kind == 'param':
+            self.emit(Op.PUSHL, symbol.offset, f'Endereço de {symbol.name} (parâmetro)')
+        else:
+            self.emit(Op.PUSHFP if symbol.local else Op.PUSHGP)
+            offset += symbol.offset
+        for count, (index, stride, bounds) in enumerate(terms):
+            self.compile_expression(index)
+            if check and self.needs_bounds_check(index, bounds):
+                self.emit(Op.CHECK, bounds, 'Verifica os limites do índice')
+            if stride != 1:
+                self.emit(Op.PUSHI, stride)
+                self.emit(Op.MUL)
+            if count:
+                self.emit(Op.ADD)
+        if not terms:
+            self.emit(Op.PUSHI, offset)
+        elif offset:
+            self.emit(Op.PUSHI, offset)
+            self.emit(Op.ADD)
+
+    def needs_bounds_check(self, index, bounds):
+        """
+        Se, com check_bounds, o índice tem de ser verificado em execução (CHECK): não tem se a
+        análise de intervalos provar que está sempre dentro dos limites (ranges.value_range).
+        """
+        if not self.check_bounds:
+            return False
+        if self.range_analysis and within(value_range(index, self.ranges), *bounds):
+            self.bounds_checks['eliminadas'] += 1
+            return False
+        self.bounds_checks['emitidas'] += 1
+        return True
+
+    def emit_index_checks(self, terms):
+        """Verifica os índices de um acesso feito pelo endereço da redução de força."""
+        for index, _, bounds in terms:
+            if self.needs_bounds_check(index, bounds):
+                self.compile_expression(index)
+                self.emit(Op.CHECK, bounds, 'Verifica os limites do índice')
+                self.emit(Op.POP, 1)
+
+    def compile_element(self, expr):
+        """
+        Empilha o valor de um elemento de array ou campo de registo; se o elemento for
+        também um array/registo, empilha o seu endereço.
+        """
+        location = self.element_location(expr)
+        if location is None:
             return
+        symbol, offset, terms, element_type = location
+        if isinstance(element_type, (ArrayType, RecordType)):
+            if symbol.kind == 'param' and not terms and not offset:
+                self.emit(Op.PUSHL, symbol.offset, f'Endereço de {symbol.name} (parâmetro)')
+            else:
+                self.push_location(symbol, offset, terms)
+                self.emit(Op.PADD, comment='Endereço do elemento')
+        elif not terms and symbol.kind != 'param':
+            # Posição conhecida em compilação: acesso direto à célula
+            self.emit(symbol.load_op, symbol.offset + offset, self.element_name(expr))
+        elif self.induction and self.location_key(symbol, terms) in self.induction:
+            temp, base = self.induction[self.location_key(symbol, terms)]
+            self.emit_index_checks(terms)
+            self.emit(self.frame.load_op, temp, 'Endereço do elemento (redução de força)')
+            self.emit(Op.LOAD, offset - base, self.element_name(expr))
+        else:
+            self.push_location(symbol, offset, terms)
+            self.emit(Op.LOADN, comment=self.element_name(expr))
 
-        if not var_found:
+    def store_element(self, target, compile_value):
+        """Guarda num elemento de array ou campo de registo o valor empilhado por compile_value()."""
+        location = self.element_location(target)
+        if location is None:
             return
-
-        # Determina se é uma string para CHARSET, ou array geral para STORE
-        # Verifica tipo na tabela de símbolos
-        if var_info and len(var_info) > 2:  # Verifica se existe informação de tipo (ex: ('param', offset, tipo))
-            data_type = var_info[2]
-            if data_type == 'string' or data_type == 'char':  # Trata char único como string para CHARSET
-                is_string_access = True
-            elif data_type == 'array' and len(var_info) > 3 and var_info[3] == 'char':  # Se for array de char
-                 is_string_access = True
-
-        # Compila a expressão de índice
-        self.compile_expression(index_expr)
-
-        # Ajusta índice para indexação 1-based do Pascal para 0-based da VM
-        self.append_code('PUSHI 1')
-        self.append_code('SUB // Ajusta índice para indexação 1-based do Pascal')
-
-        if is_string_access:
-            # Valor para armazenar está no topo, depois endereço da string, depois índice.
-            # Precisa reordenar para CHARSET: endereço da string, índice, valor
-            self.append_code('SWAP // Troca valor e endereço da string (pilha: índice, valor, str_addr)')
-            self.append_code('SWAP // Troca valor e índice (pilha: valor, índice, str_addr)')
-            self.append_code('CHARSET // Armazena caractere no endereço calculado na string')
+        symbol, offset, terms, element_type = location
+        if isinstance(element_type, (ArrayType, RecordType)):
+            print(f"Erro: Atribuição de um array/registo inteiro ({symbol.name}) não suportada")
+        elif not terms and symbol.kind != 'param':
+            compile_value()
+            self.emit(symbol.store_op, symbol.offset + offset, self.element_name(target))
+        elif self.induction and self.location_key(symbol, terms) in self.induction:
+            temp, base = self.induction[self.location_key(symbol, terms)]
+            self.emit_index_checks(terms)
+            self.emit(self.frame.load_op, temp, 'Endereço do elemento (redução de força)')
+            compile_value()
+            self.emit(Op.STORE, offset - base, self.element_name(target))
         else:
-            # Para arrays gerais, calcula endereço do elemento usando aritmética de ponteiros
-            self.append_code('PADD // Calcula endereço do elemento (pilha: valor, addr)')
-            self.append_code('SWAP // Troca valor e endereço (pilha: addr, valor)')
-            self.append_code('STORE 0 // Armazena valor no endereço calculado')
+            self.push_location(symbol, offset, terms)
+            compile_value()
+            self.emit(Op.STOREN, comment=self.element_name(target))
+
+    @staticmethod
+    def location_key(symbol, terms):
+        """Identifica os acessos com o mesmo endereço a menos do deslocamento constante."""
+        return symbol, tuple((repr(index), stride) for index, stride, _ in terms)
+
+    def element_name(self, expr):
+        """Texto de um elemento (a[...], r.campo) para os comentários do código VM."""
+        if not self.comments:
+            return None
+        if expr.kind == 'field_access':
+            return f'{self.element_name(expr.record)}.{expr.field}'
+        if expr.kind == 'array_access':
+            base = expr.name if type(expr.name) is str else self.element_name(expr.name)
+            return f'{base}[...]'
+        return expr.name
 
     def compile_expression(self, expr):
         """Compila uma expressão."""
@@ -601,43 +971,63 @@ class PascalToVMCompiler:
             print("Erro: Não é possível compilar expressão None")
             return
 
-        self.debug_print(f"Tipo de expressão: {type(expr)}")
+        self.debug_print("Tipo de expressão: %s", type(expr))
+
+        if self.hoisted and expr in self.hoisted:
+            # Expressão invariante calculada antes do ciclo
+            self.emit(self.frame.load_op, self.hoisted[expr], 'Expressão invariante do ciclo')
+            return
 
-        if isinstance(expr, tuple):
-            self.debug_print(f"Expressão em tupla: {expr[0]}")
-            if expr[0] == 'binary_op':
+        if isinstance(expr, Node):
+            kind = expr.kind
+            self.debug_print("Expressão em tupla: %s", kind)
+            if kind == 'binary_op':
                 self.compile_binary_operation(expr)
-            elif expr[0] == 'unary_op':
+            elif kind == 'unary_op':
                 self.compile_unary_operation(expr)
-            elif expr[0] == 'var':
+            elif kind == 'var':
                 self.compile_variable(expr)
-            elif expr[0] == 'function_call':
-                # Tratamento especial para funções built-in como 'length'
-                func_name = expr[1]
-                if func_name == 'length':
-                    self.compile_length_function(expr)
-                else:
-                    self.compile_function_call(expr, is_statement=False)
-            elif expr[0] == 'array_access':
+            elif kind == 'function_call':
+                self.compile_function_call(expr, is_statement=False)
+            elif kind == 'array_access':
                 self.compile_array_access(expr)
+            elif kind == 'field_access':
+                self.compile_element(expr)
             else:
-                print(f"Aviso: Tipo de expressão desconhecido: {expr[0]}")
+                print(f"Aviso: Tipo de expressão desconhecido: {kind}")
         else:
-            # Trata literais
-            if isinstance(expr, int):
-                self.append_code(f'PUSHI {expr}')
+            # Trata literais (bool antes de int: bool é subclasse de int)
+            if isinstance(expr, bool):
+                self.emit(Op.PUSHI, 1 if expr else 0)
+            elif isinstance(expr, int):
+                self.emit(Op.PUSHI, expr)
             elif isinstance(expr, float):
-                self.append_code(f'PUSHF {expr}')
+                self.emit(Op.PUSHF, expr)
             elif isinstance(expr, str):
-                if expr.lower() in ['true', 'false']:
-                    val = 1 if expr.lower() == 'true' else 0
-                    self.append_code(f'PUSHI {val}')
+                # Para literais de caractere como '1', empurra seu valor ASCII
+                if len(expr) == 1:
+                    self.emit(Op.PUSHI, ord(expr))
                 else:
-                    # Para literais de caractere como '1', empurra seu valor ASCII
-                    if len(expr) == 1:
-                        self.append_code(f'PUSHI {ord(expr)}')
-                    else:
-                        self.append_code(f'PUSHS "{expr}"')
+                    self.emit(Op.PUSHS, expr)
+
+    def compile_value(self, expr, target_type):
+        """
+        Compila uma expressão cujo valor vai ser usado como target_type, com as conversões
+        implícitas do Pascal: integer -> real (ITOF) e literal char -> string (PUSHS).
+        """
+        if target_type is None:
+            self.compile_expression(expr)
+            return
+        source_type = type_of(expr)
+        if target_type == 'string' and source_type == 'char' and isinstance(expr, str):
+            self.emit(Op.PUSHS, expr)
+            return
+        if target_type == 'real' and source_type == 'integer' and not isinstance(expr, Node):
+            self.emit(Op.PUSHF, float(expr))  # Literal: a conversão é feita já em compilação
+            return
+        self.compile_expression(expr)
+        if target_type == 'real' and source_type == 'integer':
+            self.emit(Op.ITOF, comment='Converte inteiro para real')
 
     def compile_length_function(self, func_call_ast):
         """Compila uma chamada à função built-in length()."""
@@ -650,67 +1040,153 @@ class PascalToVMCompiler:
             print(f"Erro: length() espera exatamente um argumento, recebeu {len(args)}")
             return
 
-        # O argumento deve ser uma variável string
         arg_expr = args[0]
+        array = type_of(arg_expr)
+        if isinstance(array, ArrayType):
+            # O tamanho de um array é conhecido em compilação
+            lower, upper = array.bounds
+            self.emit(Op.PUSHI, upper - lower + 1, 'Número de elementos do array')
+            return
+        if array == 'char':
+            self.emit(Op.PUSHI, 1, 'Comprimento de um caractere')
+            return
+
+        # O argumento deve ser uma variável string
         self.compile_expression(arg_expr)  # Empilha o endereço da string
 
-        self.append_code('STRLEN // Obtém o comprimento da string')
+        self.emit(Op.STRLEN, comment='Obtém o comprimento da string')
 
-    def compile_array_access(self, array_expr):
-        """Compila acesso a um elemento de array ou caractere de string."""
-        if len(array_expr) != 3:
-            print(f"Erro: Acesso a array inválido: {array_expr}")
+    def compile_builtin_call(self, func_call_ast):
+        """
+        Compila uma chamada a uma função predefinida (intrinsics.BUILTINS) com as instruções da
+        EWVM que lhe correspondem, ou com uma chamada a uma rotina da biblioteca (pos, copy). As
+        chamadas com argumentos literais já foram avaliadas pelo ConstantFolder.
+        """
+        name, args = func_call_ast.name, func_call_ast.args
+        if BUILTINS[name].expected(len(args)) is None:
+            print(f"Erro: {name} não aceita {len(args)} argumentos")
             return
 
-        _, array_name, index_expr = array_expr
-
-        is_string_access = False
-        var_found = False
-        var_info = None
-
-        # Empilha o endereço base do array/string
-        # Procura variável no escopo atual, depois no global
-        if self.current_scope != 'global' and array_name in self.symbol_table[self.current_scope]:
-            var_info = self.symbol_table[self.current_scope][array_name]
-            if var_info[0] == 'var' or var_info[0] == 'param':
-                offset = var_info[1]
-                self.append_code(f'PUSHL {offset} // Endereço base do array/string (local/parâmetro)')
-                var_found = True
-        elif array_name in self.symbol_table['global']:
-            var_info = self.symbol_table['global'][array_name]
-            if var_info[0] == 'var':
-                offset = var_info[1]
-                self.append_code(f'PUSHG {offset} // Endereço base do array/string (global)')
-                var_found = True
+        if name == 'length':
+            self.compile_length_function(func_call_ast)
+        elif name == 'concat':
+            self.compile_concatenation(func_call_ast)
+        elif name == 'ord' or name == 'chr':
+            # Os caracteres e os booleanos já são inteiros (códigos ASCII) na VM
+            self.compile_expression(args[0])
+        elif name == 'upcase':
+            # c - 32 * (c >= 'a' and c <= 'z')
+            self.compile_expression(args[0])
+            self.emit(Op.DUP, 1)
+            self.emit(Op.DUP, 1)
+            self.emit(Op.PUSHI, ord('a'))
+            self.emit(Op.SUPEQ)
+            self.emit(Op.SWAP)
+            self.emit(Op.PUSHI, ord('z'))
+            self.emit(Op.INFEQ)
+            self.emit(Op.AND, comment='Se é uma letra minúscula')
+            self.emit(Op.PUSHI, ord('a') - ord('A'))
+            self.emit(Op.MUL)
+            self.emit(Op.SUB, comment='Converte para maiúscula')
+        elif name == 'inttostr':
+            self.compile_expression(args[0])
+            self.emit(Op.STRI, comment='Converte inteiro para string')
+        elif name == 'strtoint':
+            if self.is_char_code(args[0]):
+                # Um único dígito: o valor é o código ASCII menos o de '0'
+                self.compile_expression(args[0])
+                self.emit(Op.PUSHI, ord('0'))
+                self.emit(Op.SUB, comment='Converte dígito para inteiro')
+            else:
+                self.compile_expression(args[0])
+                self.emit(Op.ATOI, comment='Converte string para inteiro')
+        elif name == 'pos':
+            self.compile_pos(args)
+        elif name == 'copy':
+            self.compile_copy(args)
+
+    @staticmethod
+    def is_char_code(expr):
+        """Se expr é um char que não é literal: na VM é só um código ASCII, sem string equivalente."""
+        return type_of(expr) == 'char' and not isinstance(expr, str)
+
+    def compile_text(self, expr):
+        """Compila uma expressão usada como string (um literal char passa a PUSHS)."""
+        if self.is_char_code(expr):
+            print("Erro: um char que não é literal não pode ser usado como string "
+                  "(a EWVM não converte códigos ASCII em strings)")
+        self.compile_value(expr, 'string')
+
+    def compile_concatenation(self, expr):
+        """
+        Compila uma concatenação (+ sobre strings ou concat, encadeados) como uma sequência
+        de partes e um CONCAT por cada parte além da primeira. Os literais adjacentes já são
+        juntos em compilação, num só PUSHS, e os vazios desaparecem.
+        """
+        parts = concat_parts(expr)
+        if not parts:
+            self.emit(Op.PUSHS, '')
+            return
+        self.compile_text(parts[0])
+        for part in parts[1:]:
+            self.compile_text(part)
+            self.emit(Op.CONCAT, comment='Concatena as strings')
+
+    def compile_pos(self, args):
+        """
+        Compila pos(sub, s) como uma chamada à rotina pos da biblioteca, ou à poschar se sub
+        for um char que não é literal.
+        """
+        sub, text = args
+        routine = 'poschar' if self.is_char_code(sub) else 'pos'
+        self.library.add(routine)
+        self.emit(Op.PUSHI, 0, f'Resultado de {routine}')
+        if routine == 'poschar':
+            self.compile_expression(sub)
         else:
-            print(f"Erro: Array/string {array_name} não encontrado para acesso.")
+            self.compile_text(sub)
+        self.compile_text(text)
+        self.emit(Op.PUSHA, Label(routine))
+        self.emit(Op.CALL)
+        self.emit(Op.POP, 2, 'Descarta os argumentos')
+
+    def compile_copy(self, args):
+        """
+        Compila copy(s, index, count) como uma chamada à rotina copy da biblioteca. Com
+        argumentos literais é avaliada em compilação, mesmo sem fold.
+        """
+        folded = fold_builtin('copy', args)
+        if folded is not None:
+            self.compile_value(folded, 'string')
             return
+        text, index, count = args
+        self.library.add('copy')
+        self.emit(Op.PUSHI, 0, 'Resultado de copy')
+        self.compile_text(text)
+        self.compile_expression(index)
+        self.compile_expression(count)
+        self.emit(Op.PUSHA, Label('copy'))
+        self.emit(Op.CALL)
+        self.emit(Op.POP, 3, 'Descarta os argumentos')
 
-        if not var_found:
+    def compile_array_access(self, array_expr):
+        """Compila acesso a um elemento de array ou caractere de string."""
+        if len(array_expr) != 3:
+            print(f"Erro: Acesso a array inválido: {array_expr}")
             return
 
-        # Determina se é uma string para CHARAT, ou array geral para LOAD
-        # Verifica tipo na tabela de símbolos
-        if var_info and len(var_info) > 2:  # Verifica se existe informação de tipo (ex: ('param', offset, tipo))
-            data_type = var_info[2]
-            if data_type == 'string' or data_type == 'char':  # Trata char único como string para CHARAT
-                is_string_access = True
-            elif data_type == 'array' and len(var_info) > 3 and var_info[3] == 'char':  # Se for array de char
-                 is_string_access = True
+        if not self.is_string_access(array_expr):
+            self.compile_element(array_expr)
+            return
 
-        # Compila e empilha o índice
-        self.compile_expression(index_expr)
+        # Empilha a string e o índice
+        self.compile_string_base(array_expr)
+        self.compile_expression(array_expr.index)
 
         # Ajusta índice para indexação 1-based do Pascal para 0-based da VM
-        self.append_code('PUSHI 1')
-        self.append_code('SUB // Ajusta índice para indexação 1-based do Pascal')
-
-        if is_string_access:
-            self.append_code('CHARAT // Obtém o código ASCII do caractere na posição')
-        else:
-            # Calcula endereço do elemento usando aritmética de ponteiros
-            self.append_code('PADD // Calcula endereço do elemento')
-            self.append_code('LOAD 0 // Carrega valor do endereço calculado')
+        self.emit(Op.PUSHI, 1)
+        self.emit(Op.SUB, comment='Ajusta índice para indexação 1-based do Pascal')
+        self.emit(Op.CHARAT, comment='Obtém o código ASCII do caractere na posição')
 
     def compile_variable(self, var_expr):
         """Compila uma referência a variável (carrega seu valor na pilha)."""
@@ -718,32 +1194,21 @@ class PascalToVMCompiler:
             print(f"Erro: Expressão de variável inválida: {var_expr}")
             return
 
-        _, var_name = var_expr
-        self.debug_print(f"Acessando variável: {var_name}")
+        var_name = var_expr.name
+        self.debug_print("Acessando variável: %s", var_name)
 
-        # Verifica escopo atual primeiro, depois escopo global
-        if self.current_scope != 'global' and var_name in self.symbol_table[self.current_scope]:
-            var_info = self.symbol_table[self.current_scope][var_name]
-            if var_info[0] in ['var', 'param', 'retval']:
-                offset = var_info[1]
-                self.append_code(f'PUSHL {offset} // {var_name} (local/parâmetro/retval)')
-                return
-            elif var_info[0] == 'const':
-                self.compile_expression(var_info[1])  # Compila o valor da constante
-                return
-
-        if var_name in self.symbol_table['global']:
-            var_info = self.symbol_table['global'][var_name]
-            if var_info[0] == 'var':
-                offset = var_info[1]
-                self.append_code(f'PUSHG {offset} // {var_name} (global)')
-            elif var_info[0] == 'const':
-                self.compile_expression(var_info[1])
-            else:
-                print(f"Erro: Tipo de variável inválido para {var_name} no escopo global")
-        else:
+        symbol = var_expr.symbol
+        if symbol is None:
             print(f"Erro: Variável {var_name} não encontrada na tabela de símbolos")
-            print(f"Tabela de símbolos atual: {self.symbol_table}")
+        elif symbol.kind == 'const':
+            self.compile_expression(symbol.value)  # Compila o valor da constante
+        elif isinstance(symbol.type, (ArrayType, RecordType)):
+            # Arrays e registos são usados pelo endereço (por exemplo, como argumentos)
+            self.compile_element(var_expr)
+        elif symbol.local:
+            self.emit(Op.PUSHL, symbol.offset, f'{var_name} (local/parâmetro/retval)')
+        else:
+            self.emit(Op.PUSHG, symbol.offset, f'{var_name} (global)')
 
     def compile_binary_operation(self, bin_op):
         """Compila uma operação binária."""
@@ -752,31 +1217,37 @@ class PascalToVMCompiler:
             return
 
         _, op, left, right = bin_op
-        self.debug_print(f"Operação binária: {op}")
+        op = op.lower()  # 'div', 'mod', 'and', 'or'
+        self.debug_print("Operação binária: %s", op)
+        if bin_op.type == 'string':
+            self.compile_concatenation(bin_op)
+            return
+
+        # Tipo em que a operação é feita: os operandos inteiros de uma operação real são convertidos
+        operand_type, operators = bin_op.type, OPERATORS
+        if operand_type == 'boolean' and op != 'and' and op != 'or':
+            # Comparação: o tipo vem dos operandos
+            operand_types = (type_of(left), type_of(right))
+            operand_type = 'real' if 'real' in operand_types else 'string' if 'string' in operand_types else None
+        elif operand_type != 'real' and operand_type != 'string':
+            operand_type = None
+        if operand_type == 'real':
+            operators = REAL_OPERATORS
 
         # Compila operandos esquerdo e direito
-        self.compile_expression(left)
-        self.compile_expression(right)
-
-        op_map = {
-            '+': 'ADD',
-            '-': 'SUB',
-            '*': 'MUL',
-            '/': 'DIV',  # Divisão inteira
-            'div': 'DIV',  # Divisão inteira
-            'mod': 'MOD',
-            'and': 'AND',
-            'or': 'OR',
-            '=': 'EQUAL',
-            '<>': 'NOTEQUAL',
-            '<': 'INF',
-            '<=': 'INFEQ',
-            '>': 'SUP',
-            '>=': 'SUPEQ'
-        }
-
-        if op.lower() in op_map:  # Usa .lower() para 'div', 'mod', 'and', 'or'
-            self.append_code(op_map[op.lower()])
+        if operand_type is None:
+            self.compile_expression(left)
+            self.compile_expression(right)
+        else:
+            self.compile_value(left, operand_type)
+            self.compile_value(right, operand_type)
+
+        if op in operators:
+            self.emit(operators[op])
+        elif op == '<>':
+            # A EWVM não tem NOTEQUAL
+            self.emit(Op.EQUAL)
+            self.emit(Op.NOT)
         else:
             print(f"Aviso: Operador desconhecido: {op}")
 
@@ -787,12 +1258,19 @@ class PascalToVMCompiler:
             return
 
         _, op, operand = unary_op
+        is_real = unary_op.type == 'real'
+        if op == '-':
+            # A EWVM não tem NEG: calcula 0 - operando
+            if is_real:
+                self.emit(Op.PUSHF, 0.0)
+            else:
+                self.emit(Op.PUSHI, 0)
         self.compile_expression(operand)
 
         if op == 'not':
-            self.append_code('NOT')
+            self.emit(Op.NOT)
         elif op == '-':
-            self.append_code('NEG')
+            self.emit(Op.FSUB if is_real else Op.SUB)
 
     def compile_if_statement(self, if_stmt):
         """Compila um comando IF...THEN."""
@@ -801,13 +1279,19 @@ class PascalToVMCompiler:
             return
 
         _, condition, then_part = if_stmt
-        self.compile_expression(condition)
+        if self.eliminate_dead_code and constant_condition(condition) is not None:
+            # Condição conhecida em compilação: só o ramo executado é gerado
+            if constant_condition(condition):
+                self.compile_statement(then_part)
+            else:
+                self.dead_code['comandos'] += 1
+            return
 
         else_label = self.generate_label('ENDIF')
 
-        self.append_code(f'JZ {else_label}')
+        self.compile_condition(condition, else_label)
         self.compile_statement(then_part)
-        self.append_code(f'{else_label}:')
+        self.emit_label(else_label)
 
     def compile_if_else_statement(self, if_else_stmt):
         """Compila um comando IF...THEN...ELSE."""
@@ -816,17 +1300,55 @@ class PascalToVMCompiler:
             return
 
         _, condition, then_part, else_part = if_else_stmt
-        self.compile_expression(condition)
+        if self.eliminate_dead_code and constant_condition(condition) is not None:
+            # Condição conhecida em compilação: só o ramo executado é gerado
+            self.compile_statement(then_part if constant_condition(condition) else else_part)
+            self.dead_code['comandos'] += 1
+            return
 
         else_label = self.generate_label('ELSE')
         end_label = self.generate_label('ENDIF')
 
-        self.append_code(f'JZ {else_label}')
+        self.compile_condition(condition, else_label)
         self.compile_statement(then_part)
-        self.append_code(f'JUMP {end_label}')
-        self.append_code(f'{else_label}:')
+        if not (self.eliminate_dead_code and terminates(then_part)):
+            self.emit(Op.JUMP, end_label)
+        self.emit_label(else_label)
         self.compile_statement(else_part)
-        self.append_code(f'{end_label}:')
+        self.emit_label(end_label)
+
+    def compile_condition(self, condition, false_label, negate=False):
+        """
+        Compila a condição de um IF/WHILE: salta para false_label se for falsa (verdadeira, com
+        negate) e continua na instrução seguinte caso contrário. Com short_circuit, os AND/OR
+        booleanos passam a cadeias de saltos: o segundo operando só é avaliado se for preciso
+        e os resultados intermédios não chegam a ser empilhados. NOT troca AND e OR (De Morgan).
+        """
+        if self.short_circuit and isinstance(condition, Node) and condition.type == 'boolean':
+            if condition.kind == 'unary_op' and condition.op == 'not':
+                self.compile_condition(condition.operand, false_label, not negate)
+                return
+            op = condition.op.lower() if condition.kind == 'binary_op' else None
+            if op == 'and' or op == 'or':
+                if (op == 'and') != negate:
+                    # Basta um operando falso para saltar
+                    self.compile_condition(condition.left, false_label, negate)
+                    self.compile_condition(condition.right, false_label, negate)
+                else:
+                    # Um operando verdadeiro dispensa o outro
+                    true_label = self.generate_label('CondTrue')
+                    right_label = self.generate_label('CondRight')
+                    self.compile_condition(condition.left, right_label, negate)
+                    self.emit(Op.JUMP, true_label)
+                    self.emit_label(right_label)
+                    self.compile_condition(condition.right, false_label, negate)
+                    self.emit_label(true_label)
+                return
+
+        self.compile_expression(condition)
+        if negate:
+            self.emit(Op.NOT)
+        self.emit(Op.JZ, false_label)
 
     def compile_while_statement(self, while_stmt):
         """Compila um loop WHILE...DO."""
@@ -835,104 +1357,223 @@ class PascalToVMCompiler:
             return
 
         _, condition, body = while_stmt
+        constant = constant_condition(condition) if self.eliminate_dead_code else None
+        if constant is False:
+            self.dead_code['comandos'] += 1  # O corpo nunca é executado
+            return
+
+        hoisted = self.hoist_invariants(LoopEffects(condition, body), condition, body) if self.optimize_loops else ()
 
         start_label = self.generate_label('WHILESTART')
         end_label = self.generate_label('WHILEEND')
 
-        self.append_code(f'{start_label}:')
-        self.compile_expression(condition)
-        self.append_code(f'JZ {end_label}')
+        self.emit_label(start_label)
+        if constant is None:
+            self.compile_condition(condition, end_label)
+        self.loops.append({'break': end_label, 'continue': start_label})
         self.compile_statement(body)
-        self.append_code(f'JUMP {start_label}')
-        self.append_code(f'{end_label}:')
+        self.loops.pop()
+        self.emit(Op.JUMP, start_label)
+        self.emit_label(end_label)
+
+        self.release_hoisted(hoisted)
 
     def compile_for_statement(self, for_stmt):
-        """Compila um loop FOR (TO ou DOWNTO)."""
+        """
+        Compila um loop FOR (TO ou DOWNTO). O limite final é avaliado uma só vez, antes da
+        primeira iteração; com optimize_loops, as expressões invariantes do corpo são calculadas
+        antes do ciclo e os acessos a arrays indexados pela variável de controlo usam um endereço
+        que avança a cada iteração (redução de força). Com check_bounds, o intervalo dos valores
+        da variável de controlo é conhecido no corpo, se este não a alterar (análise de intervalos).
+        """
         if len(for_stmt) != 6:
             print(f"Erro: Comando for inválido: {for_stmt}")
             return
 
-        _, var_name_str, start_expr, direction, end_expr, body = for_stmt
-        # A AST passa o nome da variável diretamente como string para a variável de controle
-        var_name = var_name_str  # Corrigido: Usa diretamente var_name_str como nome da variável
-
-        # 1. Compila a atribuição inicial (loop_var := start_expr)
-        self.compile_expression(start_expr)
+        _, var_name, start_expr, direction, end_expr, body = for_stmt
 
-        # Armazena na variável de loop (local ou global)
-        var_info = None
-        if self.current_scope != 'global' and var_name in self.symbol_table[self.current_scope]:
-            var_info = self.symbol_table[self.current_scope][var_name]
-            self.append_code(f'STOREL {var_info[1]} // Inicializa variável de loop {var_name}')
-        elif var_name in self.symbol_table['global']:
-            var_info = self.symbol_table['global'][var_name]
-            self.append_code(f'STOREG {var_info[1]} // Inicializa variável de loop {var_name}')
-        else:
+        symbol = for_stmt.symbol
+        if symbol is None:
             print(f"Erro: Variável de loop {var_name} não encontrada na tabela de símbolos.")
             return
-
-        loop_start_label = self.generate_label('LoopCondition')  # Renomeado para clareza conforme saída desejada
-        loop_end_label = self.generate_label('LoopEnd')  # Renomeado para clareza conforme saída desejada
-
-        self.append_code(f'{loop_start_label}:')
-
-        # 2. Compila a condição do loop
-        # Carrega variável de loop
-        if var_info[0] == 'var':
-            if self.current_scope != 'global':
-                self.append_code(f'PUSHL {var_info[1]} // Empilha {var_name}')  # Comentário alterado para clareza
-            else:
-                self.append_code(f'PUSHG {var_info[1]} // Carrega variável de loop {var_name}')
-        else:
+        if symbol.kind != 'var':
             print(f"Erro: {var_name} não é uma variável, não pode ser usada como variável de controle de loop.")
             return
-
-        # Compila expressão de fim
-        self.compile_expression(end_expr)
-
-        # Aplica comparação baseada na direção
         if direction == 'to':  # for i := start TO end (i <= end)
-            self.append_code('INFEQ // Verifica se loop_var <= end_expr')
-            self.append_code(f'JZ {loop_end_label} // Se falso, salta para fim')
+            compare_op, step_op = Op.INFEQ, Op.ADD
         elif direction == 'downto':  # for i := start DOWNTO end (i >= end)
-            self.append_code('SUPEQ // Verifica se i >= 1')  # Comentário alterado para clareza
-            self.append_code(f'JZ {loop_end_label} // Se falso (i < 1), salta para Loop_End')  # Comentário alterado
+            compare_op, step_op = Op.SUPEQ, Op.SUB
         else:
             print(f"Erro: Direção de loop desconhecida: {direction}")
             return
 
-        # 3. Compila o corpo do loop
-        self.compile_statement(body)
-
-        # 4. Incrementa/Decrementa a variável de loop
-        # Carrega variável de loop novamente
-        if var_info[0] == 'var':
-            if self.current_scope != 'global':
-                self.append_code(f'PUSHL {var_info[1]} // Empilha {var_name}')  # Comentário alterado
-            else:
-                self.append_code(f'PUSHG {var_info[1]} // Carrega variável de loop {var_name}')
+        effects = None
+        if self.optimize_loops or self.check_bounds:
+            effects = LoopEffects(body)
+            # O corpo não altera a variável de controlo (nem pode, por uma chamada, se for global)
+            stable = symbol not in effects.assigned and (symbol.local or not effects.calls)
+            reduce_strength = symbol not in effects.assigned
+            effects.assigned.add(symbol)  # A variável de controlo muda a cada iteração
+        control_range = None
+        if self.check_bounds and self.range_analysis and stable:
+            control_range = loop_range(value_range(start_expr, self.ranges), value_range(end_expr, self.ranges),
+                                       direction)
+
+        # 1. Valores inicial e final, calculados antes de alterar a variável de controlo
+        self.compile_expression(start_expr)
+        # O valor final só é relido em cada iteração se não puder mudar (literal, constante, variável invariante)
+        inline_bound = not isinstance(end_expr, Node) or (
+            type(end_expr) is Var and end_expr.symbol is not None
+            and (end_expr.symbol.kind == 'const' or (self.optimize_loops and effects.invariant(end_expr))))
+        bound_temp = None
+        if not inline_bound:
+            bound_temp = self.frame.allocate_temp()
+            self.compile_expression(end_expr)
+            self.emit(self.frame.store_op, bound_temp, 'Valor final do loop')
+        self.emit(symbol.store_op, symbol.offset, f'Inicializa variável de loop {var_name}')
+
+        hoisted, pointers = (), ()
+        if self.optimize_loops:
+            hoisted = self.hoist_invariants(effects, body)
+            if reduce_strength:
+                pointers = self.reduce_strength(symbol, direction, effects, body)
+
+        loop_start_label = self.generate_label('LoopCondition')
+        loop_end_label = self.generate_label('LoopEnd')
+
+        self.emit_label(loop_start_label)
+
+        # 2. Condição do loop: variável de controlo contra o valor final
+        self.emit(symbol.load_op, symbol.offset, f'Carrega variável de loop {var_name}')
+        if bound_temp is None:
+            self.compile_expression(end_expr)
         else:
-            print(f"Erro: {var_name} não é uma variável, não pode ser usada como variável de controle de loop.")
-            return
-
-        self.append_code('PUSHI 1')
-        if direction == 'to':
-            self.append_code('ADD // Incrementa variável de loop')
-        else:  # downto
-            self.append_code('SUB // Subtrai 1 de i')  # Comentário alterado
-
-        # Armazena variável de loop atualizada
-        if var_info[0] == 'var':
-            if self.current_scope != 'global':
-                self.append_code(f'STOREL {var_info[1]} // Armazena o novo i')  # Comentário alterado
+            self.emit(self.frame.load_op, bound_temp, 'Valor final do loop')
+        self.emit(compare_op, comment='Verifica se loop_var <= end_expr' if direction == 'to'
+                  else 'Verifica se loop_var >= end_expr')
+        self.emit(Op.JZ, loop_end_label, 'Se falso, salta para fim')
+
+        # 3. Compila o corpo do loop (o rótulo de CONTINUE só é criado se for usado)
+        loop = {'break': loop_end_label, 'continue': None}
+        self.loops.append(loop)
+        if control_range is not None:
+            outer_range = self.ranges.get(symbol)
+            self.ranges[symbol] = control_range
+        self.compile_statement(body)
+        if control_range is not None:
+            if outer_range is None:
+                del self.ranges[symbol]
             else:
-                self.append_code(f'STOREG {var_info[1]} // Armazena variável de loop atualizada {var_name}')
+                self.ranges[symbol] = outer_range
+        self.loops.pop()
+
+        # 4. Avança os endereços da redução de força e a variável de loop
+        if loop['continue'] is not None:
+            self.emit_label(loop['continue'])
+        for key, temp, step in pointers:
+            self.emit(self.frame.load_op, temp)
+            self.emit(Op.PUSHI, step)
+            self.emit(Op.PADD, comment='Avança o endereço para a próxima iteração')
+            self.emit(self.frame.store_op, temp)
+        self.emit(symbol.load_op, symbol.offset, f'Carrega variável de loop {var_name}')
+        self.emit(Op.PUSHI, 1)
+        self.emit(step_op, comment='Incrementa variável de loop' if direction == 'to' else 'Decrementa variável de loop')
+        self.emit(symbol.store_op, symbol.offset, f'Armazena variável de loop atualizada {var_name}')
 
         # 5. Salta de volta para o início do loop
-        self.append_code(f'JUMP {loop_start_label} // Salta de volta para condição do loop')  # Comentário alterado
+        self.emit(Op.JUMP, loop_start_label, 'Salta de volta para condição do loop')
 
         # 6. Rótulo de fim do loop
-        self.append_code(f'{loop_end_label}:')
+        self.emit_label(loop_end_label)
+
+        for key, temp, _ in pointers:
+            del self.induction[key]
+            self.frame.release_temp(temp)
+        self.release_hoisted(hoisted)
+        if bound_temp is not None:
+            self.frame.release_temp(bound_temp)
+
+    def compile_loop_jump(self, kind):
+        """Compila BREAK (salta para o fim do ciclo mais interior) ou CONTINUE (para a próxima iteração)."""
+        if not self.loops:
+            print(f"Erro: {kind.upper()} fora de um ciclo")
+            return
+        loop = self.loops[-1]
+        if kind == 'break':
+            self.emit(Op.JUMP, loop['break'], 'BREAK: sai do ciclo')
+            return
+        if loop['continue'] is None:
+            loop['continue'] = self.generate_label('LoopContinue')
+        self.emit(Op.JUMP, loop['continue'], 'CONTINUE: passa à próxima iteração')
+
+    def compile_exit(self):
+        """Compila EXIT: sai da rotina (com o valor de retorno atual) ou termina o programa."""
+        if self.scope.is_global:
+            self.emit(Op.STOP, comment='EXIT no programa principal')
+        else:
+            self.emit_epilogue()
+
+    def hoist_invariants(self, effects, *nodes):
+        """
+        Calcula antes do ciclo, em temporários, as subexpressões de nodes que não mudam entre
+        iterações (ver loops.invariant_expressions). Devolve as expressões tiradas do ciclo.
+        """
+        hoisted = []
+        for expr in invariant_expressions(effects, *nodes):
+            if expr in self.hoisted:
+                continue  # Já calculada antes de um ciclo exterior
+            temp = self.frame.allocate_temp()
+            self.compile_expression(expr)
+            self.emit(self.frame.store_op, temp, 'Expressão invariante do ciclo')
+            self.hoisted[expr] = temp
+            hoisted.append(expr)
+        return hoisted
+
+    def release_hoisted(self, hoisted):
+        for expr in hoisted:
+            self.frame.release_temp(self.hoisted.pop(expr))
+
+    def reduce_strength(self, symbol, direction, effects, body):
+        """
+        Redução de força dos acessos a arrays do corpo de um FOR indexados pela variável de
+        controlo symbol (com os outros índices invariantes): o endereço do elemento é calculado
+        antes do ciclo e avança um passo por iteração, e cada acesso passa a ser um LOAD/STORE
+        com deslocamento constante. Os acessos com o mesmo endereço a menos de uma constante
+        (a[i] e a[i + 1]) partilham o endereço. Só se aplica quando as instruções poupadas em
+        cada iteração pagam a atualização do endereço.
+        Devolve [(chave, temporário, passo)].
+        """
+        groups = {}
+        for access in element_accesses(body):
+            if access.kind == 'array_access' and self.is_string_access(access):
+                continue
+            location = self.element_location(access, report=False)
+            if location is None:
+                continue
+            owner, offset, terms, _ = location
+            induction = [index for index, _, _ in terms if type(index) is Var and index.symbol is symbol]
+            if len(induction) != 1 or not all(effects.invariant(index) for index, _, _ in terms
+                                              if index is not induction[0]):
+                continue
+            key = self.location_key(owner, terms)
+            group = groups.get(key)
+            if group is None:
+                stride = next(stride for index, stride, _ in terms if index is induction[0])
+                group = groups[key] = [owner, offset, terms, stride, 0]
+            group[4] += access_cost(terms, offset) - 2  # Um acesso reduzido é PUSHL/PUSHG + LOAD/STORE
+
+        pointers = []
+        for key, (owner, offset, terms, stride, saving) in groups.items():
+            if saving <= 4 or key in self.induction:  # 4: instruções que avançam o endereço
+                continue
+            temp = self.frame.allocate_temp()
+            # O endereço da primeira iteração não é verificado: o ciclo pode nem chegar a usá-lo
+            self.push_location(owner, offset, terms, check=False)
+            self.emit(Op.PADD)
+            self.emit(self.frame.store_op, temp, f'Endereço de {owner.name} na primeira iteração')
+            self.induction[key] = (temp, offset)
+            pointers.append((key, temp, stride if direction == 'to' else -stride))
+        return pointers
 
     def compile_writeln(self, writeln_stmt):
         """Compila um comando WRITELN."""
@@ -941,44 +1582,44 @@ class PascalToVMCompiler:
             return
 
         _, exprs = writeln_stmt
-        for expr in exprs:
-            self.compile_expression(expr)  # Empilha valor da expressão
-
-            if isinstance(expr, tuple):
-                if expr[0] == 'var':
-                    var_name = expr[1]
-                    var_info = None
-                    if self.current_scope != 'global' and var_name in self.symbol_table[self.current_scope]:
-                        var_info = self.symbol_table[self.current_scope][var_name]
-                    elif var_name in self.symbol_table['global']:
-                        var_info = self.symbol_table['global'][var_name]
-
-                    if var_info and len(var_info) > 2:
-                        data_type = var_info[2]
-                        if data_type == 'integer':
-                            self.append_code('WRITEI')
-                        elif data_type == 'real':
-                            self.append_code('WRITEF')
-                        elif data_type == 'string' or data_type == 'char':
-                            self.append_code('WRITES')
-                        else:
-                            self.append_code('WRITES')  # Padrão para string se tipo desconhecido
-                    else:
-                        self.append_code('WRITEI')  # Padrão para inteiro se sem informação de tipo (comum para vars simples)
-                elif expr[0] in ['binary_op', 'unary_op', 'function_call', 'array_access']:
-                    self.append_code('WRITEI')  # Caso mais comum para resultados aritméticos/comparações
-                else:
-                    self.append_code('WRITES')  # Padrão para string se tipo de tupla desconhecido
-            elif isinstance(expr, int):
-                self.append_code('WRITEI')
-            elif isinstance(expr, float):
-                self.append_code('WRITEF')
-            elif isinstance(expr, str):  # Para literais de string diretos como 'hello'
-                self.append_code('WRITES')
-            else:
-                self.append_code('WRITES')  # Fallback para outros tipos
+        literals = []  # Literais seguidos ainda por escrever: (literal, texto escrito)
+        for expr in list(exprs) + [None]:
+            text = self.written_text(expr)
+            if text is not None:
+                literals.append((expr, text))
+                continue
+            text = ''.join(text for _, text in literals)
+            if len(literals) == 1 and text:
+                self.emit_write(literals[0][0])
+            elif text:
+                # Os literais seguidos são escritos de uma só vez, com uma string já em compilação
+                self.emit(Op.PUSHS, text)
+                self.emit(Op.WRITES)
+            literals = []
+            if expr is not None:
+                self.emit_write(expr)
+
+        self.emit(Op.WRITELN)  # Imprime nova linha após todas as expressões
+
+    def emit_write(self, expr):
+        """Empilha o valor de uma expressão e escreve-o."""
+        self.compile_expression(expr)
+        # A instrução de escrita depende do tipo inferido (inteiro se for desconhecido)
+        self.emit(WRITE_OPS.get(type_of(expr), Op.WRITEI))
 
-        self.append_code('WRITELN')  # Imprime nova linha após todas as expressões
+    @staticmethod
+    def written_text(expr):
+        """
+        Texto que a VM escreve para um literal inteiro, booleano, char ou string que possa ser
+        juntado a outros num PUSHS (None nos restantes).
+        """
+        if isinstance(expr, bool):
+            return '1' if expr else '0'  # WRITEI
+        if isinstance(expr, int):
+            return str(expr)
+        if isinstance(expr, str) and representable(expr):
+            return expr  # Os caracteres de controlo sem escape continuam a ser escritos com WRITECHR
+        return None
 
     def compile_readln(self, readln_stmt):
         """Compila um comando READLN."""
@@ -990,124 +1631,54 @@ class PascalToVMCompiler:
 
         # Trata caso readln() sem argumentos
         if not variables:
-            self.append_code('READ // readln() sem argumentos, apenas consome entrada')
+            self.emit(Op.READ, comment='readln() sem argumentos, apenas consome entrada')
             return
 
         for var_target in variables:
             if var_target is None:
                 continue
 
-            if var_target[0] == 'var':
+            if var_target.kind == 'var':
                 var_name = var_target[1]
-                self.debug_print(f"Lendo para variável: {var_name}")
-
-                var_info = None
-                if self.current_scope != 'global' and var_name in self.symbol_table[self.current_scope]:
-                    var_info = self.symbol_table[self.current_scope][var_name]
-                elif var_name in self.symbol_table['global']:
-                    var_info = self.symbol_table['global'][var_name]
-
-                data_type = None
-                if var_info and len(var_info) > 2:
-                    data_type = var_info[2]
-
-                self.append_code('READ // Lê string do teclado')
-                if data_type == 'integer':
-                    self.append_code('ATOI // Converte string para inteiro')
-                elif data_type == 'real':
-                    self.append_code('ATOF // Converte string para float')
-                # Se data_type for 'string' ou 'char', nenhuma conversão necessária, apenas armazena o endereço.
-
-                # Armazena na variável (escopo atual depois global)
-                if self.current_scope != 'global' and var_name in self.symbol_table[self.current_scope]:
-                    var_info = self.symbol_table[self.current_scope][var_name]
-                    if var_info[0] in ['var', 'param']:
-                        offset = var_info[1]
-                        self.append_code(f'STOREL {offset} // {var_name}')
-                    else:
-                        print(f"Erro: Não é possível ler em {var_info[0]} {var_name}")
-                elif var_name in self.symbol_table['global']:
-                    var_info = self.symbol_table['global'][var_name]
-                    if var_info[0] == 'var':
-                        offset = var_info[1]
-                        self.append_code(f'STOREG {offset} // {var_name}')
-                    else:
-                        print(f"Erro: Não é possível ler em {var_info[0]} {var_name}")
-                else:
-                    print(f"Erro: Variável {var_name} não encontrada para readln.")
+                self.debug_print("Lendo para variável: %s", var_name)
 
-            elif var_target[0] == 'array_access':
-                # Trata leitura em elemento de array ou caractere de string
-                _, array_name, index_expr = var_target
-
-                # Lê entrada
-                self.append_code('READ')
-
-                is_string_access = False
-                var_info = None
-                # Determina tipo de destino para conversão (ATOI/ATOF) e armazenamento (CHARSET/STORE)
-                if self.current_scope != 'global' and array_name in self.symbol_table[self.current_scope]:
-                    var_info = self.symbol_table[self.current_scope][array_name]
-                elif array_name in self.symbol_table['global']:
-                    var_info = self.symbol_table['global'][array_name]
-
-                element_data_type = None
-                if var_info and len(var_info) > 3 and var_info[2] == 'array':  # Verifica se é um array
-                    element_data_type = var_info[3]  # Obtém o tipo do elemento
-
-                if element_data_type == 'integer':
-                    self.append_code('ATOI // Converte string de entrada para inteiro')
-                elif element_data_type == 'real':
-                    self.append_code('ATOF // Converte string de entrada para float')
-                elif element_data_type == 'char':
-                    # Se lendo em um elemento de array de char, a entrada é uma string,
-                    # e precisamos armazenar o valor ASCII do primeiro caractere.
-                    # A instrução READ já coloca o endereço da string na pilha.
-                    # Precisamos obter o código ASCII do primeiro char.
-                    self.append_code('CHRCODE // Obtém código ASCII do primeiro caractere para atribuição de char')
-                    is_string_access = True  # Trata como string para CHARSET
-
-                # Empilha o endereço base do array
-                var_found = False
-                if self.current_scope != 'global' and array_name in self.symbol_table[self.current_scope]:
-                    var_info = self.symbol_table[self.current_scope][array_name]
-                    if var_info[0] == 'var' or var_info[0] == 'param':
-                        offset = var_info[1]
-                        self.append_code(f'PUSHL {offset} // Endereço base do array/string (local/parâmetro)')
-                        var_found = True
-                elif array_name in self.symbol_table['global']:
-                    var_info = self.symbol_table['global'][array_name]
-                    if var_info[0] == 'var':
-                        offset = var_info[1]
-                        self.append_code(f'PUSHG {offset} // Endereço base do array/string (global)')
-                        var_found = True
-                else:
-                    print(f"Erro: Array/string {array_name} não encontrado para readln.")
-                    continue
+                symbol = var_target.symbol
 
-                if not var_found:
-                    continue
+                self.emit(Op.READ, comment='Lê string do teclado')
+                self.emit_read_conversion(type_of(var_target))
 
-                # Compila a expressão de índice
-                self.compile_expression(index_expr)
+                # Armazena na variável
+                if symbol is None:
+                    print(f"Erro: Variável {var_name} não encontrada para readln.")
+                elif symbol.kind in ('var', 'param'):
+                    self.emit(symbol.store_op, symbol.offset, var_name)
+                else:
+                    print(f"Erro: Não é possível ler em {symbol.kind} {var_name}")
 
-                # Ajusta índice para indexação 1-based do Pascal para 0-based da VM
-                self.append_code('PUSHI 1')
-                self.append_code('SUB // Ajusta índice para indexação 1-based do Pascal')
+            elif var_target.kind == 'array_access' and self.is_string_access(var_target):
+                # Caractere de uma string: lê o código ASCII e guarda-o com setchar
+                self.compile_string_assignment(var_target, lambda target=var_target: self.emit_read(target))
 
-                if is_string_access:  # Para atribuição de elemento de array de char
-                    # Pilha: [valor_armazenar (ASCII), endereço_array, índice]
-                    # CHARSET espera: [endereço_array, índice, valor_armazenar]
-                    self.append_code('SWAP // Pilha: [endereço_array, valor_armazenar, índice]')
-                    self.append_code('SWAP // Pilha: [endereço_array, índice, valor_armazenar]')
-                    self.append_code('CHARSET // Armazena caractere (ASCII) no endereço calculado na string')
-                else:
-                    # Para arrays gerais, calcula endereço do elemento usando aritmética de ponteiros
-                    self.append_code('PADD // Calcula endereço do elemento')
-                    self.append_code('SWAP // Troca valor e endereço')
-                    self.append_code('STORE 0 // Armazena valor no endereço calculado')
+            elif var_target.kind in ('array_access', 'field_access'):
+                # Lê entrada e converte-a para o tipo do elemento (ATOI/ATOF/CHRCODE)
+                self.store_element(var_target, lambda target=var_target: self.emit_read(target))
             else:
-                print(f"Erro: Tipo de variável inválido em readln: {var_target[0]}")
+                print(f"Erro: Tipo de variável inválido em readln: {var_target.kind}")
+
+    def emit_read(self, target):
+        """Lê uma linha do teclado e converte-a para o tipo de target."""
+        self.emit(Op.READ)
+        self.emit_read_conversion(type_of(target))
+
+    def emit_read_conversion(self, data_type):
+        """
+        Converte a string lida por READ para o tipo do destino. As strings ficam como estão;
+        um char guarda o código ASCII do primeiro caractere lido.
+        """
+        conversion = READ_CONVERSIONS.get(data_type)
+        if conversion is not None:
+            op, comment = conversion
+            self.emit(op, comment=comment)
 
     def compile_function_call(self, func_call_ast, is_statement=False):
         """
@@ -1120,7 +1691,13 @@ class PascalToVMCompiler:
 
         _, func_name, args_ast = func_call_ast
 
-        # Verifica se função/procedimento existe (excluindo built-ins como 'length' tratados em outro lugar)
+        if func_call_ast.builtin:
+            self.compile_builtin_call(func_call_ast)
+            if is_statement:
+                self.emit(Op.POP, 1, f'Descarta o resultado de {func_name}')
+            return
+
+        # Verifica se função/procedimento existe
         if func_name not in self.functions:
             print(f"Erro: Função/procedimento {func_name} não declarado.")
             return
@@ -1132,29 +1709,132 @@ class PascalToVMCompiler:
             print(f"Erro: Função/procedimento {func_name} foi forward declarado mas não implementado.")
             return
 
-        # Empilha argumentos na ordem correta (esquerda para direita)
-        if args_ast:
-            for arg_expr in args_ast:
-                self.compile_expression(arg_expr)
-
         # Verifica se contagem de argumentos corresponde aos parâmetros
         expected_args_count = func_info['param_count']
         if len(args_ast) != expected_args_count:
             print(f"Erro: {func_name} espera {expected_args_count} argumentos mas recebeu {len(args_ast)}")
             # Continua compilação, mas é um erro semântico
 
-        # Chama a função/procedimento
-        label_name = f'{func_name}'
-        self.append_code(f'PUSHA {label_name}')  # Alterado para PUSHA conforme saída desejada
-        self.append_code(f'CALL')
-
-        if func_info['return_type'] is not None and is_statement:
-            # Se for uma chamada de função usada como comando, seu valor de retorno deve ser descartado
-            self.append_code('POP // Descarta valor de retorno da função pois é um comando')
-        elif func_info['return_type'] is None and not is_statement:
+        is_function = func_info['return_type'] is not None
+        if not is_function and not is_statement:
             # Isto é um procedimento usado em contexto de expressão, o que é um erro
             print(f"Erro: Procedimento {func_name} usado em contexto de expressão.")
-            self.append_code('POP // Descarta artefato de pilha da chamada de procedimento')
+
+        if func_call_ast in self.tail_calls:
+            self.compile_tail_call(func_call_ast, func_info)
+            return
+        template = self.inlinable.get(func_name)
+        if template is not None and len(args_ast) == expected_args_count:
+            self.compile_inline_call(func_call_ast, func_info, template, is_statement)
+            return
+
+        if is_function:
+            self.emit(Op.PUSHI, 0, f'Resultado de {func_name}')
+        self.push_arguments(args_ast, func_info)
+
+        # Chama a função/procedimento e descarta os argumentos (e o resultado, se for um comando)
+        self.emit(Op.PUSHA, Label(func_name))
+        self.emit(Op.CALL)
+        discarded = len(args_ast) + (1 if is_function and is_statement else 0)
+        if discarded:
+            self.emit(Op.POP, discarded, 'Descarta os argumentos' + (' e o resultado' if is_function and is_statement
+                                                                     else ''))
+
+    def push_arguments(self, args_ast, func_info):
+        """Empilha os argumentos da esquerda para a direita, convertidos para o tipo dos parâmetros."""
+        expected_types = param_types(func_info['params'])
+        for index, arg_expr in enumerate(args_ast):
+            self.compile_value(arg_expr, base_type(expected_types[index]) if index < len(expected_types) else None)
+
+    def compile_tail_call(self, func_call_ast, func_info):
+        """
+        Chamada terminal da rotina a si própria: os novos argumentos substituem os parâmetros,
+        as células que o corpo pode ler antes de escrever voltam a 0 e a execução salta para o
+        início do corpo, sem CALL nem crescimento da pilha. O resultado (de uma função) fica na
+        mesma célula, onde a última chamada o vai escrever.
+        """
+        self.push_arguments(func_call_ast.args, func_info)
+        # Os argumentos são todos calculados antes de alterar os parâmetros, de que podem depender
+        for symbol in reversed(self.frame.params):
+            self.emit(Op.STOREL, symbol.offset, f'Chamada terminal: novo valor de {symbol.name}')
+        for offset in self.frame.zeroed:
+            self.emit(Op.PUSHI, 0)
+            self.emit(Op.STOREL, offset)
+        self.emit(Op.JUMP, self.routine_start, f'Chamada terminal de {func_call_ast.name}')
+
+    def compile_inline_call(self, func_call_ast, func_info, template, is_statement):
+        """
+        Expande uma rotina folha no ponto de chamada (ver inline.inline_template): os parâmetros,
+        as variáveis locais e o resultado passam a ser temporários do frame do chamador e o corpo
+        é compilado de novo com os símbolos da rotina a apontar para eles. RETURN e EXIT saltam
+        para o fim da expansão, onde uma função deixa o resultado no topo da pilha.
+        """
+        name = func_call_ast.name
+        frame = self.frame
+        self.push_arguments(func_call_ast.args, func_info)
+
+        # As variáveis locais que partilham uma célula na rotina partilham também o temporário
+        cells = {offset: frame.allocate_temp() for offset in sorted({symbol.offset for symbol in template['locals']})}
+        params = [frame.allocate_temp() for _ in template['params']]
+        result = template['result']
+        result_temp = frame.allocate_temp() if result is not None else None
+
+        saved = [(symbol, symbol.offset, symbol.local) for symbol in template['params'] + template['locals']]
+        if result is not None:
+            saved.append((result, result.offset, result.local))
+        for symbol, temp in zip(template['params'], params):
+            symbol.offset = temp
+        for symbol in template['locals']:
+            symbol.offset = cells[symbol.offset]
+        if result is not None:
+            result.offset = result_temp
+        for symbol, _, _ in saved:
+            symbol.local = frame.local
+
+        if self.comments:
+            self.emit_comment(f'Início de {name} (expandida)')
+        for symbol, temp in reversed(list(zip(template['params'], params))):
+            self.emit(frame.store_op, temp, symbol.name)
+        zeroed = [cells[offset] for offset in template['zeroed'] if offset in cells]
+        if template['init_result']:
+            zeroed.append(result_temp)
+        for temp in zeroed:
+            self.emit(Op.PUSHI, 0)
+            self.emit(frame.store_op, temp)
+
+        # O estado dos ciclos do chamador não vale no corpo expandido: as chaves dos acessos
+        # reduzidos (location_key) usam os nomes, que podem ser os mesmos na rotina
+        state = (self.scope, self.loops, self.tail_calls, self.inline_exit, self.dead_code['comandos'],
+                 self.induction, self.hoisted, self.ranges)
+        self.scope = self.symbol_table[name]
+        self.loops = []
+        self.tail_calls = set()
+        self.induction, self.hoisted, self.ranges = {}, {}, {}
+        end = self.inline_exit = self.generate_label('InlineEnd')
+        code = self.current_code_buffer
+        body_start = len(code)
+        self.compile_compound_statement(template['body'])
+        if type(code[-1]) is Instr and code[-1].op is Op.JUMP and code[-1].arg is end:
+            code.pop()  # RETURN no fim do corpo
+        jumps = any(type(item) is Instr and item.arg is end for item in code[body_start:])
+        if jumps:
+            self.emit_label(end)
+        # O corpo já foi contado quando a rotina foi compilada
+        (self.scope, self.loops, self.tail_calls, self.inline_exit, self.dead_code['comandos'],
+         self.induction, self.hoisted, self.ranges) = state
+
+        if result is not None and not is_statement:
+            last = code[-1]
+            if not jumps and type(last) is Instr and last.op is frame.store_op and last.arg == result_temp:
+                code.pop()  # O corpo acaba a guardar o resultado, que fica no topo da pilha
+            else:
+                self.emit(frame.load_op, result_temp, f'Resultado de {name}')
+        for symbol, offset, local in saved:
+            symbol.offset = offset
+            symbol.local = local
+        for temp in list(cells.values()) + params + ([result_temp] if result is not None else []):
+            frame.release_temp(temp)
+        self.inlined.append((name, frame.name))
 
     def compile_return(self, return_stmt):
         """Compila um comando RETURN."""
@@ -1164,22 +1844,20 @@ class PascalToVMCompiler:
 
         _, expr = return_stmt
 
-        # Compila a expressão de retorno
-        self.compile_expression(expr)
-
-        func_name = self.current_scope
-        if func_name in self.symbol_table and func_name in self.symbol_table[func_name]:  # Verifica se nome da função está em seu próprio escopo como retval
-            # A entrada na tabela de símbolos para o próprio nome da função armazena as informações do valor de retorno
-            retval_info = self.symbol_table[func_name][func_name]
-            if retval_info[0] == 'retval':
-                retval_offset = retval_info[1]
-                self.append_code(f'PUSHL {retval_offset} // Empilha o valor final de retorno (ex: valor)')
-            else:
-                print(f"Aviso: Valor de retorno para {func_name} não está marcado como 'retval' na tabela de símbolos.")
+        func_name = self.scope.name
+        # A entrada no âmbito da função para o seu próprio nome é a célula do valor de retorno
+        retval = self.scope.symbols.get(func_name)
+        if retval is None or retval.kind != 'retval':
+            print(f"Aviso: {func_name} não é uma função: o valor de return é ignorado.")
+        elif expr in self.tail_calls:
+            self.compile_function_call(expr)
+            return
         else:
-            print(f"Aviso: Não foi possível determinar offset do valor de retorno para {func_name} para empilhar antes de RETURN.")
-
-        self.append_code('RETURN')
+            # return expr equivale a func_name := expr seguido do epílogo
+            self.compile_value(expr, base_type(retval.type))
+            # Numa rotina expandida no programa principal, a célula do resultado é global
+            self.emit(retval.store_op, retval.offset, f'Valor de retorno de {func_name}')
+        self.emit_epilogue()
 
 
 # Exemplo de uso
@@ -1228,10 +1906,10 @@ end.
 
             # Imprime tabela de símbolos para depuração
             print("\nTabela de Símbolos Final:")
-            for scope, symbols in compiler.symbol_table.items():
-                print(f"Escopo: {scope}")
-                for name, info in symbols.items():
-                    print(f"  {name}: {info}")
+            for scope_name, scope in compiler.symbol_table.items():
+                print(f"Escopo: {scope_name}")
+                for name, symbol in scope.symbols.items():
+                    print(f"  {name}: {symbol}")
 
             # Imprime informações das funções
             print("\nFunções:")
@@ -0,0 +1,51 @@
+from ast_nodes import Node, CompoundStatement, If, IfElse, Return, Break, Continue, Exit
+from ir import Op, Instr, Label
+
+# Comandos depois dos quais o resto do bloco nunca é executado
+SALTOS = (Return, Break, Continue, Exit)
+
+
+def constant_condition(condition):
+    """Valor de uma condição literal (depois do ConstantFolder), ou None se só se sabe em execução."""
+    if isinstance(condition, Node):
+        return None
+    return bool(condition)
+
+
+def terminates(stmt):
+    """Se o comando sai sempre do bloco em que está (RETURN, EXIT, BREAK, CONTINUE em todos os caminhos)."""
+    kind = type(stmt)
+    if kind in SALTOS:
+        return True
+    if kind is CompoundStatement:
+        return any(terminates(item) for item in stmt.statements or ())
+    if kind is If:
+        return constant_condition(stmt.condition) is True and terminates(stmt.then_part)
+    if kind is IfElse:
+        value = constant_condition(stmt.condition)
+        if value is None:
+            return terminates(stmt.then_part) and terminates(stmt.else_part)
+        return terminates(stmt.then_part if value else stmt.else_part)
+    return False
+
+
+def called_routines(code):
+    """Nomes das rotinas chamadas (PUSHA rotina; CALL) num troço de código intermédio."""
+    return {item.arg.name for item in code
+            if type(item) is Instr and item.op is Op.PUSHA and isinstance(item.arg, Label)}
+
+
+def reachable_routines(main_code, routines):
+    """
+    Rotinas alcançáveis a partir do programa principal pelo grafo de chamadas.
+    routines associa o nome de cada rotina ao seu código.
+    """
+    reachable = set()
+    pending = list(called_routines(main_code))
+    while pending:
+        name = pending.pop()
+        if name in reachable or name not in routines:
+            continue
+        reachable.add(name)
+        pending.extend(called_routines(routines[name]))
+    return reachable
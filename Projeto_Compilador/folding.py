@@ -0,0 +1,187 @@
+from ast_nodes import NodeTransformer, Var
+from vm import divisao_inteira
+from intrinsics import BUILTINS
+from typecheck import literal_type
+
+
+def is_literal(value):
+    """Literais da AST: int, float, bool e str (bool é subclasse de int)."""
+    return isinstance(value, (int, float, str))
+
+
+def _numero(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _booleano(value):
+    return isinstance(value, bool)
+
+
+COMPARACOES = {
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+def fold_binary(op, left, right):
+    """Valor de left op right se ambos forem literais compatíveis, ou None."""
+    op = op.lower()
+    if _numero(left) and _numero(right):
+        if op == '+':
+            return left + right
+        if op == '-':
+            return left - right
+        if op == '*':
+            return left * right
+        if op == '/':
+            # '/' é sempre uma divisão real, mesmo entre inteiros
+            return left / right if right != 0 else None
+        if op in ('div', 'mod'):
+            if not (isinstance(left, int) and isinstance(right, int)) or right == 0:
+                return None
+            quociente = divisao_inteira(left, right)
+            return quociente if op == 'div' else left - right * quociente
+        if op in COMPARACOES:
+            return COMPARACOES[op](left, right)
+        return None
+
+    if isinstance(left, str) and isinstance(right, str) and op == '+' and (len(left) != 1 or len(right) != 1):
+        # Concatenação (entre dois caracteres, + é uma soma dos códigos ASCII)
+        return left + right
+
+    if _booleano(left) and _booleano(right):
+        if op == 'and':
+            return left and right
+        if op == 'or':
+            return left or right
+        if op in ('=', '<>'):
+            return COMPARACOES[op](left, right)
+    return None
+
+
+def fold_unary(op, operand):
+    """Valor de op operand se o operando for um literal compatível, ou None."""
+    if op == '-' and _numero(operand):
+        return -operand
+    if op == '+' and _numero(operand):
+        return operand
+    if op == 'not' and _booleano(operand):
+        return not operand
+    return None
+
+
+def fold_builtin(name, args):
+    """Valor da função predefinida name aplicada a argumentos literais compatíveis, ou None."""
+    builtin = BUILTINS.get(name)
+    expected = builtin.expected(len(args)) if builtin is not None and builtin.fold is not None else None
+    if expected is None or not all(is_literal(arg) and literal_type(arg) in accepted
+                                   for arg, accepted in zip(args, expected)):
+        return None
+    try:
+        return builtin.fold(*args)
+    except (ValueError, OverflowError):
+        return None  # Por exemplo, strtoint de um texto que não é um número: o erro fica para a execução
+
+
+class ConstantFolder(NodeTransformer):
+    """
+    Avalia em tempo de compilação as subexpressões constantes e substitui as referências a
+    constantes (CONST) pelo seu valor, quando este é um literal. Respeita os âmbitos:
+    parâmetros e variáveis locais de uma rotina escondem as constantes globais com o mesmo nome.
+    """
+
+    def __init__(self):
+        self.scopes = [{}]  # Pilha de âmbitos: nome -> literal, ou None se o nome não for constante
+        self.folded = 0  # Número de expressões substituídas por literais
+        self.routines = set()  # Rotinas do programa já declaradas: escondem as funções predefinidas
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def visit_ConstSection(self, node):
+        for decl in node.declarations:
+            decl.value = self.visit(decl.value)
+            self.scopes[-1][decl.name] = decl.value if is_literal(decl.value) else None
+        return node
+
+    def visit_VarSection(self, node):
+        for decl in node.declarations:
+            for name in decl.names:
+                self.scopes[-1][name] = None
+        return node
+
+    def visit_FunctionForward(self, node):
+        self.routines.add(node.name)
+        return node
+
+    visit_ProcedureForward = visit_FunctionForward
+
+    def _visit_routine(self, node):
+        self.routines.add(node.name)
+        scope = {node.name: None}
+        for param in node.params or []:
+            for name in param.names:
+                scope[name] = None
+        self.scopes.append(scope)
+        node.block = self.visit(node.block)
+        self.scopes.pop()
+        return node
+
+    visit_Function = _visit_routine
+    visit_Procedure = _visit_routine
+
+    def visit_Var(self, node):
+        value = self.lookup(node.name)
+        if value is None:
+            return node
+        self.folded += 1
+        return value
+
+    def visit_Assign(self, node):
+        # O destino de uma atribuição nunca é substituído por um valor
+        if not isinstance(node.target, Var):
+            node.target = self.visit(node.target)
+        node.expr = self.visit(node.expr)
+        return node
+
+    def visit_Readln(self, node):
+        node.targets[:] = [target if isinstance(target, Var) else self.visit(target)
+                           for target in node.targets]
+        return node
+
+    def visit_BinaryOp(self, node):
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        value = fold_binary(node.op, node.left, node.right)
+        if value is None:
+            return node
+        self.folded += 1
+        return value
+
+    def visit_FunctionCall(self, node):
+        node.args[:] = [self.visit(arg) for arg in node.args]
+        value = fold_builtin(node.name, node.args) if node.name not in self.routines else None
+        if value is None:
+            return node
+        self.folded += 1
+        return value
+
+    def visit_UnaryOp(self, node):
+        node.operand = self.visit(node.operand)
+        value = fold_unary(node.op, node.operand)
+        if value is None:
+            return node
+        self.folded += 1
+        return value
+
+
+def fold_constants(ast):
+    """Aplica o ConstantFolder à AST (no próprio lugar) e devolve-a."""
+    return ConstantFolder().visit(ast)
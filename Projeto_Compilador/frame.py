@@ -0,0 +1,253 @@
+import heapq
+
+from ast_nodes import Node, Var, ArrayAccess, Assign, Readln, For, While, CompoundStatement, ArrayType, RecordType
+from ir import Op
+
+TIPOS_SIMPLES = ('integer', 'real', 'boolean', 'char', 'string')
+
+
+def type_size(type_spec):
+    """
+    Número de células ocupadas por um valor do tipo: os arrays e os registos são guardados de
+    forma contígua (arrays por linhas), os restantes valores ocupam uma célula.
+    """
+    if isinstance(type_spec, ArrayType):
+        lower, upper = type_spec.bounds
+        return (upper - lower + 1) * type_size(type_spec.element_type)
+    if isinstance(type_spec, RecordType):
+        return sum(type_size(decl.type) * len(decl.names) for decl in type_spec.fields)
+    return 1
+
+
+def field_offset(record, field):
+    """(deslocamento, tipo) de um campo dentro de um registo, ou None se o campo não existir."""
+    offset = 0
+    for decl in record.fields:
+        size = type_size(decl.type)
+        for name in decl.names:
+            if name == field:
+                return offset, decl.type
+            offset += size
+    return None
+
+
+def live_ranges(body, symbols):
+    """
+    Intervalo de vida [primeira, última] de cada símbolo de symbols no corpo de uma rotina, em
+    posições de uma numeração dos nós pela ordem de execução. Um ciclo prolonga os intervalos
+    que o intersetam até cobrirem o ciclo inteiro (o valor pode dar a volta pelo salto para trás).
+
+    Só uma atribuição/leitura (readln, for) incondicional, num comando do nível de topo do corpo,
+    define a variável: se o primeiro uso for outro, o intervalo começa na entrada da rotina,
+    porque o valor inicial da célula (0, de PUSHN) pode ser lido.
+    Os símbolos que não são usados não aparecem no resultado.
+    """
+    tracked = set(symbols)
+    ranges = {}
+    position = 0
+
+    def touch(symbol, defines=False):
+        nonlocal position
+        position += 1
+        if symbol not in tracked:
+            return
+        interval = ranges.get(symbol)
+        if interval is None:
+            ranges[symbol] = [position if defines else 0, position]
+        else:
+            interval[1] = position
+
+    def cover_loop(start):
+        for interval in ranges.values():
+            if interval[0] <= position and interval[1] >= start:
+                interval[0] = min(interval[0], start)
+                interval[1] = position
+
+    def store(target, top):
+        if type(target) is Var:
+            touch(target.symbol, top)
+        else:
+            walk(target)
+
+    def walk(node, top=False):
+        nonlocal position
+        kind = type(node)
+        if kind is list:
+            for item in node:
+                walk(item, top)
+            return
+        if not isinstance(node, Node):
+            return
+        position += 1
+        if kind is Var:
+            touch(node.symbol)
+        elif kind is ArrayAccess:
+            walk(node.index)
+            if type(node.name) is str:
+                touch(node.symbol)
+            else:
+                walk(node.name)
+        elif kind is Assign:
+            walk(node.expr)
+            store(node.target, top)
+        elif kind is Readln:
+            for target in node.targets:
+                store(target, top)
+        elif kind is CompoundStatement:
+            walk(node.statements, top)
+        elif kind is For:
+            walk(node.start)
+            touch(node.symbol, top)
+            start = position
+            walk(node.end)  # O limite é avaliado em cada iteração
+            walk(node.body)
+            touch(node.symbol)
+            cover_loop(start)
+        elif kind is While:
+            start = position
+            walk(node.condition)
+            walk(node.body)
+            cover_loop(start)
+        else:
+            for name in kind._fields:
+                walk(getattr(node, name))
+
+    walk(body, top=True)
+    return ranges
+
+
+class FrameLayout:
+    """
+    Disposição do registo de ativação de uma função/procedimento na pilha da EWVM.
+
+    Convenção de chamada (igual para funções e procedimentos):
+      - o chamador de uma função reserva uma célula para o resultado (PUSHI 0), empilha os
+        argumentos da esquerda para a direita e faz CALL, que aponta fp para o topo da pilha:
+        com n parâmetros, o parâmetro i (a contar de 0) fica em fp[i - n] e o resultado em
+        fp[-n - 1];
+      - a rotina reserva com PUSHN as células fp[0], fp[1], ... para os arrays e registos locais
+        (contíguos, no início do frame), as restantes variáveis locais e os temporários, e
+        liberta-as (POP) antes de RETURN;
+      - depois do CALL, o chamador descarta os argumentos (POP n) e fica com o resultado no
+        topo da pilha; uma função chamada como comando descarta também o resultado.
+    Variáveis simples com intervalos de vida disjuntos partilham a mesma célula.
+
+    O programa principal usa um FrameLayout com local=False só para os temporários, que ficam
+    na área global a seguir às variáveis globais (slots).
+    """
+
+    def __init__(self, name, reuse=True, local=True):
+        self.name = name
+        self.reuse = reuse  # Partilhar células entre variáveis com vidas disjuntas
+        self.local = local  # Células endereçadas a partir de fp (rotinas) ou de gp (programa principal)
+        self.params = []  # Symbol dos parâmetros, pela ordem da declaração
+        self.result = None  # Symbol do resultado de uma função (na célula reservada pelo chamador)
+        self.locals = []  # Symbol das variáveis locais
+        self.slots = 0  # Células das variáveis locais
+        self.zeroed = []  # Células que o corpo pode ler antes de as escrever (ver allocate)
+        self.temps = 0  # Células temporárias (depois das variáveis)
+        self._free_temps = []
+
+    def add_param(self, symbol):
+        self.params.append(symbol)
+        return symbol
+
+    def set_result(self, symbol):
+        self.result = symbol
+        return symbol
+
+    def add_local(self, symbol):
+        self.locals.append(symbol)
+        return symbol
+
+    @property
+    def load_op(self):
+        return Op.PUSHL if self.local else Op.PUSHG
+
+    @property
+    def store_op(self):
+        return Op.STOREL if self.local else Op.STOREG
+
+    @property
+    def size(self):
+        """Células reservadas pelo PUSHN do prólogo."""
+        return self.slots + self.temps
+
+    def allocate(self, body):
+        """
+        Atribui os offsets dos parâmetros e das variáveis locais, depois de resolvidas as
+        referências do corpo (symbols.resolve). As variáveis que o corpo não usa não ocupam células.
+        Guarda em zeroed as células cujo valor inicial (0, de PUSHN) pode ser lido: uma chamada
+        terminal que reutiliza o frame tem de as repor.
+        """
+        count = len(self.params)
+        for index, symbol in enumerate(self.params):
+            symbol.offset = index - count
+        if self.result is not None:
+            self.result.offset = -count - 1
+
+        # Arrays e registos ficam com células próprias no início do frame
+        slots = 0
+        scalars = []
+        for symbol in self.locals:
+            if isinstance(symbol.type, (ArrayType, RecordType)):
+                symbol.offset = slots
+                slots += type_size(symbol.type)
+            else:
+                scalars.append(symbol)
+
+        zeroed = list(range(slots))
+        if not self.reuse:
+            for symbol in scalars:
+                symbol.offset = slots
+                slots += 1
+            self.slots = slots
+            self.zeroed = list(range(slots))
+            return
+
+        ranges = live_ranges(body, scalars)
+        whole = [0, float('inf')]
+        intervals = []
+        for order, symbol in enumerate(scalars):
+            interval = ranges.get(symbol)
+            if symbol.type not in TIPOS_SIMPLES:
+                interval = whole  # Tipos sem nome conhecido: a célula fica reservada
+            elif interval is None:
+                symbol.offset = None
+                continue
+            intervals.append((interval[0], order, interval[1], symbol))
+
+        # Linear scan: cada variável fica com a célula livre mais baixa quando o seu intervalo começa
+        intervals.sort(key=lambda item: (item[0], item[1]))
+        active = []  # (fim, offset) das variáveis vivas
+        free = []
+        for start, _, end, symbol in intervals:
+            while active and active[0][0] < start:
+                heapq.heappush(free, heapq.heappop(active)[1])
+            if free:
+                symbol.offset = heapq.heappop(free)
+            else:
+                symbol.offset = slots
+                slots += 1
+            heapq.heappush(active, (end, symbol.offset))
+            if start == 0:
+                zeroed.append(symbol.offset)
+        self.slots = slots
+        self.zeroed = sorted(set(zeroed))
+
+    def allocate_temp(self):
+        """Reserva uma célula temporária, a libertar com release_temp, e devolve o seu offset."""
+        if self._free_temps:
+            return heapq.heappop(self._free_temps)
+        offset = self.slots + self.temps
+        self.temps += 1
+        return offset
+
+    def release_temp(self, offset):
+        heapq.heappush(self._free_temps, offset)
+
+    def report(self):
+        """Resumo da disposição, para as mensagens de depuração e os benchmarks."""
+        used = sum(1 for symbol in self.locals if symbol.offset is not None)
+        return (f"{self.name}: {self.size} células ({len(self.params)} parâmetros, {used} variáveis "
+                f"em {self.slots} células, {self.temps} temporários)")
@@ -0,0 +1,82 @@
+from ast_nodes import Node, Var, Assign, Return, Exit, FunctionCall, CompoundStatement, IfElse
+from frame import TIPOS_SIMPLES
+
+def is_leaf(body):
+    """Se o corpo não chama funções nem procedimentos (além das predefinidas, como length)."""
+    kind = type(body)
+    if kind is list:
+        return all(is_leaf(item) for item in body)
+    if not isinstance(body, Node):
+        return True
+    if kind is FunctionCall and not body.builtin:
+        return False
+    if kind is Var and body.symbol is None:
+        return False  # Função sem argumentos chamada sem parênteses
+    return all(is_leaf(getattr(body, name)) for name in kind._fields)
+
+
+def may_leave(stmt):
+    """Se o comando pode sair da rotina (RETURN ou EXIT em algum caminho)."""
+    kind = type(stmt)
+    if kind is Return or kind is Exit:
+        return True
+    if kind is list:
+        return any(may_leave(item) for item in stmt)
+    if not isinstance(stmt, Node):
+        return False
+    return any(may_leave(getattr(stmt, name)) for name in kind._fields)
+
+
+def assigns_result(stmt, result):
+    """
+    Se o comando atribui sempre um valor ao resultado da função antes de sair: nesse caso a
+    célula do resultado não precisa de começar a 0.
+    """
+    kind = type(stmt)
+    if kind is Assign:
+        return type(stmt.target) is Var and stmt.target.symbol is result
+    if kind is Return:
+        return stmt.expr is not None
+    if kind is IfElse:
+        return assigns_result(stmt.then_part, result) and assigns_result(stmt.else_part, result)
+    if kind is CompoundStatement:
+        for item in stmt.statements or ():
+            if assigns_result(item, result):
+                return True
+            if may_leave(item):
+                return False
+    return False
+
+
+def inline_template(frame, body, size):
+    """
+    Modelo para expandir uma rotina nos pontos de chamada, ou None se não puder ser expandida:
+    só as rotinas folha (sem chamadas, por isso também não recursivas) com parâmetros e
+    variáveis locais de tipos simples. size é o número de instruções do corpo compilado, sem
+    o prólogo e os epílogos.
+    """
+    symbols = frame.params + frame.locals + ([frame.result] if frame.result is not None else [])
+    if any(symbol.type not in TIPOS_SIMPLES for symbol in symbols) or not is_leaf(body):
+        return None
+    return {
+        'body': body,
+        'params': list(frame.params),
+        'locals': [symbol for symbol in frame.locals if symbol.offset is not None],
+        'result': frame.result,
+        'slots': frame.slots,
+        'zeroed': list(frame.zeroed),
+        'init_result': frame.result is not None and not assigns_result(body, frame.result),
+        'size': size,
+    }
+
+
+def inline_cost(template):
+    """
+    Crescimento do código em cada ponto de chamada expandido: o corpo, a cópia dos argumentos
+    para as células dos parâmetros e a inicialização das células lidas antes de escritas,
+    menos as instruções da chamada que deixam de existir (PUSHA, CALL, o POP dos argumentos e,
+    numa função, o PUSHI da célula do resultado, que a expansão troca pela leitura do resultado).
+    """
+    params = len(template['params'])
+    cost = template['size'] + params + 2 * (len(template['zeroed']) + template['init_result'])
+    return cost - 2 - (1 if params else 0)
@@ -0,0 +1,187 @@
+import copy
+import re
+
+from analex import lexer
+from anasin import parser
+from ast_nodes import Function, BinaryOp, FunctionCall
+from ir import representable
+
+TEXTO = ('string', 'char')
+ORDINAIS = ('integer', 'char', 'boolean')
+_INTEIRO = re.compile(r'[+-]?[0-9]+')
+
+
+def _copy(s, index, count):
+    """copy do Pascal: count caracteres a partir da posição index (as posições começam em 1)."""
+    inicio = max(index, 1) - 1
+    return s[inicio:inicio + max(count, 0)]
+
+
+def _chr(code):
+    # Só os caracteres imprimíveis passam a literais (os outros não se podem escrever num PUSHS)
+    if not 32 <= code < 127:
+        raise ValueError(code)
+    return chr(code)
+
+
+def _strtoint(text):
+    # Só os inteiros escritos como em Pascal: o int do Python aceita também ' 7 ', '1_0', ...
+    if not _INTEIRO.fullmatch(text):
+        raise ValueError(text)
+    return int(text)
+
+
+def _upcase(c):
+    return c.upper() if 'a' <= c <= 'z' else c
+
+
+class Builtin:
+    """
+    Função predefinida: os tipos aceites em cada argumento (variadic: qualquer número de
+    argumentos, todos com os tipos do primeiro), o tipo do resultado e a função que a avalia
+    em tempo de compilação quando os argumentos são literais (ou None).
+    """
+    __slots__ = ('name', 'params', 'return_type', 'variadic', 'fold')
+
+    def __init__(self, name, params, return_type, variadic=False, fold=None):
+        self.name = name
+        self.params = params
+        self.return_type = return_type
+        self.variadic = variadic
+        self.fold = fold
+
+    def expected(self, count):
+        """Tipos aceites em cada um de count argumentos, ou None se a função não aceita count argumentos."""
+        if self.variadic:
+            return [self.params[0]] * count if count >= 1 else None
+        return list(self.params) if count == len(self.params) else None
+
+
+BUILTINS = {builtin.name: builtin for builtin in (
+    Builtin('length', (('string', 'char', 'array'),), 'integer', fold=len),
+    Builtin('concat', (TEXTO,), 'string', variadic=True, fold=lambda *parts: ''.join(parts)),
+    Builtin('copy', (TEXTO, ('integer',), ('integer',)), 'string', fold=_copy),
+    Builtin('pos', (TEXTO, TEXTO), 'integer', fold=lambda sub, s: s.find(sub) + 1 if sub else 0),
+    Builtin('ord', (ORDINAIS,), 'integer', fold=lambda value: int(value) if isinstance(value, int) else ord(value)),
+    Builtin('chr', (('integer',),), 'char', fold=_chr),
+    Builtin('upcase', (('char',),), 'char', fold=_upcase),
+    Builtin('inttostr', (('integer',),), 'string', fold=str),
+    Builtin('strtoint', (TEXTO,), 'integer', fold=_strtoint),
+)}
+
+
+def _append_char(codes, indent='  '):
+    """
+    Comando Pascal que junta a r o caractere de código k, escolhido por pesquisa binária entre
+    os literais codes: a EWVM não tem instrução que converta um código ASCII numa string.
+    """
+    if len(codes) == 1:
+        return f"{indent}if k = {codes[0]} then r := r + #{codes[0]}"
+    middle = len(codes) // 2
+    return (f"{indent}if k < {codes[middle]} then\n{indent}begin\n{_append_char(codes[:middle], indent + '  ')}\n"
+            f"{indent}end\n{indent}else\n{indent}begin\n{_append_char(codes[middle:], indent + '  ')}\n{indent}end")
+
+
+# Caracteres que copy e setchar conseguem pôr numa string (os outros não se podem escrever num PUSHS)
+_CODES = [code for code in range(128) if representable(chr(code))]
+
+# Funções predefinidas sem instrução na EWVM, escritas em Pascal e compiladas (como uma rotina
+# normal) só nos programas que as usam. poschar é o pos de um char que não é literal: um
+# código ASCII não pode ser convertido numa string de um caractere na VM. setchar devolve s
+# com o caractere n trocado por c (a atribuição s[n] := c).
+LIBRARY = {
+    'pos': """
+function pos(sub, s: string): integer;
+var i, j, n: integer;
+    igual: boolean;
+begin
+  n := length(sub);
+  if n = 0 then return 0;
+  for i := 1 to length(s) - n + 1 do
+  begin
+    j := 1;
+    igual := true;
+    while igual and (j <= n) do
+      if s[i + j - 1] = sub[j] then j := j + 1 else igual := false;
+    if igual then return i
+  end;
+  return 0
+end;
+""",
+    'poschar': """
+function poschar(c: char; s: string): integer;
+var i: integer;
+begin
+  for i := 1 to length(s) do
+    if s[i] = c then return i;
+  return 0
+end;
+""",
+    'copy': f"""
+function copy(s: string; index, count: integer): string;
+var i, k, inicio, fim: integer;
+    r: string;
+begin
+  r := '';
+  inicio := index;
+  if inicio < 1 then inicio := 1;
+  fim := inicio + count - 1;
+  if fim > length(s) then fim := length(s);
+  for i := inicio to fim do
+  begin
+    k := ord(s[i]);
+{_append_char(_CODES, '    ')}
+  end;
+  return r
+end;
+""",
+    'setchar': f"""
+function setchar(s: string; n: integer; c: char): string;
+var i, k: integer;
+    r: string;
+begin
+  r := '';
+  for i := 1 to length(s) do
+  begin
+    if i = n then k := ord(c) else k := ord(s[i]);
+{_append_char(_CODES, '    ')}
+  end;
+  return r
+end;
+""",
+}
+
+
+def library_routine(name):
+    """
+    AST (nó Function) da rotina name da biblioteca. Usa uma cópia do parser e do lexer, como
+    uma CompilerSession, para poder ser chamada durante compilações em paralelo.
+    """
+    code = f"program biblioteca;\n{LIBRARY[name]}\nbegin\nend.\n"
+    routine_lexer = lexer.clone()
+    routine_lexer.lineno = 1
+    ast = copy.copy(parser).parse(code, lexer=routine_lexer)
+    return next(decl[1] for decl in ast[2][1][1] if type(decl[1]) is Function)
+
+
+def concat_parts(expr):
+    """
+    Partes de uma concatenação (operador + sobre strings e concat, encadeados), pela ordem,
+    com os literais adjacentes já juntos e os literais vazios removidos.
+    """
+    parts = []
+
+    def walk(node):
+        if type(node) is BinaryOp and node.type == 'string':
+            walk(node.left)
+            walk(node.right)
+        elif type(node) is FunctionCall and node.builtin and node.name == 'concat':
+            for arg in node.args:
+                walk(arg)
+        elif isinstance(node, str) and parts and isinstance(parts[-1], str):
+            parts[-1] += node
+        elif not (isinstance(node, str) and node == ''):
+            parts.append(node)
+
+    walk(expr)
+    return parts
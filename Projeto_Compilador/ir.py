@@ -0,0 +1,216 @@
+import enum
+
+
+class Op(enum.Enum):
+    """Instruções da EWVM geradas pelo compilador."""
+    PUSHI = 'PUSHI'
+    PUSHF = 'PUSHF'
+    PUSHS = 'PUSHS'
+    PUSHN = 'PUSHN'
+    PUSHG = 'PUSHG'
+    PUSHL = 'PUSHL'
+    PUSHSP = 'PUSHSP'
+    PUSHFP = 'PUSHFP'
+    PUSHGP = 'PUSHGP'
+    LOAD = 'LOAD'
+    LOADN = 'LOADN'
+    DUP = 'DUP'
+    DUPN = 'DUPN'
+    POP = 'POP'
+    POPN = 'POPN'
+    STOREL = 'STOREL'
+    STOREG = 'STOREG'
+    STORE = 'STORE'
+    STOREN = 'STOREN'
+    SWAP = 'SWAP'
+    CHECK = 'CHECK'
+    ADD = 'ADD'
+    SUB = 'SUB'
+    MUL = 'MUL'
+    DIV = 'DIV'
+    MOD = 'MOD'
+    NOT = 'NOT'
+    INF = 'INF'
+    INFEQ = 'INFEQ'
+    SUP = 'SUP'
+    SUPEQ = 'SUPEQ'
+    EQUAL = 'EQUAL'
+    AND = 'AND'
+    OR = 'OR'
+    FADD = 'FADD'
+    FSUB = 'FSUB'
+    FMUL = 'FMUL'
+    FDIV = 'FDIV'
+    FINF = 'FINF'
+    FINFEQ = 'FINFEQ'
+    FSUP = 'FSUP'
+    FSUPEQ = 'FSUPEQ'
+    ITOF = 'ITOF'
+    FTOI = 'FTOI'
+    STRI = 'STRI'
+    STRF = 'STRF'
+    CONCAT = 'CONCAT'
+    CHARAT = 'CHARAT'
+    STRLEN = 'STRLEN'
+    CHRCODE = 'CHRCODE'
+    ATOI = 'ATOI'
+    ATOF = 'ATOF'
+    ALLOC = 'ALLOC'
+    ALLOCN = 'ALLOCN'
+    FREE = 'FREE'
+    PADD = 'PADD'
+    JUMP = 'JUMP'
+    JZ = 'JZ'
+    PUSHA = 'PUSHA'
+    CALL = 'CALL'
+    RETURN = 'RETURN'
+    START = 'START'
+    NOP = 'NOP'
+    ERR = 'ERR'
+    STOP = 'STOP'
+    WRITEI = 'WRITEI'
+    WRITEF = 'WRITEF'
+    WRITES = 'WRITES'
+    WRITECHR = 'WRITECHR'
+    WRITELN = 'WRITELN'
+    READ = 'READ'
+
+
+# Instruções que terminam um bloco básico sem continuar na instrução seguinte
+TERMINATORS = frozenset({Op.JUMP, Op.RETURN, Op.STOP})
+# Instruções cujo operando é um rótulo
+BRANCHES = frozenset({Op.JUMP, Op.JZ, Op.PUSHA})
+
+
+class Label:
+    """
+    Rótulo do código. Os rótulos gerados têm prefixo e número (ENDIF2, LoopEnd1, ...); os das
+    rotinas usam só o nome. A mesma instância serve de definição e de operando dos saltos,
+    por isso renumerar um rótulo altera todas as suas referências.
+    """
+    __slots__ = ('prefix', 'number')
+
+    def __init__(self, prefix, number=None):
+        self.prefix = prefix
+        self.number = number
+
+    @property
+    def name(self):
+        return self.prefix if self.number is None else f'{self.prefix}{self.number}'
+
+    def __eq__(self, other):
+        return isinstance(other, Label) and self.name == other.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return f'Label({self.name})'
+
+
+class Instr:
+    """Instrução: operação, operando (int, float, str, Label, par de inteiros ou None) e comentário."""
+    __slots__ = ('op', 'arg', 'comment')
+
+    def __init__(self, op, arg=None, comment=None):
+        self.op = op
+        self.arg = arg
+        self.comment = comment
+
+    def __repr__(self):
+        return f'Instr({self.op.value}, {self.arg!r})' if self.arg is not None else f'Instr({self.op.value})'
+
+
+class Comment:
+    """Linha de comentário (texto vazio: linha em branco)."""
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __repr__(self):
+        return f'Comment({self.text!r})'
+
+
+class BasicBlock:
+    """Sequência de instruções com uma única entrada (os rótulos no início) e uma única saída."""
+    __slots__ = ('labels', 'items')
+
+    def __init__(self):
+        self.labels = []
+        self.items = []  # Instruções e comentários, pela ordem do código
+
+    @property
+    def instructions(self):
+        return [item for item in self.items if isinstance(item, Instr)]
+
+    @property
+    def falls_through(self):
+        """Se a execução pode continuar no bloco seguinte."""
+        instructions = self.instructions
+        return not instructions or instructions[-1].op not in TERMINATORS
+
+
+def basic_blocks(code):
+    """Divide o código em blocos básicos: um bloco começa num rótulo e termina num salto/RETURN/STOP."""
+    blocks = [BasicBlock()]
+    for item in code:
+        current = blocks[-1]
+        if isinstance(item, Label):
+            if current.instructions:
+                current = BasicBlock()
+                blocks.append(current)
+            current.labels.append(item)
+        else:
+            current.items.append(item)
+            if isinstance(item, Instr) and (item.op in TERMINATORS or item.op is Op.JZ):
+                blocks.append(BasicBlock())
+    if not blocks[-1].labels and not blocks[-1].items:
+        blocks.pop()
+    return blocks
+
+
+def flatten(blocks):
+    """Volta a juntar os blocos básicos numa lista de código."""
+    code = []
+    for block in blocks:
+        code.extend(block.labels)
+        code.extend(block.items)
+    return code
+
+
+# Caracteres que só podem aparecer escapados numa string da EWVM
+STRING_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t'}
+_ESCAPE_TABLE = str.maketrans(STRING_ESCAPES)
+
+
+def representable(text):
+    """Se o texto pode ser escrito numa string da EWVM (os outros caracteres de controlo não têm escape)."""
+    return all(c >= ' ' or c in STRING_ESCAPES for c in text)
+
+
+def format_operand(op, arg):
+    if isinstance(arg, Label):
+        return arg.name
+    if op is Op.PUSHS or op is Op.ERR:
+        return f'"{arg.translate(_ESCAPE_TABLE)}"'
+    if op is Op.CHECK:
+        return f'{arg[0]},{arg[1]}'
+    return str(arg)
+
+
+def to_text(code, comments=True):
+    """Serializa o código para texto EWVM."""
+    lines = []
+    append = lines.append
+    for item in code:
+        if isinstance(item, Instr):
+            line = item.op.value if item.arg is None else f'{item.op.value} {format_operand(item.op, item.arg)}'
+            if comments and item.comment:
+                line = f'{line} // {item.comment}'
+            append(line)
+        elif isinstance(item, Label):
+            append(f'{item.name}:')
+        elif comments:
+            append(f'// {item.text}' if item.text else '')
+    return '\n'.join(lines)
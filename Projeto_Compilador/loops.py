@@ -0,0 +1,134 @@
+from ast_nodes import (Node, Var, ArrayAccess, FieldAccess, Assign, Readln, For, FunctionCall, BinaryOp,
+                       UnaryOp, ArrayType, RecordType)
+
+# Operadores sem efeitos nem erros em execução: uma expressão só com estes operadores pode ser
+# calculada antes do ciclo, mesmo que o corpo não chegue a executá-la (div, mod e / podem falhar)
+OPERADORES_PUROS = ('+', '-', '*', 'and', 'or', 'not', '=', '<>', '<', '<=', '>', '>=')
+
+
+class LoopEffects:
+    """
+    Efeitos do corpo (e da condição) de um ciclo: os símbolos a que atribui valores e se chama
+    funções/procedimentos, que podem alterar qualquer variável global.
+    """
+    __slots__ = ('assigned', 'calls')
+
+    def __init__(self, *nodes):
+        self.assigned = set()
+        self.calls = False
+        for node in nodes:
+            self._walk(node)
+
+    def _store(self, target):
+        # Uma atribuição a a[i] ou r.campo altera a variável a / r
+        while type(target) is not Var:
+            if type(target) is ArrayAccess:
+                if type(target.name) is str:
+                    self.assigned.add(target.symbol)
+                    return
+                target = target.name
+            elif type(target) is FieldAccess:
+                target = target.record
+            else:
+                return
+        self.assigned.add(target.symbol)
+
+    def _walk(self, node):
+        kind = type(node)
+        if kind is list:
+            for item in node:
+                self._walk(item)
+            return
+        if not isinstance(node, Node):
+            return
+        if kind is Assign:
+            self._store(node.target)
+        elif kind is Readln:
+            for target in node.targets:
+                self._store(target)
+        elif kind is For:
+            self.assigned.add(node.symbol)
+        elif kind is FunctionCall:
+            if not node.builtin:
+                self.calls = True
+        elif kind is Var and node.symbol is None:
+            self.calls = True  # Função sem argumentos chamada sem parênteses
+        for name in kind._fields:
+            self._walk(getattr(node, name))
+
+    def invariant(self, expr):
+        """Se expr tem o mesmo valor em todas as iterações e pode ser calculada antes do ciclo."""
+        kind = type(expr)
+        if kind is Var:
+            symbol = expr.symbol
+            if symbol is None:
+                return False
+            return symbol.kind == 'const' or (symbol not in self.assigned and (symbol.local or not self.calls))
+        if kind is BinaryOp:
+            return (expr.op.lower() in OPERADORES_PUROS and self.invariant(expr.left)
+                    and self.invariant(expr.right))
+        if kind is UnaryOp:
+            return self.invariant(expr.operand)
+        return not isinstance(expr, Node)
+
+
+def invariant_expressions(effects, *nodes):
+    """
+    Maiores subexpressões invariantes (operações, não variáveis nem literais) de nodes, pela
+    ordem em que aparecem: são as que vale a pena calcular uma só vez, antes do ciclo.
+    """
+    found = []
+
+    def walk(node):
+        kind = type(node)
+        if kind is list:
+            for item in node:
+                walk(item)
+            return
+        if not isinstance(node, Node):
+            return
+        if (kind is BinaryOp or kind is UnaryOp) and effects.invariant(node):
+            found.append(node)
+            return
+        if kind is ArrayAccess:
+            # Em a[i + c] a constante já entra no deslocamento do elemento (ver element_location)
+            index = node.index
+            if type(index) is BinaryOp and index.op in ('+', '-') and type(index.right) is int:
+                index = index.left
+            walk(index)
+            walk(node.name)
+            return
+        for name in kind._fields:
+            walk(getattr(node, name))
+
+    for node in nodes:
+        walk(node)
+    return found
+
+
+def element_accesses(node):
+    """Acessos a elementos simples (não arrays nem registos inteiros) de arrays e registos em node."""
+    kind = type(node)
+    if kind is list:
+        for item in node:
+            yield from element_accesses(item)
+        return
+    if not isinstance(node, Node):
+        return
+    if (kind is ArrayAccess or kind is FieldAccess) and not isinstance(node.type, (ArrayType, RecordType)):
+        yield node
+    for name in kind._fields:
+        yield from element_accesses(getattr(node, name))
+
+
+def index_cost(expr):
+    """Estimativa do número de instruções que calculam um índice."""
+    return 1 if type(expr) is Var or not isinstance(expr, Node) else 3
+
+
+def access_cost(terms, offset):
+    """Instruções de um acesso com push_location e LOADN/STOREN (ver PascalToVMCompiler.push_location)."""
+    cost = 2 + len(terms) - 1  # Base, LOADN/STOREN e um ADD por cada termo depois do primeiro
+    for index, stride, _ in terms:
+        cost += index_cost(index) + (2 if stride != 1 else 0)
+    return cost + (2 if offset else 0)
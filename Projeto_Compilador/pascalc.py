@@ -0,0 +1,180 @@
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from buildcache import DIRETORIO_CACHE
+
+# Sessão de compilação de cada processo (criada uma vez por worker, no initializer)
+_sessao = None
+
+
+def _iniciar_worker(diretorio_cache=None, otimizar=False, release=False, curto_circuito=False,
+                    verificar_limites=False):
+    """Aquece o worker: importa o compilador e carrega as tabelas de parsing uma única vez."""
+    global _sessao
+    from buildcache import BuildCache
+    from peephole import Peephole
+    from session import CompilerSession
+    _sessao = CompilerSession(cache=BuildCache(diretorio_cache) if diretorio_cache else None,
+                              peephole=Peephole() if otimizar else None,
+                              comments=not release, short_circuit=curto_circuito,
+                              check_bounds=verificar_limites)
+
+
+def compilar_ficheiro(tarefa):
+    """
+    Compila um ficheiro .pas e escreve o .vm correspondente.
+    Devolve (origem, destino, segundos, linhas, sucesso, mensagens, código morto removido,
+    chamadas expandidas, verificações de limites).
+    """
+    origem, destino = tarefa
+    if _sessao is None:
+        _iniciar_worker()
+
+    mensagens = io.StringIO()
+    inicio = time.perf_counter()
+    linhas = 0
+    try:
+        # Um ficheiro que não se consegue ler falha sozinho, sem interromper o resto do lote
+        with open(origem, 'rb') as ficheiro:
+            linhas = sum(1 for _ in ficheiro)
+        with contextlib.redirect_stdout(mensagens):
+            codigo_vm = _sessao.compile_file(origem)
+        sucesso = bool(codigo_vm)
+        if sucesso:
+            os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+            with open(destino, 'w', encoding='utf-8') as ficheiro:
+                ficheiro.write(codigo_vm + '\n')
+    except Exception as e:
+        print(f"Erro: {e}", file=mensagens)
+        sucesso = False
+    duracao = time.perf_counter() - inicio
+
+    relevantes = [linha for linha in mensagens.getvalue().splitlines()
+                  if linha and not linha.startswith('DEBUG:')]
+    # Sem compilador (resultado da cache de build) não há relatório de código morto nem das expansões
+    compilador = _sessao.compiler if sucesso else None
+    removido = compilador.dead_code if compilador is not None else None
+    expandidas = compilador.inlined if compilador is not None else None
+    verificacoes = compilador.bounds_checks if compilador is not None and compilador.check_bounds else None
+    return origem, destino, duracao, linhas, sucesso, relevantes, removido, expandidas, verificacoes
+
+
+def recolher_fontes(entradas, diretorio_saida=None):
+    """
+    Expande ficheiros, diretórios (procura recursiva de .pas) e padrões glob em pares
+    (origem, destino). Sem diretório de saída, o .vm fica ao lado do .pas.
+    Devolve (tarefas, entradas que não existem ou cujo padrão não encontrou nenhum ficheiro).
+    """
+    tarefas = []
+    em_falta = []
+    vistos = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            raiz = entrada
+            encontrados = sorted(glob.glob(os.path.join(entrada, '**', '*.pas'), recursive=True))
+        elif glob.has_magic(entrada):
+            raiz = None
+            encontrados = sorted(glob.glob(entrada, recursive=True))
+        else:
+            raiz = None
+            encontrados = [entrada] if os.path.isfile(entrada) else []
+        if not encontrados and not os.path.isdir(entrada):
+            em_falta.append(entrada)
+
+        for origem in encontrados:
+            if origem in vistos:
+                continue
+            vistos.add(origem)
+            base = os.path.splitext(origem)[0] + '.vm'
+            if diretorio_saida is None:
+                destino = base
+            elif raiz is not None:
+                destino = os.path.join(diretorio_saida, os.path.relpath(base, raiz))
+            else:
+                destino = os.path.join(diretorio_saida, os.path.basename(base))
+            tarefas.append((origem, destino))
+    return tarefas, em_falta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pascalc', description='Compilador Pascal -> EWVM em lote')
+    parser.add_argument('entradas', nargs='+', help='ficheiros .pas, diretórios ou padrões glob')
+    parser.add_argument('-o', '--output-dir', help='diretório onde escrever os ficheiros .vm')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='número de processos (por omissão, um por CPU)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='não mostrar o tempo de cada ficheiro')
+    parser.add_argument('--cache', nargs='?', const=DIRETORIO_CACHE, metavar='DIR',
+                        help='reaproveitar compilações anteriores a partir de uma cache de build '
+                             f'(por omissão em {DIRETORIO_CACHE})')
+    parser.add_argument('-O', '--peephole', action='store_true',
+                        help='otimizar o código gerado com o otimizador peephole')
+    parser.add_argument('--release', action='store_true',
+                        help='gerar código VM compacto, sem comentários')
+    parser.add_argument('--curto-circuito', action='store_true',
+                        help='avaliar os AND/OR das condições em curto-circuito (o segundo operando só '
+                             'é avaliado se for preciso)')
+    parser.add_argument('--verificar-limites', action='store_true',
+                        help='verificar em execução os índices dos arrays (exceto os que a análise de '
+                             'intervalos prova estarem sempre dentro dos limites)')
+    args = parser.parse_args(argv)
+
+    tarefas, em_falta = recolher_fontes(args.entradas, args.output_dir)
+    for entrada in em_falta:
+        print(f"Erro: {entrada} não existe")
+    if not tarefas:
+        print("Nenhum ficheiro .pas encontrado.")
+        return 1
+
+    inicio = time.perf_counter()
+    if args.jobs <= 1 or len(tarefas) == 1:
+        _iniciar_worker(args.cache, args.peephole, args.release, args.curto_circuito,
+                        args.verificar_limites)
+        resultados = map(compilar_ficheiro, tarefas)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=args.jobs, initializer=_iniciar_worker,
+                                       initargs=(args.cache, args.peephole, args.release, args.curto_circuito,
+                                                 args.verificar_limites))
+        lote = max(1, len(tarefas) // (args.jobs * 8))
+        resultados = executor.map(compilar_ficheiro, tarefas, chunksize=lote)
+
+    total_linhas = 0
+    falhas = len(em_falta)
+    try:
+        for origem, destino, duracao, linhas, sucesso, mensagens, removido, expandidas, verificacoes in resultados:
+            total_linhas += linhas
+            if not sucesso:
+                falhas += 1
+            if not args.quiet or not sucesso:
+                estado = destino if sucesso else 'FALHOU'
+                detalhes = ''
+                if removido and (removido['rotinas'] or removido['comandos']):
+                    detalhes = (f", código morto: {len(removido['rotinas'])} rotinas ({removido['bytes']} bytes) "
+                             f"e {removido['comandos']} comandos removidos")
+                if expandidas:
+                    rotinas = sorted({rotina for rotina, _ in expandidas})
+                    detalhes += f", {len(expandidas)} chamadas expandidas ({', '.join(rotinas)})"
+                if verificacoes:
+                    detalhes += (f", {verificacoes['emitidas']} verificações de limites "
+                                 f"({verificacoes['eliminadas']} provadas desnecessárias)")
+                print(f"{origem} -> {estado} ({duracao * 1000:.1f} ms, {linhas} linhas{detalhes})")
+            for mensagem in mensagens:
+                print(f"    {mensagem}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    total = time.perf_counter() - inicio
+
+    print(f"\n{len(tarefas) + len(em_falta)} ficheiros ({falhas} com erros) em {total:.2f}s com {args.jobs} processo(s): "
+          f"{len(tarefas) / total:.1f} ficheiros/s, {total_linhas / total:,.0f} linhas/s")
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,355 @@
+from collections import Counter
+
+from ir import Op, Instr, Label, TERMINATORS, BRANCHES, basic_blocks, flatten
+from vm import remover_comentario, divisao_inteira
+
+
+def contar_instrucoes(texto):
+    """Número de instruções (sem rótulos nem comentários) num código VM em texto."""
+    total = 0
+    for linha in texto.splitlines():
+        codigo = remover_comentario(linha).strip()
+        if codigo and not (codigo.endswith(':') and ' ' not in codigo):
+            total += 1
+    return total
+
+
+# Regras sobre uma janela de instruções consecutivas (sem rótulos pelo meio).
+# Cada regra recebe a janela e devolve (instruções consumidas, [Instr, ...]) ou None.
+
+OPERACOES_INTEIRAS = {
+    Op.ADD: lambda a, b: a + b,
+    Op.SUB: lambda a, b: a - b,
+    Op.MUL: lambda a, b: a * b,
+    Op.DIV: lambda a, b: divisao_inteira(a, b) if b else None,
+    Op.MOD: lambda a, b: a - b * divisao_inteira(a, b) if b else None,
+    Op.INF: lambda a, b: int(a < b),
+    Op.INFEQ: lambda a, b: int(a <= b),
+    Op.SUP: lambda a, b: int(a > b),
+    Op.SUPEQ: lambda a, b: int(a >= b),
+    Op.EQUAL: lambda a, b: int(a == b),
+    Op.AND: lambda a, b: int(bool(a and b)),
+    Op.OR: lambda a, b: int(bool(a or b)),
+}
+
+EMPILHAMENTOS = (Op.PUSHI, Op.PUSHF, Op.PUSHS, Op.PUSHG, Op.PUSHL)
+
+# Comparação -> comparação com o resultado negado
+NEGACOES = {Op.INF: Op.SUPEQ, Op.SUPEQ: Op.INF, Op.INFEQ: Op.SUP, Op.SUP: Op.INFEQ}
+
+# Tamanho máximo da condição de um ciclo que é copiada para o fim do ciclo
+MAX_CONDICAO_CICLO = 10
+
+
+def _inteiro(instr):
+    """Valor de um PUSHI, ou None."""
+    return instr.arg if instr.op is Op.PUSHI else None
+
+
+def regra_constantes(j):
+    """PUSHI a; PUSHI b; OP -> PUSHI (a OP b), e PUSHI a; NOT -> PUSHI (not a)."""
+    a = _inteiro(j[0])
+    if a is None or len(j) < 2:
+        return None
+    if j[1].op is Op.NOT:
+        return 2, [Instr(Op.PUSHI, int(not a))]
+    b = _inteiro(j[1])
+    if b is None or len(j) < 3 or j[2].op not in OPERACOES_INTEIRAS:
+        return None
+    valor = OPERACOES_INTEIRAS[j[2].op](a, b)
+    if valor is None:
+        return None
+    return 3, [Instr(Op.PUSHI, valor)]
+
+
+def regra_elemento_neutro(j):
+    """PUSHI 0; ADD|SUB|PADD e PUSHI 1; MUL|DIV não fazem nada."""
+    if len(j) < 2:
+        return None
+    valor = _inteiro(j[0])
+    if (valor == 0 and j[1].op in (Op.ADD, Op.SUB, Op.PADD)) or (valor == 1 and j[1].op in (Op.MUL, Op.DIV)):
+        return 2, []
+    return None
+
+
+def regra_indice_deslocado(j):
+    """
+    PUSHI k; SUB; PADD; LOAD n -> PADD; LOAD n-k (o mesmo com SWAP; STORE n e com ADD).
+    Elimina o ajuste do índice 1-based dos arrays, passando-o para o deslocamento do LOAD/STORE.
+    """
+    k = _inteiro(j[0])
+    if k is None or len(j) < 4 or j[1].op not in (Op.SUB, Op.ADD) or j[2].op is not Op.PADD:
+        return None
+    sinal = -1 if j[1].op is Op.SUB else 1
+    if j[3].op is Op.LOAD:
+        return 4, [Instr(Op.PADD), Instr(Op.LOAD, j[3].arg + sinal * k)]
+    if len(j) >= 5 and j[3].op is Op.SWAP and j[4].op is Op.STORE:
+        return 5, [Instr(Op.PADD), Instr(Op.SWAP), Instr(Op.STORE, j[4].arg + sinal * k)]
+    return None
+
+
+def regra_salto_constante(j):
+    """PUSHI 0; JZ L -> JUMP L; PUSHI c; JZ L (c != 0) desaparece."""
+    c = _inteiro(j[0])
+    if c is None or len(j) < 2 or j[1].op is not Op.JZ:
+        return None
+    return 2, [Instr(Op.JUMP, j[1].arg)] if c == 0 else []
+
+
+def regra_not_not(j):
+    """NOT; NOT; JZ L -> JZ L."""
+    if len(j) >= 3 and j[0].op is Op.NOT and j[1].op is Op.NOT and j[2].op is Op.JZ:
+        return 2, []
+    return None
+
+
+def regra_swap_swap(j):
+    """SWAP; SWAP não faz nada."""
+    if len(j) >= 2 and j[0].op is Op.SWAP and j[1].op is Op.SWAP:
+        return 2, []
+    return None
+
+
+def regra_empilhar_descartar(j):
+    """PUSHx; POP 1 não faz nada."""
+    if len(j) >= 2 and j[0].op in EMPILHAMENTOS and j[1].op is Op.POP and j[1].arg == 1:
+        return 2, []
+    return None
+
+
+class Peephole:
+    """
+    Otimizador peephole sobre o código intermédio (ir.py) gerado pelo PascalToVMCompiler.
+    As regras são aplicadas repetidamente até nenhuma alterar o código; o número de
+    aplicações de cada regra fica em estatisticas.
+    """
+
+    # Nome -> (regra, tamanho da janela). As regras globais têm tamanho None.
+    REGRAS = {
+        'constantes': (regra_constantes, 3),
+        'elemento_neutro': (regra_elemento_neutro, 2),
+        'indice_deslocado': (regra_indice_deslocado, 5),
+        'salto_constante': (regra_salto_constante, 2),
+        'not_not': (regra_not_not, 3),
+        'swap_swap': (regra_swap_swap, 2),
+        'empilhar_descartar': (regra_empilhar_descartar, 2),
+        'salto_seguinte': ('_salto_seguinte', None),
+        'saltos_encadeados': ('_saltos_encadeados', None),
+        'rotacao_ciclos': ('_rotacao_ciclos', None),
+        'codigo_inalcancavel': ('_codigo_inalcancavel', None),
+        'rotulos_nao_usados': ('_rotulos_nao_usados', None),
+    }
+
+    def __init__(self, regras=None):
+        nomes = list(self.REGRAS) if regras is None else list(regras)
+        for nome in nomes:
+            if nome not in self.REGRAS:
+                raise ValueError(f"Regra peephole desconhecida: {nome}")
+        self.regras = nomes
+        self.estatisticas = Counter()
+
+    def configuracao(self):
+        """Texto que identifica as regras ativas (usado nas chaves da cache de build)."""
+        return 'peephole:' + ','.join(self.regras)
+
+    def optimize(self, code):
+        """Devolve o código (lista de Instr, Label e Comment) otimizado."""
+        itens = list(code)
+        alterado = True
+        while alterado:
+            alterado = False
+            for nome in self.regras:
+                regra, tamanho = self.REGRAS[nome]
+                if tamanho is None:
+                    aplicacoes = getattr(self, regra)(itens)
+                else:
+                    aplicacoes = self._aplicar_janelas(itens, regra, tamanho)
+                if aplicacoes:
+                    self.estatisticas[nome] += aplicacoes
+                    alterado = True
+        return itens
+
+    def relatorio(self):
+        """Linhas de texto com o número de aplicações de cada regra."""
+        return [f"{nome}: {self.estatisticas[nome]}" for nome in self.regras if self.estatisticas[nome]]
+
+    @staticmethod
+    def _aplicar_janelas(itens, regra, tamanho):
+        aplicacoes = 0
+        i = 0
+        while i < len(itens):
+            if not isinstance(itens[i], Instr):
+                i += 1
+                continue
+            # Janela: próximas instruções até ao primeiro rótulo (os comentários são ignorados)
+            indices = []
+            j = i
+            while j < len(itens) and len(indices) < tamanho and not isinstance(itens[j], Label):
+                if isinstance(itens[j], Instr):
+                    indices.append(j)
+                j += 1
+            resultado = regra([itens[k] for k in indices])
+            if resultado is None:
+                i += 1
+                continue
+            consumidas, novas = resultado
+            for k in reversed(indices[:consumidas]):
+                del itens[k]
+            itens[i:i] = novas
+            aplicacoes += 1
+            # Volta atrás para que a substituição possa formar um padrão com as instruções anteriores
+            while i > 0 and not isinstance(itens[i - 1], Label):
+                i -= 1
+                if isinstance(itens[i], Instr):
+                    break
+        return aplicacoes
+
+    @staticmethod
+    def _rotulos_seguintes(itens, i):
+        """Rótulos imediatamente a seguir à posição i (antes da próxima instrução)."""
+        rotulos = set()
+        for item in itens[i + 1:]:
+            if isinstance(item, Instr):
+                break
+            if isinstance(item, Label):
+                rotulos.add(item)
+        return rotulos
+
+    def _salto_seguinte(self, itens):
+        """JUMP L imediatamente antes de L: é eliminado."""
+        aplicacoes = 0
+        i = 0
+        while i < len(itens):
+            item = itens[i]
+            if isinstance(item, Instr) and item.op is Op.JUMP and item.arg in self._rotulos_seguintes(itens, i):
+                del itens[i]
+                aplicacoes += 1
+            else:
+                i += 1
+        return aplicacoes
+
+    def _saltos_encadeados(self, itens):
+        """JUMP/JZ L, em que L: começa com JUMP M, passa a saltar diretamente para M."""
+        primeira = {}  # rótulo -> primeira instrução a seguir
+        pendentes = []
+        for item in itens:
+            if isinstance(item, Label):
+                pendentes.append(item)
+            elif isinstance(item, Instr):
+                for rotulo in pendentes:
+                    primeira[rotulo] = item
+                pendentes = []
+
+        aplicacoes = 0
+        for i, item in enumerate(itens):
+            if not isinstance(item, Instr) or item.op not in (Op.JUMP, Op.JZ):
+                continue
+            destino = item.arg
+            vistos = {destino}
+            while destino in primeira and primeira[destino].op is Op.JUMP and primeira[destino].arg not in vistos:
+                destino = primeira[destino].arg
+                vistos.add(destino)
+            if destino != item.arg:
+                itens[i] = Instr(item.op, destino, item.comment)
+                aplicacoes += 1
+        return aplicacoes
+
+    def _rotacao_ciclos(self, itens):
+        """
+        JUMP Lc de volta à condição de um ciclo (Lc: cond; CMP; JZ Lfim, com Lfim logo a seguir
+        ao JUMP) passa a ser uma cópia da condição com a comparação negada e JZ para o corpo:
+        cada iteração deixa de executar o JUMP.
+        """
+        rotulos = {item: i for i, item in enumerate(itens) if isinstance(item, Label)}
+        aplicacoes = 0
+        i = 0
+        while i < len(itens):
+            item = itens[i]
+            if not isinstance(item, Instr) or item.op is not Op.JUMP or item.arg not in rotulos:
+                i += 1
+                continue
+            condicao = self._condicao_ciclo(itens, rotulos[item.arg])
+            if condicao is None or condicao[-1][1] not in self._rotulos_seguintes(itens, i):
+                i += 1
+                continue
+            indice_jz, fim = condicao[-1][0], condicao[-1][1]
+            negada = self._negar(condicao[:-1])
+            if negada is None:
+                i += 1
+                continue
+
+            # Rótulo para o corpo do ciclo, logo a seguir ao JZ da condição original
+            corpo = self._novo_rotulo(rotulos)
+            itens.insert(indice_jz + 1, corpo)
+            if indice_jz < i:
+                i += 1
+            itens[i:i + 1] = negada + [Instr(Op.JZ, corpo)]
+            rotulos = {item: k for k, item in enumerate(itens) if isinstance(item, Label)}
+            aplicacoes += 1
+            i += len(negada) + 1
+        return aplicacoes
+
+    @staticmethod
+    def _condicao_ciclo(itens, inicio):
+        """
+        Instruções da condição que começa no rótulo da posição inicio, terminando com
+        (índice do JZ, rótulo de saída); None se não tiver a forma esperada.
+        """
+        condicao = []
+        for k in range(inicio + 1, len(itens)):
+            item = itens[k]
+            if not isinstance(item, Instr):
+                if isinstance(item, Label) and condicao:
+                    return None
+                continue
+            if len(condicao) > MAX_CONDICAO_CICLO:
+                return None
+            if item.op is Op.JZ:
+                return condicao + [(k, item.arg)] if condicao else None
+            if item.op in TERMINATORS or item.op in (Op.CALL, Op.READ):
+                return None
+            condicao.append(Instr(item.op, item.arg))
+        return None
+
+    @staticmethod
+    def _negar(condicao):
+        """Condição com o resultado negado, sem instruções extra; None se não for possível."""
+        op = condicao[-1].op
+        if op in NEGACOES:
+            return condicao[:-1] + [Instr(NEGACOES[op])]
+        if op is Op.NOT:
+            return condicao[:-1] if len(condicao) > 1 else None
+        return None
+
+    @staticmethod
+    def _novo_rotulo(rotulos):
+        n = len(rotulos)
+        while Label('LoopBody', n) in rotulos:
+            n += 1
+        return Label('LoopBody', n)
+
+    def _codigo_inalcancavel(self, itens):
+        """
+        Um bloco básico sem rótulos a seguir a um bloco que termina num JUMP/RETURN/STOP (ou a
+        outro bloco inalcançável) nunca é executado: as suas instruções são removidas.
+        """
+        aplicacoes = 0
+        alcancavel = True
+        blocos = basic_blocks(itens)
+        for bloco in blocos:
+            alcancavel = bool(bloco.labels) or alcancavel
+            if not alcancavel:
+                aplicacoes += len(bloco.instructions)
+                bloco.items = [item for item in bloco.items if not isinstance(item, Instr)]
+            elif not bloco.falls_through:
+                alcancavel = False
+        if aplicacoes:
+            itens[:] = flatten(blocos)
+        return aplicacoes
+
+    def _rotulos_nao_usados(self, itens):
+        """Remove rótulos que nenhum JUMP/JZ/PUSHA referencia (permite juntar janelas)."""
+        usados = {item.arg for item in itens if isinstance(item, Instr) and item.op in BRANCHES}
+        antes = len(itens)
+        itens[:] = [item for item in itens if not isinstance(item, Label) or item in usados]
+        return antes - len(itens)
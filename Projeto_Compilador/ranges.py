@@ -0,0 +1,76 @@
+import math
+
+from ast_nodes import Node, Var, BinaryOp, UnaryOp, FunctionCall, ArrayType
+from typecheck import type_of
+
+# Intervalo de um valor desconhecido
+QUALQUER = (-math.inf, math.inf)
+
+
+def _product(a, b):
+    """Intervalo do produto de dois intervalos (0 vezes infinito conta como 0)."""
+    values = [x * y if x and y else 0 for x in a for y in b]
+    return min(values), max(values)
+
+
+def value_range(expr, ranges):
+    """
+    Intervalo [mínimo, máximo] dos valores inteiros que expr pode ter, sabendo que cada símbolo
+    em ranges tem o valor no intervalo associado. Os extremos desconhecidos são infinitos.
+    """
+    kind = type(expr)
+    if not isinstance(expr, Node):
+        if isinstance(expr, bool) or not isinstance(expr, (int, str)):
+            return QUALQUER
+        if isinstance(expr, str):
+            return (ord(expr),) * 2 if len(expr) == 1 else QUALQUER
+        return expr, expr
+    if kind is Var:
+        symbol = expr.symbol
+        if symbol is None:
+            return QUALQUER
+        if symbol.kind == 'const':
+            return value_range(symbol.value, ranges)
+        return ranges.get(symbol, QUALQUER)
+    if kind is UnaryOp:
+        lower, upper = value_range(expr.operand, ranges)
+        return (-upper, -lower) if expr.op == '-' else QUALQUER
+    if kind is FunctionCall:
+        if expr.builtin and expr.name == 'length' and expr.args and isinstance(type_of(expr.args[0]), ArrayType):
+            lower, upper = type_of(expr.args[0]).bounds
+            return (upper - lower + 1,) * 2
+        return QUALQUER
+    if kind is not BinaryOp:
+        return QUALQUER
+
+    op = expr.op.lower()
+    left = value_range(expr.left, ranges)
+    right = value_range(expr.right, ranges)
+    if op == '+':
+        return left[0] + right[0], left[1] + right[1]
+    if op == '-':
+        return left[0] - right[1], left[1] - right[0]
+    if op == '*':
+        return _product(left, right)
+    if op == 'mod' and right[0] == right[1] and right[0] > 0:
+        # Como na VM (e em Pascal), o resto tem o sinal do dividendo
+        limit = right[0] - 1
+        return (0 if left[0] >= 0 else -limit), (0 if left[1] <= 0 else limit)
+    if op == 'div' and right[0] == right[1] and right[0] > 0:
+        # Divisão inteira truncada para zero (como divisao_inteira da VM): monótona no dividendo
+        divisor = right[0]
+        return tuple(bound if math.isinf(bound) else (abs(bound) // divisor) * (1 if bound >= 0 else -1)
+                     for bound in left)
+    return QUALQUER
+
+
+def loop_range(start_range, end_range, direction):
+    """Intervalo da variável de controlo dentro do corpo de um FOR com estes limites."""
+    if direction == 'to':
+        return start_range[0], end_range[1]
+    return end_range[0], start_range[1]
+
+
+def within(value, lower, upper):
+    """Se um valor no intervalo value está sempre em [lower, upper]."""
+    return lower <= value[0] and value[1] <= upper
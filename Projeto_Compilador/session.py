@@ -0,0 +1,77 @@
+import copy
+
+from analex import lexer, StreamingLexer, TAMANHO_BLOCO
+from anasin import parser
+from converter import PascalToVMCompiler
+
+
+class CompilerSession:
+    """
+    Sessão de compilação independente, com o seu próprio lexer, estado do parser e
+    PascalToVMCompiler. Sessões diferentes não partilham estado mutável, por isso várias
+    compilações podem decorrer em paralelo (por exemplo, num pool de threads) no mesmo processo.
+    Cada sessão deve ser usada por uma thread de cada vez.
+    """
+
+    def __init__(self, cache=None, peephole=None, comments=True, short_circuit=False, check_bounds=False):
+        self.lexer = lexer.clone()
+        # Cópia superficial: partilha as tabelas LALR (só de leitura), mas não as pilhas do parse
+        self.parser = copy.copy(parser)
+        self.cache = cache  # BuildCache opcional, partilhável entre sessões e processos
+        self.peephole = peephole  # Otimizador Peephole opcional
+        self.comments = comments  # Comentários no código VM gerado
+        self.short_circuit = short_circuit  # Avaliação em curto-circuito dos AND/OR das condições
+        self.check_bounds = check_bounds  # Verificação dos índices dos arrays em execução
+        self.compiler = None  # Compilador usado na última compilação (tabela de símbolos, funções, ...)
+        self.ast = None  # AST da última compilação
+
+    def parse(self, code):
+        """Analisa o código Pascal e devolve a AST."""
+        self.lexer.lineno = 1
+        return self.parser.parse(code, lexer=self.lexer)
+
+    def parse_file(self, path, tamanho_bloco=TAMANHO_BLOCO):
+        """Analisa um ficheiro Pascal, lido por blocos, e devolve a AST."""
+        with open(path, encoding='utf-8') as ficheiro:
+            return self.parser.parse(lexer=StreamingLexer(ficheiro, tamanho_bloco, base=self.lexer))
+
+    def compile_ast(self, ast):
+        """Gera o código VM de uma AST com um compilador novo."""
+        self.ast = ast
+        self.compiler = PascalToVMCompiler(cache=self.cache, peephole=self.peephole, comments=self.comments,
+                                           short_circuit=self.short_circuit, check_bounds=self.check_bounds)
+        return self.compiler.compile(ast)
+
+    def compile(self, code):
+        """Compila código Pascal para código VM, reaproveitando o resultado da cache se existir."""
+        if self.cache is None:
+            return self.compile_ast(self.parse(code))
+        return self._compile_cached(self.cache.key('programa', self._options(), code), lambda: self.parse(code))
+
+    def compile_file(self, path):
+        """Compila um ficheiro Pascal para código VM, reaproveitando o resultado da cache se existir."""
+        if self.cache is None:
+            return self.compile_ast(self.parse_file(path))
+        return self._compile_cached(self.cache.file_key(path, 'programa', self._options()),
+                                    lambda: self.parse_file(path))
+
+    def _options(self):
+        """Opções que alteram o código gerado e, por isso, entram nas chaves da cache."""
+        options = self.peephole.configuracao() if self.peephole is not None else ''
+        if self.short_circuit:
+            options += ';curto-circuito'
+        if self.check_bounds:
+            options += ';limites'
+        return options if self.comments else options + ';sem-comentarios'
+
+    def _compile_cached(self, key, parse):
+        entry = self.cache.get_program(key)
+        if entry is not None:
+            self.compiler = None
+            self.ast, vm_code = entry
+            return vm_code
+
+        vm_code = self.compile_ast(parse())
+        if vm_code:
+            self.cache.put_program(key, self.ast, vm_code)
+        return vm_code
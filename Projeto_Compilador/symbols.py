@@ -0,0 +1,118 @@
+from ast_nodes import Node, Var, ArrayAccess, For, BinaryOp
+from ir import Op
+
+
+class Symbol:
+    """
+    Entrada da tabela de símbolos: variável, parâmetro, valor de retorno ou constante.
+    kind é 'var', 'param', 'retval' ou 'const'; type é o nome de um tipo simples ou o nó do
+    tipo composto (ArrayType, RecordType), já sem nomes de TYPE; as constantes guardam o valor
+    (literal ou expressão) em value.
+    """
+    __slots__ = ('name', 'kind', 'offset', 'type', 'value', 'local')
+
+    def __init__(self, name, kind, offset=None, type=None, value=None, local=False):
+        self.name = name
+        self.kind = kind
+        self.offset = offset
+        self.type = type
+        self.value = value
+        self.local = local  # Local a uma rotina (endereçado a partir de fp) ou global (gp)
+
+    @property
+    def load_op(self):
+        return Op.PUSHL if self.local else Op.PUSHG
+
+    @property
+    def store_op(self):
+        return Op.STOREL if self.local else Op.STOREG
+
+    def __repr__(self):
+        # Usada nas chaves da cache de build: tem de ser determinística
+        if self.kind == 'const':
+            return f'Symbol({self.name}, const, {self.value!r})'
+        return f'Symbol({self.name}, {self.kind}, {self.offset}, {self.type})'
+
+
+class Scope:
+    """Âmbito da tabela de símbolos. Os âmbitos das rotinas encadeiam no âmbito global."""
+    __slots__ = ('name', 'parent', 'symbols')
+
+    def __init__(self, name, parent=None, symbols=None):
+        self.name = name
+        self.parent = parent
+        self.symbols = {} if symbols is None else symbols
+
+    @property
+    def is_global(self):
+        return self.parent is None
+
+    def define(self, name, kind, offset=None, type=None, value=None):
+        symbol = Symbol(name, kind, offset, type, value, local=not self.is_global)
+        self.symbols[name] = symbol
+        return symbol
+
+    def lookup(self, name):
+        """Símbolo com o nome dado neste âmbito ou nos âmbitos envolventes, ou None."""
+        scope = self
+        while scope is not None:
+            symbol = scope.symbols.get(name)
+            if symbol is not None:
+                return symbol
+            scope = scope.parent
+        return None
+
+
+def resolve(node, scope):
+    """
+    Passo de resolução: anota cada referência a um nome em node (Var, ArrayAccess e a variável
+    de controlo dos For) com o Symbol que lhe corresponde em scope, ou None se o nome não estiver
+    declarado. A geração de código passa a ler node.symbol em vez de procurar o nome em cada uso.
+
+    Percorre a árvore com uma pilha explícita e procura os nomes num único dicionário com a
+    cadeia de âmbitos já achatada, para que o passo custe menos do que as procuras que poupa.
+    """
+    names = {}
+    chain = []
+    while scope is not None:
+        chain.append(scope.symbols)
+        scope = scope.parent
+    for symbols in reversed(chain):
+        names.update(symbols)
+    lookup = names.get
+
+    stack = [node]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        current = pop()
+        kind = type(current)
+        if kind is Var:
+            current.symbol = lookup(current.name)
+            continue
+        if kind is BinaryOp:
+            # O caso mais comum depois de Var: evita o percurso genérico dos campos
+            left, right = current.left, current.right
+            if type(left) is Var:
+                left.symbol = lookup(left.name)
+            elif isinstance(left, Node):
+                push(left)
+            if type(right) is Var:
+                right.symbol = lookup(right.name)
+            elif isinstance(right, Node):
+                push(right)
+            continue
+        if kind is ArrayAccess:
+            # Em a[i][j] só o acesso mais interior tem o nome; os outros têm o acesso como name
+            current.symbol = lookup(current.name) if type(current.name) is str else None
+        elif kind is For:
+            current.symbol = lookup(current.var)
+        for name in kind._fields:
+            value = getattr(current, name)
+            if isinstance(value, Node):
+                push(value)
+            elif type(value) is list:
+                for item in value:
+                    if isinstance(item, Node):
+                        push(item)
+    return node
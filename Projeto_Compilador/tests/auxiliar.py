@@ -0,0 +1,29 @@
+import contextlib
+import io
+
+from anasin import parse_code
+from converter import PascalToVMCompiler
+from vm import VirtualMachine
+
+
+def compilar(codigo, **opcoes):
+    """Devolve (código VM, mensagens do compilador, compilador) de um programa Pascal."""
+    compilador = PascalToVMCompiler(**opcoes)
+    mensagens = io.StringIO()
+    with contextlib.redirect_stdout(mensagens):
+        texto = compilador.compile(parse_code(codigo))
+    return texto, mensagens.getvalue(), compilador
+
+
+def executar(texto, entrada=(), **opcoes_vm):
+    """Executa código VM e devolve o que o programa escreveu."""
+    saida = io.StringIO()
+    VirtualMachine(texto, entrada=list(entrada), saida=saida, **opcoes_vm).run()
+    return saida.getvalue()
+
+
+def correr(codigo, entrada=(), **opcoes):
+    """Compila e executa um programa; falha se o compilador reportar algum erro."""
+    texto, mensagens, _ = compilar(codigo, **opcoes)
+    assert 'Erro' not in mensagens, mensagens
+    return executar(texto, entrada)
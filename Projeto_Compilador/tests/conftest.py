@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos do compilador estão na pasta acima e são importados pelo nome (como em pascalc.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,40 @@
+import io
+
+import pytest
+
+from analex import lexer, StreamingLexer
+from benchmark import exemplos_testes
+
+FONTES = [
+    "program a;\nvar x: integer;\n{ note\n  more } begin x := 1; writeln(x)\nend.\n",
+    "program b;\n(* comentario *) var s: string;\nbegin\n  s := 'it''s'; { em varias\n linhas }"
+    " { fim } writeln(s, 'a{b}c') // nota\nend.\n",
+    "program c; { sem\nmudança de linha no fim } begin end.",
+] + exemplos_testes()
+
+
+def tokens(lex):
+    return [(tok.type, tok.value, tok.lineno, tok.lexpos) for tok in iter(lex.token, None)]
+
+
+def tokens_simples(codigo):
+    simples = lexer.clone()
+    simples.lineno = 1
+    simples.input(codigo)
+    return tokens(simples)
+
+
+@pytest.mark.parametrize('codigo', FONTES)
+def test_blocos_pequenos_dao_os_mesmos_tokens(codigo, capsys):
+    esperado = tokens_simples(codigo)
+    for tamanho in range(1, 90):
+        assert tokens(StreamingLexer(io.StringIO(codigo), tamanho)) == esperado, tamanho
+    assert 'inválido' not in capsys.readouterr().out
+
+
+def test_lexer_legado_do_benchmark_reconhece_as_mesmas_palavras():
+    from benchmark import construir_lexer_legado, gerar_programa
+    codigo = gerar_programa(200).replace('begin', 'BEGIN').replace('writeln', 'WriteLn')
+    legado = construir_lexer_legado().clone()
+    legado.input(codigo)
+    assert [tok[:2] for tok in tokens(legado)] == [tok[:2] for tok in tokens_simples(codigo)]
@@ -0,0 +1,22 @@
+from ir import Op, Instr, Label, Comment, basic_blocks, flatten
+from peephole import Peephole
+
+
+def test_blocos_comecam_nos_rotulos_e_acabam_nos_saltos():
+    fim = Label('ENDIF', 1)
+    codigo = [Instr(Op.PUSHI, 1), Instr(Op.JZ, fim), Instr(Op.PUSHI, 2), Instr(Op.JUMP, fim),
+              fim, Instr(Op.STOP)]
+    blocos = basic_blocks(codigo)
+    assert [len(bloco.instructions) for bloco in blocos] == [2, 2, 1]
+    assert blocos[2].labels == [fim]
+    assert [bloco.falls_through for bloco in blocos] == [True, False, False]
+    assert flatten(blocos) == codigo
+
+
+def test_codigo_inalcancavel_ate_ao_rotulo_seguinte():
+    fim = Label('WhileEnd', 1)
+    codigo = [Instr(Op.JUMP, fim), Instr(Op.PUSHI, 1), Instr(Op.JUMP, fim), Comment('x'),
+              Instr(Op.PUSHI, 2), fim, Instr(Op.STOP)]
+    peephole = Peephole(['codigo_inalcancavel'])
+    assert peephole.optimize(codigo) == [codigo[0], codigo[3], fim, codigo[6]]
+    assert peephole.estatisticas['codigo_inalcancavel'] == 3
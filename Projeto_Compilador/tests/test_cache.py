@@ -0,0 +1,50 @@
+from auxiliar import executar
+from buildcache import BuildCache
+from session import CompilerSession
+
+PROGRAMA = """
+program p;
+var x: integer;
+function Dobro(n: integer): integer;
+begin
+  Dobro := 2 * n
+end;
+function Soma(a, b: integer): integer;
+begin
+  Soma := a + b
+end;
+begin
+  x := {x};
+  writeln(Dobro(x), ' ', Soma(x, 1))
+end.
+"""
+
+
+def test_programa_igual_vem_da_cache(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    codigo = CompilerSession(cache=cache).compile(PROGRAMA.format(x=5))
+    assert (cache.hits, cache.misses) == (0, 1 + 2)
+    sessao = CompilerSession(cache=cache)
+    assert sessao.compile(PROGRAMA.format(x=5)) == codigo
+    assert cache.hits == 1 and sessao.compiler is None
+    assert executar(codigo) == '10 6\n'
+
+
+def test_programa_alterado_reaproveita_as_rotinas(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    CompilerSession(cache=cache).compile(PROGRAMA.format(x=5))
+    cache.hits = cache.misses = 0
+    codigo = CompilerSession(cache=cache).compile(PROGRAMA.format(x=7))
+    # O programa muda, mas Dobro e Soma não: só a entrada do programa falha
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert codigo == CompilerSession().compile(PROGRAMA.format(x=7))
+    assert executar(codigo) == '14 8\n'
+
+
+def test_opcoes_diferentes_nao_partilham_entradas(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    CompilerSession(cache=cache).compile(PROGRAMA.format(x=5))
+    cache.hits = cache.misses = 0
+    codigo = CompilerSession(cache=cache, comments=False).compile(PROGRAMA.format(x=5))
+    assert cache.hits == 0
+    assert '//' not in codigo and executar(codigo) == '10 6\n'
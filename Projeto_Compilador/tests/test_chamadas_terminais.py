@@ -0,0 +1,73 @@
+import io
+
+import pytest
+
+from auxiliar import compilar
+from vm import VirtualMachine
+
+SOMA = """
+program p;
+var n: integer;
+function Soma(n, acc: integer): integer;
+begin
+  if n = 0 then return acc;
+  return Soma(n - 1, acc + n)
+end;
+procedure Conta(n: integer);
+begin
+  if n > 0 then Conta(n - 1) else writeln('fim')
+end;
+function Fact(n: integer): integer;
+begin
+  if n <= 1 then Fact := 1 else Fact := n * Fact(n - 1)
+end;
+begin
+  n := 20000;
+  writeln(Soma(n, 0), ' ', Fact(10));
+  Conta(n)
+end.
+"""
+
+
+def executar_maquina(texto):
+    saida = io.StringIO()
+    maquina = VirtualMachine(texto, entrada=[], saida=saida)
+    maquina.run()
+    return saida.getvalue(), maquina
+
+
+@pytest.mark.parametrize('terminais', [False, True])
+def test_chamadas_terminais_dao_o_mesmo_resultado(terminais):
+    texto, mensagens, _ = compilar(SOMA, optimize_tail_calls=terminais)
+    assert 'Erro' not in mensagens
+    saida, maquina = executar_maquina(texto)
+    assert saida == '200010000 3628800\nfim\n'
+    # Sem chamadas terminais, a pilha cresce com a profundidade da recursão de Soma e de Conta
+    assert (maquina.pilha_maxima < 100) == terminais
+
+
+def test_recursao_que_nao_e_terminal_continua_a_ser_uma_chamada():
+    texto, _, _ = compilar(SOMA)
+    rotina = texto[texto.index('\nfact:'):]
+    assert 'CALL' in rotina
+
+
+MDC = """
+program p;
+function Mdc(a, b: integer): integer;
+begin
+  if b = 0 then return a;
+  return Mdc(b, a mod b)
+end;
+begin
+  writeln(Mdc(1071, 462), ' ', Mdc(17, 5))
+end.
+"""
+
+
+@pytest.mark.parametrize('terminais', [False, True])
+def test_argumentos_da_chamada_terminal_usam_os_parametros_antigos(terminais):
+    # mdc(b, a mod b): o segundo argumento lê a antes de o primeiro ser escrito no parâmetro
+    texto, mensagens, _ = compilar(MDC, optimize_tail_calls=terminais)
+    assert 'Erro' not in mensagens
+    assert executar_maquina(texto)[0] == '21 1\n'
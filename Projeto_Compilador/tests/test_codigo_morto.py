@@ -0,0 +1,44 @@
+import pytest
+
+from auxiliar import compilar, executar
+
+PROGRAMA = """
+program p;
+const DEBUG = false;
+var i: integer;
+procedure Nunca;
+begin
+  writeln('nunca')
+end;
+procedure Auxiliar(n: integer);
+begin
+  writeln('auxiliar ', n)
+end;
+procedure Usada(n: integer);
+begin
+  Auxiliar(n);
+  exit;
+  writeln('depois do exit')
+end;
+begin
+  if DEBUG then writeln('debug');
+  for i := 1 to 2 do Usada(i);
+  while DEBUG do Nunca()
+end.
+"""
+
+
+@pytest.mark.parametrize('eliminar', [False, True])
+def test_codigo_morto_nao_altera_o_resultado(eliminar):
+    texto, mensagens, _ = compilar(PROGRAMA, eliminate_dead_code=eliminar, inline_budget=0)
+    assert 'Erro' not in mensagens
+    assert executar(texto) == 'auxiliar 1\nauxiliar 2\n'
+
+
+def test_rotinas_e_comandos_inalcancaveis_sao_removidos():
+    texto, _, compilador = compilar(PROGRAMA, inline_budget=0)
+    assert compilador.dead_code['rotinas'] == ['nunca']
+    # writeln depois do exit, o if DEBUG e o while DEBUG
+    assert compilador.dead_code['comandos'] == 3
+    assert 'nunca:' not in texto and 'auxiliar:' in texto
+    assert 'depois do exit' not in texto and 'debug' not in texto
@@ -0,0 +1,25 @@
+import pytest
+
+from auxiliar import correr
+
+PROGRAMA = """
+program c;
+const A = 3;
+      B = A * 2 + 1;
+      T = 'ab' + 'c';
+var x: integer;
+function f(n: integer): integer;
+const C = B + 1;
+begin
+  f := n * C
+end;
+begin
+  x := B + A;
+  writeln(x, ' ', T, ' ', f(2))
+end.
+"""
+
+
+@pytest.mark.parametrize('fold', [False, True])
+def test_constantes_que_usam_outras_constantes(fold):
+    assert correr(PROGRAMA, fold=fold) == '10 abc 16\n'
@@ -0,0 +1,63 @@
+import itertools
+
+import pytest
+
+from auxiliar import compilar, executar, correr
+from vm import VMError
+
+EFEITOS = """
+program p;
+var chamadas: integer;
+function Verdade(b: boolean): boolean;
+begin
+  chamadas := chamadas + 1;
+  Verdade := b
+end;
+begin
+  chamadas := 0;
+  if Verdade(false) and Verdade(true) then writeln('errado');
+  if Verdade(true) or Verdade(false) then writeln('sim');
+  if not (Verdade(true) and Verdade(false)) then writeln('nao');
+  writeln(chamadas)
+end.
+"""
+
+GUARDA = """
+program p;
+var v: array[1..5] of integer;
+    i: integer;
+begin
+  for i := 1 to 5 do v[i] := 1;
+  i := 1;
+  while (i <= 5) and (v[i] <> 0) do i := i + 1;
+  writeln(i)
+end.
+"""
+
+
+@pytest.mark.parametrize('curto_circuito, chamadas', [(False, 6), (True, 4)])
+def test_segundo_operando_so_e_avaliado_se_for_preciso(curto_circuito, chamadas):
+    saida = correr(EFEITOS, short_circuit=curto_circuito, inline_budget=0)
+    assert saida == f'sim\nnao\n{chamadas}\n'
+
+
+def test_condicao_guarda_o_acesso_ao_array():
+    texto, _, _ = compilar(GUARDA, short_circuit=True, check_bounds=True, range_analysis=False)
+    assert executar(texto) == '6\n'
+    texto, _, _ = compilar(GUARDA, check_bounds=True, range_analysis=False)
+    with pytest.raises(VMError):
+        executar(texto)
+
+
+def test_combinacoes_de_and_or_not():
+    # Todas as combinações dão o mesmo resultado com e sem curto-circuito
+    linhas = []
+    for a, b, c in itertools.product(('false', 'true'), repeat=3):
+        linhas.append(f"  a := {a}; b := {b}; c := {c};\n"
+                      "  if (a and not b) or not (c or a) then x := 2 * x + 1 else x := 2 * x;\n"
+                      "  if not ((a or b) and c) then y := 2 * y + 1 else y := 2 * y;\n")
+    codigo = ("program p;\nvar a, b, c: boolean;\n    x, y: integer;\nbegin\n  x := 0; y := 0;\n"
+              + ''.join(linhas) + "  writeln(x, ' ', y)\nend.\n")
+    esperado = correr(codigo, fold=False)
+    assert esperado == '172 234\n'
+    assert correr(codigo, fold=False, short_circuit=True) == esperado
@@ -0,0 +1,70 @@
+import io
+
+import pytest
+
+from auxiliar import compilar, correr
+from vm import VirtualMachine, VMError
+
+
+@pytest.mark.parametrize('argumentos, esperado', [
+    ("'a', #10, 'b'", 'a\nb\n'),
+    ("'x\\', 'n'", 'x\\n\n'),
+    ("'say ', chr(34), 'hi'", 'say "hi\n'),
+    ("'tab', #9, 1, true, ''", 'tab\t11\n'),
+    ("'a', #7, 'b'", 'a\x07b\n'),
+    ("'', ''", '\n'),
+])
+@pytest.mark.parametrize('fold', [False, True])
+def test_literais_seguidos_no_writeln(argumentos, esperado, fold):
+    assert correr(f"program p; begin writeln({argumentos}) end.", fold=fold) == esperado
+
+
+def test_literais_seguidos_sao_escritos_de_uma_so_vez():
+    texto, _, _ = compilar("program p; var x: integer; begin x := 2; writeln('x = ', x, ' ', 'e', 5) end.")
+    assert texto.count('WRITES') == 2
+    assert 'PUSHS " e5"' in texto
+
+
+ECO = """
+program eco;
+var s: string;
+    i: integer;
+begin
+  for i := 1 to 3 do
+  begin
+    writeln('linha ', i);
+    readln(s);
+    writeln(s)
+  end
+end.
+"""
+
+
+class SaidaComEntrada(io.StringIO):
+    """Saída que regista o que já tinha sido escrito em cada leitura da entrada."""
+
+    def __init__(self):
+        super().__init__()
+        self.lido = []
+
+    def entrada(self, linhas):
+        for linha in linhas:
+            self.lido.append(self.getvalue())
+            yield linha
+
+
+@pytest.mark.parametrize('buffer_saida', [0, 1, 4096])
+def test_buffer_de_saida_despeja_antes_de_cada_leitura(buffer_saida):
+    texto, _, _ = compilar(ECO)
+    saida = SaidaComEntrada()
+    VirtualMachine(texto, entrada=saida.entrada(['a', 'b', 'c']), saida=saida, buffer_saida=buffer_saida).run()
+    assert saida.getvalue() == 'linha 1\na\nlinha 2\nb\nlinha 3\nc\n'
+    assert saida.lido == ['linha 1\n', 'linha 1\na\nlinha 2\n', 'linha 1\na\nlinha 2\nb\nlinha 3\n']
+
+
+def test_buffer_de_saida_despeja_quando_a_execucao_falha():
+    texto, _, _ = compilar("program p; var x: integer; begin writeln('antes'); x := 0; writeln(1 div x) end.")
+    saida = io.StringIO()
+    with pytest.raises(VMError):
+        VirtualMachine(texto, entrada=[], saida=saida, buffer_saida=4096).run()
+    assert saida.getvalue() == 'antes\n'
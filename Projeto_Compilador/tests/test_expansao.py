@@ -0,0 +1,106 @@
+import pytest
+
+from auxiliar import compilar, executar
+
+INC = """
+function inc(n: integer): integer;
+begin
+  return n + 1
+end;
+"""
+
+DO_PROGRAMA = f"""
+program p;
+var i, s: integer;
+{INC}
+begin
+  s := 0;
+  for i := 1 to 3 do s := s + inc(i);
+  writeln(s)
+end.
+"""
+
+DE_ROTINA = f"""
+program p;
+var t: integer;
+{INC}
+function soma(k: integer): integer;
+var i, s: integer;
+begin
+  s := 0;
+  for i := 1 to k do s := s + inc(i);
+  return s
+end;
+begin
+  t := soma(3);
+  writeln(t, ' ', inc(t))
+end.
+"""
+
+MAXIMO = """
+program p;
+var a, b: integer;
+function maximo(x, y: integer): integer;
+begin
+  if x > y then return x;
+  maximo := y
+end;
+procedure troca;
+var t: integer;
+begin
+  t := a; a := b; b := t
+end;
+begin
+  a := 4; b := 9;
+  troca();
+  writeln(maximo(a, b), ' ', maximo(b, a), ' ', a, ' ', b)
+end.
+"""
+
+
+@pytest.mark.parametrize('codigo, esperado', [
+    (DO_PROGRAMA, '9\n'),
+    (DE_ROTINA, '9 10\n'),
+    (MAXIMO, '9 9 9 4\n'),
+])
+@pytest.mark.parametrize('inline_budget', [0, 8])
+def test_rotinas_expandidas_dao_o_mesmo_resultado(codigo, esperado, inline_budget):
+    texto, mensagens, compilador = compilar(codigo, inline_budget=inline_budget)
+    assert 'Erro' not in mensagens
+    assert executar(texto) == esperado
+    assert bool(compilador.inlined) == bool(inline_budget)
+
+
+def test_return_expandido_no_programa_principal_usa_uma_celula_global():
+    texto, _, compilador = compilar(DO_PROGRAMA)
+    assert ('inc', 'p') in compilador.inlined
+    assert 'STOREL' not in texto.split('STOP')[0]
+
+
+ACESSO_NO_CICLO = """
+program p;
+var v: array[1..10] of integer;
+    i, t, s: integer;
+function Get(i: integer): integer;
+begin
+  Get := v[i]
+end;
+begin
+  for i := 1 to 10 do v[i] := i * 10;
+  s := 0;
+  for i := 1 to 10 do
+  begin
+    t := v[i] + v[i] + v[i];
+    v[i] := t;
+    s := s + Get(11 - i)
+  end;
+  writeln(s)
+end.
+"""
+
+
+@pytest.mark.parametrize('opcoes', [{}, {'inline_budget': 0}, {'optimize_loops': False}])
+def test_corpo_expandido_num_ciclo_nao_usa_os_acessos_reduzidos_do_chamador(opcoes):
+    texto, mensagens, _ = compilar(ACESSO_NO_CICLO, **opcoes)
+    assert 'Erro' not in mensagens
+    assert executar(texto) == '850\n'
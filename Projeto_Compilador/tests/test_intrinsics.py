@@ -0,0 +1,129 @@
+import pytest
+
+from auxiliar import compilar, correr
+from folding import fold_builtin
+from peephole import Peephole
+
+TEXTOS = """
+program Texto;
+const Titulo = 'Rel' + 'atorio';
+var s, t, u: string;
+    c: char;
+    i, n: integer;
+function Rotulo(k: integer): string;
+begin
+  Rotulo := 'item-' + inttostr(k) + ':'
+end;
+begin
+  s := 'banana';
+  t := concat('ab', 'c', s, '!', '');
+  writeln(t, '|', length(t));
+  writeln(pos('na', s), ' ', pos('x', s), ' ', pos('', s), ' ', pos('ana', 'banana'));
+  c := 'n';
+  writeln(pos(c, s), ' ', length(c));
+  writeln(ord('A'), ' ', chr(66), ' ', ord(c), ' ', chr(ord(c) + 1), ' ', ord(true) + 1);
+  writeln(upcase('q'), upcase(c), upcase('!'), upcase('Z'));
+  n := 0;
+  for i := 1 to length(s) do
+    n := n + ord(upcase(s[i])) - ord('A');
+  writeln(n);
+  u := inttostr(-42) + '/' + inttostr(n * 2);
+  writeln(u);
+  writeln(strtoint('123') + strtoint(u[2]) + strtoint('-7'));
+  writeln(copy('compilador', 4, 4), '|', copy('abc', 0, 2), copy('xyz', 2, 1), '|', Titulo);
+  writeln(Rotulo(3) + Rotulo(4));
+  s := s + ' ' + t + ' ' + Titulo;
+  writeln(s, ' ', length(s))
+end.
+"""
+
+SAIDA = ("abcbanana!|10\n3 0 0 2\n3 1\n65 B 110 o 2\nQN!Z\n27\n-42/54\n120\n"
+         "pila|aby|Relatorio\nitem-3:item-4:\nbanana abcbanana! Relatorio 27\n")
+
+
+@pytest.mark.parametrize('opcoes', [{}, {'fold': False}, {'inline_budget': 0}])
+def test_funcoes_predefinidas(opcoes):
+    assert correr(TEXTOS, **opcoes) == SAIDA
+
+
+@pytest.mark.parametrize('nome, args, valor', [
+    ('ord', [True], 1),
+    ('ord', ['a'], 97),
+    ('chr', [65], 'A'),
+    ('chr', [10], None),
+    ('upcase', ['x'], 'X'),
+    ('inttostr', [-3], '-3'),
+    ('strtoint', ['-12'], -12),
+    ('strtoint', ['1_0'], None),
+    ('strtoint', [' 7 '], None),
+    ('strtoint', ['abc'], None),
+    ('copy', ['abcdef', 2, 3], 'bcd'),
+    ('pos', ['', 'abc'], 0),
+    ('concat', ['a', 'bc'], 'abc'),
+])
+def test_avaliacao_em_compilacao(nome, args, valor):
+    resultado = fold_builtin(nome, args)
+    assert resultado == valor and type(resultado) is type(valor)
+
+
+def test_rotina_do_programa_esconde_a_predefinida():
+    codigo = """
+program p;
+function pos(a, b: integer): integer;
+begin
+  pos := a * 10 + b
+end;
+begin
+  writeln(pos(1, 2))
+end.
+"""
+    assert correr(codigo) == '12\n'
+
+
+def test_strtoint_que_nao_e_um_inteiro_pascal_fica_para_a_execucao():
+    texto, _, _ = compilar("program p; begin writeln(strtoint('1_0')) end.")
+    assert 'ATOI' in texto
+
+
+def test_concatenacao_junta_os_literais_seguidos():
+    texto, _, _ = compilar("program p; var s: string; begin s := 'x'; "
+                           "writeln('ab' + 'c' + s + 'c' + '' + 'd') end.")
+    assert texto.count('CONCAT') == 2
+    assert 'PUSHS "cd"' in texto
+
+
+STRINGS_EM_EXECUCAO = """
+program p;
+type Nome = record
+  texto: string;
+end;
+var s: string;
+    r: Nome;
+    i, n: integer;
+begin
+  readln(s);
+  readln(n);
+  writeln(copy(s, 2, n), '|', copy(s, n, 100), '|', copy(s, 0, n), '|', copy(s, n, -1), '|');
+  for i := 1 to length(s) do
+    if s[i] = ' ' then s[i] := '_';
+  s[1] := upcase(s[1]);
+  r.texto := s + '!';
+  r.texto[length(r.texto)] := '?';
+  readln(r.texto[2]);
+  writeln(s, ' ', r.texto, ' ', length(s))
+end.
+"""
+
+
+@pytest.mark.parametrize('opcoes', [{}, {'fold': False}, {'peephole': Peephole()}])
+def test_copy_e_atribuicao_de_caracteres_em_execucao(opcoes):
+    saida = correr(STRINGS_EM_EXECUCAO, ['ola "mundo"\\', '3', 'L'], **opcoes)
+    assert saida == 'la |a "mundo"\\|ola||\nOla_"mundo"\\ OLa_"mundo"\\? 12\n'
+
+
+@pytest.mark.parametrize('indice, quantos', [(-2, 4), (0, 3), (1, 0), (2, 2), (4, 9), (7, 1), (3, -1)])
+def test_copy_em_execucao_igual_a_avaliacao_em_compilacao(indice, quantos):
+    codigo = ("program p;\nvar s: string;\n    i, n: integer;\nbegin\n"
+              "  readln(s); readln(i); readln(n);\n  writeln('[', copy(s, i, n), ']')\nend.\n")
+    saida = correr(codigo, ['banana', str(indice), str(quantos)])
+    assert saida == f"[{fold_builtin('copy', ['banana', indice, quantos])}]\n"
@@ -0,0 +1,63 @@
+import pytest
+
+from auxiliar import compilar, executar
+from vm import VMError
+
+VETORES = """
+program p;
+var v: array[1..10] of integer;
+    i, k, s: integer;
+begin
+  for i := 1 to 10 do v[i] := i;
+  s := 0;
+  for i := 2 to 10 do s := s + v[i] - v[i - 1];
+  readln(k);
+  writeln(s, ' ', v[k])
+end.
+"""
+
+
+@pytest.mark.parametrize('intervalos', [False, True])
+def test_indice_fora_dos_limites_e_detetado(intervalos):
+    texto, _, _ = compilar(VETORES, check_bounds=True, range_analysis=intervalos)
+    assert executar(texto, ['10']) == '9 10\n'
+    with pytest.raises(VMError):
+        executar(texto, ['11'])
+    with pytest.raises(VMError):
+        executar(texto, ['0'])
+
+
+def test_sem_verificacao_nao_ha_check():
+    texto, _, compilador = compilar(VETORES)
+    assert 'CHECK' not in texto
+    assert compilador.bounds_checks['emitidas'] == 0
+
+
+def test_analise_de_intervalos_elimina_as_verificacoes_dos_ciclos():
+    _, _, sem_intervalos = compilar(VETORES, check_bounds=True, range_analysis=False)
+    _, _, com_intervalos = compilar(VETORES, check_bounds=True)
+    # Só o acesso v[k], com k lido da entrada, continua a precisar de verificação
+    assert com_intervalos.bounds_checks['emitidas'] == 1
+    assert com_intervalos.bounds_checks['eliminadas'] == sem_intervalos.bounds_checks['emitidas'] - 1
+
+
+def test_indice_constante_fora_dos_limites_e_um_erro_de_compilacao():
+    _, mensagens, _ = compilar("program p;\nvar v: array[1..3] of integer;\nbegin\n  v[4] := 1\nend.\n")
+    assert 'Índice 4 fora dos limites [1..3] de v' in mensagens
+
+
+def test_indice_com_deslocamento_constante_e_verificado():
+    codigo = """
+program p;
+var v: array[1..5] of integer;
+    i: integer;
+begin
+  readln(i);
+  v[i + 1] := 7;
+  writeln(v[i + 1])
+end.
+"""
+    texto, _, _ = compilar(codigo, check_bounds=True)
+    assert executar(texto, ['4']) == '7\n'
+    with pytest.raises(VMError):
+        executar(texto, ['5'])
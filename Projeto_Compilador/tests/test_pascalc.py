@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+import pascalc
+from auxiliar import executar
+
+PROGRAMA = "program p{n};\nbegin\n  writeln('ficheiro ', {n})\nend.\n"
+
+
+@pytest.fixture
+def fontes(tmp_path):
+    for n in range(4):
+        pasta = tmp_path / 'src' / ('sub' if n % 2 else '')
+        pasta.mkdir(parents=True, exist_ok=True)
+        (pasta / f'p{n}.pas').write_text(PROGRAMA.format(n=n), encoding='utf-8')
+    return tmp_path
+
+
+@pytest.mark.parametrize('jobs', ['1', '3'])
+def test_compila_um_diretorio_em_paralelo(fontes, jobs, capsys):
+    saida = fontes / 'out'
+    assert pascalc.main([str(fontes / 'src'), '-o', str(saida), '-j', jobs, '-q']) == 0
+    for n in range(4):
+        destino = saida / ('sub' if n % 2 else '') / f'p{n}.vm'
+        assert executar(destino.read_text(encoding='utf-8')) == f'ficheiro {n}\n'
+    assert '4 ficheiros (0 com erros)' in capsys.readouterr().out
+
+
+def test_entrada_que_nao_existe_falha_sem_interromper_o_lote(fontes, capsys):
+    fonte = str(fontes / 'src' / 'p0.pas')
+    codigo = pascalc.main([fonte, str(fontes / 'nao.pas'), str(fontes / 'zz*.pas'), '-j', '2', '-q'])
+    saida = capsys.readouterr().out
+    assert codigo == 1
+    assert os.path.exists(os.path.splitext(fonte)[0] + '.vm')
+    assert 'nao.pas não existe' in saida and 'zz*.pas não existe' in saida
+    assert '3 ficheiros (2 com erros)' in saida
+
+
+def test_ficheiro_que_desaparece_antes_de_ser_compilado(tmp_path):
+    origem = str(tmp_path / 'apagado.pas')
+    resultado = pascalc.compilar_ficheiro((origem, str(tmp_path / 'apagado.vm')))
+    _, _, _, linhas, sucesso, mensagens = resultado[:6]
+    assert not sucesso and linhas == 0
+    assert any('apagado.pas' in mensagem for mensagem in mensagens)
+
+
+def test_erro_de_compilacao_marca_o_ficheiro_como_falhado(tmp_path, capsys):
+    (tmp_path / 'mau.pas').write_text("program mau;\nbegin\n  x := \nend.\n", encoding='utf-8')
+    assert pascalc.main([str(tmp_path / 'mau.pas'), '-j', '1']) == 1
+    assert 'FALHOU' in capsys.readouterr().out
@@ -0,0 +1,155 @@
+import pytest
+
+from auxiliar import compilar, executar
+from benchmark import exemplos_testes, ENTRADAS_EXEMPLOS
+from peephole import Peephole
+
+# Configurações do compilador em que todos os programas têm de dar a mesma saída
+CONFIGURACOES = {
+    'sem-otimizacoes': dict(fold=False, reuse_slots=False, optimize_loops=False, eliminate_dead_code=False,
+                            optimize_tail_calls=False, inline_budget=0, range_analysis=False),
+    'omissao': {},
+    'peephole': dict(peephole=Peephole()),
+    'curto-circuito': dict(short_circuit=True),
+    'expansao': dict(inline_budget=64),
+    'limites': dict(check_bounds=True, range_analysis=False),
+    'tudo': dict(peephole=Peephole(), short_circuit=True, inline_budget=64, check_bounds=True),
+}
+
+SAIDAS_EXEMPLOS = [
+    'Ola, Mundo!\n',
+    'Introduza um número inteiro positivo:\nFatorial de 10: 3628800\n',
+    'Introduza um número inteiro positivo:\n97 é um número primo\n',
+    'Introduza 5 números inteiros:\nA soma dos números é: 14\n',
+    'Introduza uma string binária:\nO valor inteiro correspondente é: 45\n',
+]
+
+RECURSAO = """
+program T21;
+var total: integer;
+
+function Soma(n, acc: integer): integer;
+begin
+  if n = 0 then return acc;
+  return Soma(n - 1, acc + n)
+end;
+
+function Fact(n: integer): integer;
+begin
+  if n <= 1 then Fact := 1
+  else Fact := n * Fact(n - 1)
+end;
+
+function Mdc(a, b: integer): integer;
+var r: integer;
+begin
+  if b = 0 then Mdc := a
+  else begin
+    r := a mod b;
+    Mdc := Mdc(b, r)
+  end
+end;
+
+procedure Conta(n: integer);
+var k: integer;
+begin
+  k := k + 1;
+  total := total + k;
+  if n > 0 then Conta(n - 1)
+end;
+
+function Fib(n: integer): integer;
+begin
+  if n < 2 then Fib := n else Fib := Fib(n - 1) + Fib(n - 2)
+end;
+
+begin
+  writeln(Soma(100000, 0));
+  writeln(Fact(10));
+  writeln(Mdc(1071, 462));
+  total := 0;
+  Conta(10);
+  writeln(total);
+  writeln(Fib(15));
+  Soma(3, 1);
+  writeln(Soma(Soma(2, 0), Fact(3)))
+end.
+"""
+
+ROTINAS = """
+program T22;
+var v: array[1..10] of integer;
+    i, s, total: integer;
+    r: real;
+
+function Get(k: integer): integer;
+begin
+  Get := v[k]
+end;
+
+function Max(a, b: integer): integer;
+begin
+  if a > b then Max := a else Max := b
+end;
+
+function Sinal(x: integer): integer;
+begin
+  if x > 0 then return 1;
+  if x < 0 then return -1;
+  return 0
+end;
+
+procedure Acumula(x: integer);
+begin
+  total := total + x
+end;
+
+function Quadrado(x: real): real;
+begin
+  Quadrado := x * x
+end;
+
+function SomaAte(n: integer): integer;
+var j, acc: integer;
+begin
+  for j := 1 to n do acc := acc + j;
+  SomaAte := acc
+end;
+
+function Metade(x: integer): integer;
+begin
+  if x mod 2 = 1 then exit;
+  Metade := x div 2
+end;
+
+begin
+  for i := 1 to 10 do v[i] := i * 3 - 10;
+  s := 0;
+  for i := 1 to 10 do s := s + Get(i);
+  writeln(s);
+  writeln(Max(Get(2), Get(9)), ' ', Max(3, Max(7, 5)));
+  writeln(Sinal(-4), Sinal(0), Sinal(9));
+  total := 0;
+  for i := 1 to 10 do Acumula(Max(v[i], 0));
+  writeln(total);
+  r := Quadrado(3);
+  writeln(r);
+  writeln(SomaAte(4), ' ', SomaAte(5));
+  writeln(Metade(8), ' ', Metade(7), ' ', Metade(10))
+end.
+"""
+
+PROGRAMAS = [(codigo, entrada, saida) for codigo, entrada, saida
+             in zip(exemplos_testes(), ENTRADAS_EXEMPLOS, SAIDAS_EXEMPLOS)] + [
+    (RECURSAO, [], '5000050000\n3628800\n21\n11\n610\n12\n'),
+    (ROTINAS, [], '65\n17 7\n-101\n77\n9\n10 15\n4 0 5\n'),
+]
+
+
+@pytest.mark.parametrize('configuracao', CONFIGURACOES)
+@pytest.mark.parametrize('codigo, entrada, saida', PROGRAMAS)
+def test_programas_em_cada_configuracao(codigo, entrada, saida, configuracao):
+    texto, mensagens, _ = compilar(codigo, **CONFIGURACOES[configuracao])
+    assert 'Erro' not in mensagens, mensagens
+    assert executar(texto, entrada) == saida
+    assert executar(texto, entrada, buffer_saida=2) == saida
@@ -0,0 +1,51 @@
+import pytest
+
+from auxiliar import compilar, correr
+from test_programas import CONFIGURACOES
+
+SALTOS = """
+program p;
+var i, j, s: integer;
+function Primeiro(n: integer): integer;
+var k: integer;
+begin
+  Primeiro := -1;
+  for k := 2 to n do
+    if n mod k = 0 then
+    begin
+      Primeiro := k;
+      exit
+    end
+end;
+begin
+  s := 0;
+  for i := 1 to 5 do
+  begin
+    if i = 2 then continue;
+    j := 0;
+    while true do
+    begin
+      j := j + 1;
+      if j > i then break;
+      if j mod 2 = 0 then continue;
+      s := s + j
+    end;
+    if i = 4 then break
+  end;
+  writeln(s, ' ', i, ' ', Primeiro(91), ' ', Primeiro(1));
+  exit;
+  writeln('depois do exit')
+end.
+"""
+
+
+@pytest.mark.parametrize('configuracao', CONFIGURACOES)
+def test_break_continue_e_exit(configuracao):
+    # i = 1: 1; i = 3: 1 + 3; i = 4: 1 + 3 (o ciclo exterior termina com i = 4)
+    assert correr(SALTOS, **CONFIGURACOES[configuracao]) == '9 4 7 -1\n'
+
+
+@pytest.mark.parametrize('comando', ['break', 'continue'])
+def test_salto_fora_de_um_ciclo_e_um_erro(comando):
+    _, mensagens, _ = compilar(f"program p;\nbegin\n  {comando}\nend.\n")
+    assert f'{comando.upper()} fora de um ciclo' in mensagens
@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from auxiliar import executar
+from session import CompilerSession
+
+PROGRAMA = """
+program p{n};
+var i, s: integer;
+begin
+  s := 0;
+  for i := 1 to {n} do s := s + i;
+  writeln('soma ', s)
+end.
+"""
+
+
+def test_sessao_pode_compilar_varios_programas_seguidos():
+    sessao = CompilerSession()
+    for n in (3, 10):
+        assert executar(sessao.compile(PROGRAMA.format(n=n))) == f'soma {n * (n + 1) // 2}\n'
+    # Um erro de sintaxe numa compilação não afeta a seguinte
+    sessao.parse("program mau;\nbegin\n  x := \nend.\n")
+    assert executar(sessao.compile(PROGRAMA.format(n=4))) == 'soma 10\n'
+    assert sessao.ast is not None and sessao.compiler is not None
+
+
+def test_sessoes_em_threads_dao_o_mesmo_codigo():
+    programas = [PROGRAMA.format(n=n) for n in range(1, 41)]
+    sequencial = [CompilerSession().compile(programa) for programa in programas]
+
+    def compilar_lote(lote):
+        sessao = CompilerSession()
+        return [sessao.compile(programa) for programa in lote]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        lotes = list(pool.map(compilar_lote, [programas[i::4] for i in range(4)]))
+    paralelo = [None] * len(programas)
+    for i, lote in enumerate(lotes):
+        paralelo[i::4] = lote
+    assert paralelo == sequencial
@@ -0,0 +1,244 @@
+from ast_nodes import Node, NodeTransformer, Expression, ArrayType, RecordType, Var
+from frame import field_offset
+from intrinsics import BUILTINS
+
+NUMERICOS = ('integer', 'real')
+TEXTO = ('char', 'string')
+TIPOS_BASE = ('integer', 'real', 'boolean', 'char', 'string', 'array', 'record', 'set', 'file')
+COMPARACOES = ('=', '<>', '<', '<=', '>', '>=')
+
+
+def literal_type(value):
+    """Tipo Pascal de um literal da AST (um str de um só caractere é um char)."""
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'integer'
+    if isinstance(value, float):
+        return 'real'
+    if isinstance(value, str):
+        return 'char' if len(value) == 1 else 'string'
+    return None
+
+
+def base_type(type_spec):
+    """Nome do tipo: os tipos compostos (ArrayType, RecordType, ...) são identificados pelo kind."""
+    return type_spec.kind if isinstance(type_spec, Node) else type_spec
+
+
+def type_of(expr):
+    """
+    Tipo de uma expressão já verificada pelo TypeChecker: o nome de um tipo simples, o nó de um
+    tipo composto (ArrayType, RecordType) ou None se for desconhecido.
+    """
+    return expr.type if isinstance(expr, Expression) else literal_type(expr)
+
+
+def param_types(params):
+    """Tipo de cada parâmetro de uma rotina, pela ordem dos argumentos."""
+    return [param.type for param in params or () for _ in param.names]
+
+
+def assignable(target, source):
+    """Se um valor do tipo source pode ser guardado num destino do tipo target."""
+    if target is None or source is None or target == source:
+        return True
+    if target not in TIPOS_BASE or source not in TIPOS_BASE:
+        return True  # Tipos com nome (TYPE) não são verificados
+    return (target, source) in (('real', 'integer'), ('string', 'char'))
+
+
+class TypeChecker(NodeTransformer):
+    """
+    Inferência e verificação de tipos. Anota cada expressão (Var, ArrayAccess, FieldAccess,
+    FunctionCall, BinaryOp, UnaryOp) com o seu tipo Pascal em node.type, a partir dos Symbol atribuídos por
+    symbols.resolve, e reporta os usos incompatíveis. A geração de código usa estes tipos para
+    escolher as instruções (WRITEI/WRITEF/WRITES/WRITECHR, ATOI/ATOF, ADD/FADD, ...).
+    Os erros são reportados mas não interrompem a compilação.
+    """
+
+    def __init__(self, functions):
+        self.functions = functions  # Informações das funções/procedimentos (PascalToVMCompiler.functions)
+        self.errors = 0
+
+    def error(self, node, msg):
+        self.errors += 1
+        print(f"Erro de tipo (linha {node.lineno}): {msg}")
+
+    # Expressões
+
+    def visit_Var(self, node):
+        symbol = node.symbol
+        if symbol is None:
+            # Função sem argumentos chamada sem parênteses
+            info = self.functions.get(node.name)
+            node.type = info['return_type'] if info is not None else None
+        elif symbol.kind == 'const':
+            node.type = type_of(symbol.value)
+        else:
+            node.type = symbol.type
+        return node
+
+    def visit_ArrayAccess(self, node):
+        node.index = self.visit(node.index)
+        index_type = type_of(node.index)
+        if index_type not in (None, 'integer', 'char'):
+            self.error(node, f"índice do tipo {base_type(index_type)}")
+
+        if type(node.name) is str:
+            name = node.name
+            array = node.symbol.type if node.symbol is not None else None
+        else:
+            node.name = self.visit(node.name)
+            name = 'a expressão'
+            array = type_of(node.name)
+        if isinstance(array, ArrayType):
+            node.type = array.element_type
+        elif array == 'string':
+            node.type = 'char'
+        else:
+            if array is not None:
+                self.error(node, f"{name} é do tipo {base_type(array)} e não pode ser indexado")
+            node.type = None
+        return node
+
+    def visit_FieldAccess(self, node):
+        node.record = self.visit(node.record)
+        record = type_of(node.record)
+        field = field_offset(record, node.field) if isinstance(record, RecordType) else None
+        if field is not None:
+            node.type = field[1]
+        else:
+            if isinstance(record, RecordType):
+                self.error(node, f"o registo não tem o campo {node.field}")
+            elif record is not None:
+                self.error(node, f"acesso ao campo {node.field} de um valor do tipo {base_type(record)}")
+            node.type = None
+        return node
+
+    def visit_FunctionCall(self, node):
+        node.args[:] = [self.visit(arg) for arg in node.args]
+        info = self.functions.get(node.name)
+        # As rotinas do programa escondem as funções predefinidas com o mesmo nome
+        node.builtin = info is None and node.name in BUILTINS
+        if node.builtin:
+            return self.check_builtin(node, BUILTINS[node.name])
+        if info is None:
+            node.type = None
+            return node
+        for index, (arg, expected) in enumerate(zip(node.args, param_types(info['params'])), 1):
+            if not assignable(expected, type_of(arg)):
+                self.error(node, f"argumento {index} de {node.name}: esperado {base_type(expected)}, "
+                                 f"recebeu {base_type(type_of(arg))}")
+        node.type = info['return_type']
+        return node
+
+    def check_builtin(self, node, builtin):
+        expected = builtin.expected(len(node.args))
+        if expected is None:
+            self.error(node, f"{node.name} não aceita {len(node.args)} argumentos")
+        else:
+            for index, (arg, accepted) in enumerate(zip(node.args, expected), 1):
+                actual = base_type(type_of(arg))
+                if actual is not None and actual not in accepted:
+                    self.error(node, f"argumento {index} de {node.name}: esperado {' ou '.join(accepted)}, "
+                                     f"recebeu {actual}")
+        node.type = builtin.return_type
+        return node
+
+    def visit_UnaryOp(self, node):
+        node.operand = self.visit(node.operand)
+        operand = type_of(node.operand)
+        if node.op == 'not':
+            if operand not in (None, 'boolean', 'integer'):
+                self.error(node, f"operador not aplicado a {base_type(operand)}")
+            node.type = 'integer' if operand == 'integer' else 'boolean'
+        else:
+            if operand not in (None,) + NUMERICOS:
+                self.error(node, f"operador {node.op} aplicado a {base_type(operand)}")
+            node.type = 'real' if operand == 'real' else 'integer'
+        return node
+
+    def visit_BinaryOp(self, node):
+        # Os operandos que são variáveis (o caso mais comum) não passam pelo despacho de visit
+        if type(node.left) is Var:
+            left = self.visit_Var(node.left).type
+        else:
+            node.left = self.visit(node.left)
+            left = type_of(node.left)
+        if type(node.right) is Var:
+            right = self.visit_Var(node.right).type
+        else:
+            node.right = self.visit(node.right)
+            right = type_of(node.right)
+        op = node.op.lower()
+
+        if op in COMPARACOES:
+            if not (assignable(left, right) or assignable(right, left)):
+                self.error(node, f"comparação entre {base_type(left)} e {base_type(right)}")
+            node.type = 'boolean'
+        elif op in ('and', 'or'):
+            if left == right == 'integer':
+                node.type = 'integer'
+            else:
+                for operand in (left, right):
+                    if operand not in (None, 'boolean'):
+                        self.error(node, f"operador {op} aplicado a {base_type(operand)}")
+                node.type = 'boolean'
+        elif op == '+' and 'string' in (left, right) and left in TEXTO + (None,) and right in TEXTO + (None,):
+            node.type = 'string'
+        else:
+            # Nesta VM os caracteres são códigos ASCII e podem entrar nas contas com inteiros
+            for operand in (left, right):
+                if operand not in (None, 'char') + NUMERICOS:
+                    self.error(node, f"operador {op} aplicado a {base_type(operand)}")
+            if op in ('div', 'mod'):
+                if 'real' in (left, right):
+                    self.error(node, f"operador {op} aplicado a real")
+                node.type = 'integer'
+            elif op == '/' or 'real' in (left, right):
+                node.type = 'real'
+            else:
+                node.type = 'integer'
+        return node
+
+    # Comandos
+
+    def visit_Assign(self, node):
+        node.target = self.visit(node.target)
+        node.expr = self.visit(node.expr)
+        target, source = type_of(node.target), type_of(node.expr)
+        if not assignable(target, source):
+            self.error(node, f"não é possível atribuir {base_type(source)} a {base_type(target)}")
+        return node
+
+    def _check_condition(self, node):
+        node.condition = self.visit(node.condition)
+        condition = type_of(node.condition)
+        if condition not in (None, 'boolean', 'integer'):
+            self.error(node, f"condição do tipo {base_type(condition)}")
+        for name in node._fields[1:]:
+            setattr(node, name, self.visit(getattr(node, name)))
+        return node
+
+    visit_If = _check_condition
+    visit_IfElse = _check_condition
+    visit_While = _check_condition
+
+    def visit_For(self, node):
+        node.start = self.visit(node.start)
+        node.end = self.visit(node.end)
+        symbol = node.symbol
+        control = symbol.type if symbol is not None else None
+        for bound in (node.start, node.end):
+            if not assignable(control, type_of(bound)) or type_of(bound) == 'real':
+                self.error(node, f"limite do tipo {type_of(bound)} para a variável de controlo {node.var}")
+        node.body = self.visit(node.body)
+        return node
+
+
+def check_types(node, functions):
+    """Aplica o TypeChecker a node (no próprio lugar) e devolve o número de erros encontrados."""
+    checker = TypeChecker(functions)
+    checker.visit(node)
+    return checker.errors
@@ -0,0 +1,468 @@
+import argparse
+import sys
+import time
+
+
+class VMError(Exception):
+    """Erro de montagem ou de execução de código EWVM."""
+
+
+# Códigos das operações já descodificadas. PUSHI, PUSHF e PUSHS partilham PUSH: o operando
+# é convertido na montagem e a execução limita-se a empilhá-lo.
+(PUSH, PUSHN, PUSHG, PUSHL, PUSHSP, PUSHFP, PUSHGP, LOAD, LOADN, DUP, DUPN,
+ POP, POPN, STOREL, STOREG, STORE, STOREN, SWAP, CHECK,
+ ADD, SUB, MUL, DIV, MOD, NOT, INF, INFEQ, SUP, SUPEQ, EQUAL, AND, OR,
+ FADD, FSUB, FMUL, FDIV, FINF, FINFEQ, FSUP, FSUPEQ, FCOS, FSIN,
+ ITOF, FTOI, STRI, STRF, CONCAT, CHARAT, STRLEN, CHRCODE, ATOI, ATOF,
+ ALLOC, ALLOCN, FREE, PADD,
+ JUMP, JZ, PUSHA, CALL, RETURN, START, NOP, ERR, STOP,
+ WRITEI, WRITEF, WRITES, WRITECHR, WRITELN, READ) = range(71)
+
+# Instrução EWVM -> (código, tipo do operando)
+INSTRUCOES = {
+    'PUSHI': (PUSH, 'int'), 'PUSHF': (PUSH, 'float'), 'PUSHS': (PUSH, 'string'),
+    'PUSHN': (PUSHN, 'int'), 'PUSHG': (PUSHG, 'int'), 'PUSHL': (PUSHL, 'int'),
+    'PUSHSP': (PUSHSP, None), 'PUSHFP': (PUSHFP, None), 'PUSHGP': (PUSHGP, None),
+    'LOAD': (LOAD, 'int'), 'LOADN': (LOADN, None), 'DUP': (DUP, 'int'), 'DUPN': (DUPN, None),
+    'POP': (POP, 'int'), 'POPN': (POPN, None),
+    'STOREL': (STOREL, 'int'), 'STOREG': (STOREG, 'int'), 'STORE': (STORE, 'int'),
+    'STOREN': (STOREN, None), 'SWAP': (SWAP, None), 'CHECK': (CHECK, 'int2'),
+    'ADD': (ADD, None), 'SUB': (SUB, None), 'MUL': (MUL, None), 'DIV': (DIV, None),
+    'MOD': (MOD, None), 'NOT': (NOT, None), 'INF': (INF, None), 'INFEQ': (INFEQ, None),
+    'SUP': (SUP, None), 'SUPEQ': (SUPEQ, None), 'EQUAL': (EQUAL, None),
+    'AND': (AND, None), 'OR': (OR, None),
+    'FADD': (FADD, None), 'FSUB': (FSUB, None), 'FMUL': (FMUL, None), 'FDIV': (FDIV, None),
+    'FINF': (FINF, None), 'FINFEQ': (FINFEQ, None), 'FSUP': (FSUP, None), 'FSUPEQ': (FSUPEQ, None),
+    'FCOS': (FCOS, None), 'FSIN': (FSIN, None),
+    'ITOF': (ITOF, None), 'FTOI': (FTOI, None), 'STRI': (STRI, None), 'STRF': (STRF, None),
+    'CONCAT': (CONCAT, None), 'CHARAT': (CHARAT, None), 'STRLEN': (STRLEN, None),
+    'CHRCODE': (CHRCODE, None), 'ATOI': (ATOI, None), 'ATOF': (ATOF, None),
+    'ALLOC': (ALLOC, 'int'), 'ALLOCN': (ALLOCN, None), 'FREE': (FREE, None), 'PADD': (PADD, None),
+    'JUMP': (JUMP, 'label'), 'JZ': (JZ, 'label'), 'PUSHA': (PUSHA, 'label'),
+    'CALL': (CALL, None), 'RETURN': (RETURN, None), 'START': (START, None), 'NOP': (NOP, None),
+    'ERR': (ERR, 'string'), 'STOP': (STOP, None),
+    'WRITEI': (WRITEI, None), 'WRITEF': (WRITEF, None), 'WRITES': (WRITES, None),
+    'WRITECHR': (WRITECHR, None), 'WRITELN': (WRITELN, None), 'READ': (READ, None),
+}
+
+_ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\'}
+
+# Escritas acumuladas, por omissão, antes de a saída ser despejada (vm.py --buffer)
+BUFFER_SAIDA = 4096
+
+
+def remover_comentario(linha):
+    """Remove um comentário // da linha, ignorando o que estiver dentro de strings."""
+    dentro_string = False
+    i = 0
+    while i < len(linha):
+        c = linha[i]
+        if c == '\\' and dentro_string:
+            i += 2
+            continue
+        if c == '"':
+            dentro_string = not dentro_string
+        elif c == '/' and not dentro_string and linha.startswith('//', i):
+            return linha[:i]
+        i += 1
+    return linha
+
+
+def _ler_string(texto, numero_linha):
+    texto = texto.strip()
+    if len(texto) < 2 or texto[0] != '"' or texto[-1] != '"':
+        raise VMError(f"Linha {numero_linha}: string inválida {texto!r}")
+    resultado = []
+    i = 1
+    while i < len(texto) - 1:
+        c = texto[i]
+        if c == '\\' and i + 1 < len(texto) - 1:
+            i += 1
+            resultado.append(_ESCAPES.get(texto[i], '\\' + texto[i]))
+        else:
+            resultado.append(c)
+        i += 1
+    return ''.join(resultado)
+
+
+def assemble(texto):
+    """
+    Monta código EWVM em texto numa lista de instruções (código, operando).
+    Os rótulos são resolvidos aqui para índices na lista e os operandos já ficam convertidos,
+    pelo que a execução não volta a analisar texto.
+    """
+    instrucoes = []
+    rotulos = {}
+    pendentes = []  # (índice da instrução, rótulo, linha) a resolver no fim
+
+    for numero_linha, linha in enumerate(texto.splitlines(), 1):
+        linha = remover_comentario(linha).strip()
+        # Podem existir vários rótulos e uma instrução na mesma linha ("L1: L2: JUMP L3")
+        while linha:
+            partes = linha.split(None, 1)
+            if not partes[0].endswith(':'):
+                break
+            rotulos[partes[0][:-1]] = len(instrucoes)
+            linha = partes[1] if len(partes) > 1 else ''
+        if not linha:
+            continue
+
+        partes = linha.split(None, 1)
+        nome = partes[0].upper()
+        operando = partes[1].strip() if len(partes) > 1 else None
+        if nome not in INSTRUCOES:
+            raise VMError(f"Linha {numero_linha}: instrução desconhecida {partes[0]!r}")
+        codigo, tipo = INSTRUCOES[nome]
+
+        if tipo is None:
+            if operando is not None:
+                raise VMError(f"Linha {numero_linha}: {nome} não tem operandos")
+            valor = None
+        elif operando is None:
+            raise VMError(f"Linha {numero_linha}: {nome} precisa de um operando")
+        else:
+            try:
+                if tipo == 'int':
+                    valor = int(operando)
+                elif tipo == 'float':
+                    valor = float(operando)
+                elif tipo == 'int2':
+                    valor = tuple(int(x) for x in operando.split(','))
+                    if len(valor) != 2:
+                        raise ValueError(operando)
+                elif tipo == 'string':
+                    valor = _ler_string(operando, numero_linha)
+                else:
+                    valor = None
+                    pendentes.append((len(instrucoes), operando, numero_linha))
+            except ValueError:
+                raise VMError(f"Linha {numero_linha}: operando inválido para {nome}: {operando!r}")
+        instrucoes.append((codigo, valor))
+
+    for indice, rotulo, numero_linha in pendentes:
+        if rotulo not in rotulos:
+            raise VMError(f"Linha {numero_linha}: rótulo desconhecido {rotulo!r}")
+        instrucoes[indice] = (instrucoes[indice][0], rotulos[rotulo])
+
+    # Sentinela: sair do fim do código equivale a STOP
+    instrucoes.append((STOP, None))
+    return instrucoes
+
+
+def divisao_inteira(a, b):
+    """Divisão inteira com truncagem para zero, como o div do Pascal."""
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def formatar_real(valor):
+    """Escreve um real como a EWVM: sem '.0' nos valores inteiros."""
+    texto = repr(float(valor))
+    return texto[:-2] if texto.endswith('.0') else texto
+
+
+class VirtualMachine:
+    """
+    Intérprete de código EWVM. A pilha é uma lista Python: as variáveis globais ocupam o seu
+    início (gp = 0) e os endereços são pares (memória, deslocamento), em que a memória é a
+    própria pilha ou um bloco alocado com ALLOC/ALLOCN. As strings são valores str.
+    """
+
+    def __init__(self, instrucoes, entrada=None, saida=None, buffer_saida=0):
+        if isinstance(instrucoes, str):
+            instrucoes = assemble(instrucoes)
+        self.instrucoes = instrucoes
+        self.entrada = entrada if entrada is not None else sys.stdin  # ficheiro ou iterável de linhas
+        self._linhas = None if hasattr(self.entrada, 'readline') else iter(self.entrada)
+        self.saida = saida if saida is not None else sys.stdout
+        # Escritas acumuladas antes de passarem à saída de uma só vez (0: cada escrita vai logo para a saída)
+        self.buffer_saida = buffer_saida
+        self._buffer = None
+        self._escrever = self.saida.write
+        self.pilha = []
+        self.passos = 0  # Instruções executadas na última execução
+        self.pilha_maxima = 0  # Tamanho da pilha na entrada da chamada mais funda da última execução
+
+    def _ler_linha(self):
+        if self._linhas is None:
+            linha = self.entrada.readline()
+        else:
+            linha = next(self._linhas, '')
+        if not linha:
+            raise VMError("READ: fim da entrada")
+        return linha.rstrip('\r\n')
+
+    def _despejar(self):
+        """Passa à saída o que está no buffer de escrita."""
+        if self._buffer:
+            self.saida.write(''.join(self._buffer))
+            self._buffer.clear()
+
+    def run(self):
+        """Executa o programa até STOP. Devolve o número de instruções executadas."""
+        codigo = self.instrucoes
+        self.pilha = pilha = []
+        push = pilha.append
+        pop = pilha.pop
+        # Com buffer_saida, as escritas são acumuladas numa lista e despejadas no fim de uma linha
+        # quando passam do limite, antes de cada READ e no fim da execução
+        buffer = self._buffer = [] if self.buffer_saida else None
+        limite = self.buffer_saida
+        write = self._escrever = buffer.append if buffer is not None else self.saida.write
+        chamadas = []  # Pilha de chamadas: (pc de retorno, fp)
+        pc = 0
+        fp = 0
+        passos = 0
+        pilha_maxima = 0
+
+        try:
+            while True:
+                op, arg = codigo[pc]
+                pc += 1
+                passos += 1
+                # As instruções mais frequentes vêm primeiro
+                if op == PUSH:
+                    push(arg)
+                elif op == PUSHG:
+                    push(pilha[arg])
+                elif op == PUSHL:
+                    push(pilha[fp + arg])
+                elif op == STOREG:
+                    pilha[arg] = pop()
+                elif op == STOREL:
+                    pilha[fp + arg] = pop()
+                elif op == JZ:
+                    if not pop():
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op == ADD:
+                    b = pop()
+                    pilha[-1] += b
+                elif op == SUB:
+                    b = pop()
+                    pilha[-1] -= b
+                elif op == MUL:
+                    b = pop()
+                    pilha[-1] *= b
+                elif op == INF:
+                    b = pop()
+                    pilha[-1] = 1 if pilha[-1] < b else 0
+                elif op == INFEQ:
+                    b = pop()
+                    pilha[-1] = 1 if pilha[-1] <= b else 0
+                elif op == SUP:
+                    b = pop()
+                    pilha[-1] = 1 if pilha[-1] > b else 0
+                elif op == SUPEQ:
+                    b = pop()
+                    pilha[-1] = 1 if pilha[-1] >= b else 0
+                elif op == EQUAL:
+                    b = pop()
+                    pilha[-1] = 1 if pilha[-1] == b else 0
+                elif op == PADD:
+                    n = pop()
+                    memoria, deslocamento = pop()
+                    push((memoria, deslocamento + n))
+                elif op == LOAD:
+                    memoria, deslocamento = pop()
+                    push(memoria[deslocamento + arg])
+                elif op == STORE:
+                    valor = pop()
+                    memoria, deslocamento = pop()
+                    memoria[deslocamento + arg] = valor
+                elif op == SWAP:
+                    pilha[-1], pilha[-2] = pilha[-2], pilha[-1]
+                elif op == CHARAT:
+                    n = pop()
+                    s = pop()
+                    if not 0 <= n < len(s):
+                        raise VMError(f"CHARAT: índice {n} fora da string")
+                    push(ord(s[n]))
+                elif op == DIV:
+                    b = pop()
+                    pilha[-1] = divisao_inteira(pilha[-1], b)
+                elif op == MOD:
+                    b = pop()
+                    a = pilha[-1]
+                    pilha[-1] = a - b * divisao_inteira(a, b)
+                elif op == NOT:
+                    pilha[-1] = 0 if pilha[-1] else 1
+                elif op == AND:
+                    b = pop()
+                    pilha[-1] = 1 if pilha[-1] and b else 0
+                elif op == OR:
+                    b = pop()
+                    pilha[-1] = 1 if pilha[-1] or b else 0
+                elif op == CALL:
+                    chamadas.append((pc, fp))
+                    pc = pop()
+                    fp = len(pilha)
+                    if fp > pilha_maxima:
+                        pilha_maxima = fp
+                elif op == RETURN:
+                    pc, fp = chamadas.pop()
+                elif op == PUSHA:
+                    push(arg)
+                elif op == WRITEI:
+                    write(str(int(pop())))
+                elif op == WRITES:
+                    write(pop())
+                elif op == WRITELN:
+                    write('\n')
+                    if buffer is not None and len(buffer) >= limite:
+                        self._despejar()
+                elif op == STOP:
+                    break
+                else:
+                    fp = self._executar(op, arg, pilha, fp)
+        except VMError as e:
+            raise VMError(f"Instrução {pc - 1}: {e}") from None
+        except (IndexError, TypeError, ValueError, ZeroDivisionError) as e:
+            raise VMError(f"Instrução {pc - 1}: {type(e).__name__}: {e}") from None
+        finally:
+            self.passos = passos
+            self.pilha_maxima = pilha_maxima
+            self._despejar()
+        return passos
+
+    def _executar(self, op, arg, pilha, fp):
+        """Instruções menos frequentes. Devolve o fp (alterado apenas por START)."""
+        push = pilha.append
+        pop = pilha.pop
+        if op == PUSHN:
+            pilha.extend([0] * arg)
+        elif op == START:
+            return len(pilha)
+        elif op == NOP:
+            pass
+        elif op == PUSHSP:
+            push((pilha, len(pilha)))
+        elif op == PUSHFP:
+            push((pilha, fp))
+        elif op == PUSHGP:
+            push((pilha, 0))
+        elif op == LOADN:
+            n = pop()
+            memoria, deslocamento = pop()
+            push(memoria[deslocamento + n])
+        elif op == STOREN:
+            valor = pop()
+            n = pop()
+            memoria, deslocamento = pop()
+            memoria[deslocamento + n] = valor
+        elif op == DUP:
+            pilha.extend(pilha[-arg:])
+        elif op == DUPN:
+            n = pop()
+            pilha.extend(pilha[-n:])
+        elif op == POP:
+            del pilha[len(pilha) - arg:]
+        elif op == POPN:
+            n = pop()
+            del pilha[len(pilha) - n:]
+        elif op == CHECK:
+            inferior, superior = arg
+            if not inferior <= pilha[-1] <= superior:
+                raise VMError(f"CHECK: {pilha[-1]} fora de [{inferior}, {superior}]")
+        elif op in (FADD, FSUB, FMUL, FDIV, FINF, FINFEQ, FSUP, FSUPEQ):
+            b = float(pop())
+            a = float(pop())
+            if op == FADD:
+                push(a + b)
+            elif op == FSUB:
+                push(a - b)
+            elif op == FMUL:
+                push(a * b)
+            elif op == FDIV:
+                push(a / b)
+            elif op == FINF:
+                push(1 if a < b else 0)
+            elif op == FINFEQ:
+                push(1 if a <= b else 0)
+            elif op == FSUP:
+                push(1 if a > b else 0)
+            else:
+                push(1 if a >= b else 0)
+        elif op == FCOS:
+            import math
+            push(math.cos(pop()))
+        elif op == FSIN:
+            import math
+            push(math.sin(pop()))
+        elif op == ITOF:
+            push(float(pop()))
+        elif op == FTOI:
+            push(int(pop()))
+        elif op == STRI:
+            push(str(int(pop())))
+        elif op == STRF:
+            push(formatar_real(pop()))
+        elif op == CONCAT:
+            b = pop()
+            push(pop() + b)
+        elif op == STRLEN:
+            push(len(pop()))
+        elif op == CHRCODE:
+            push(ord(pop()[0]))
+        elif op == ATOI:
+            push(int(pop()))
+        elif op == ATOF:
+            push(float(pop()))
+        elif op == ALLOC:
+            push(([0] * arg, 0))
+        elif op == ALLOCN:
+            push(([0] * pop(), 0))
+        elif op == FREE:
+            pop()
+        elif op == WRITEF:
+            self._escrever(formatar_real(pop()))
+        elif op == WRITECHR:
+            self._escrever(chr(pop()))
+        elif op == READ:
+            self._despejar()  # O que já foi escrito (por exemplo, um pedido de dados) aparece antes da leitura
+            push(self._ler_linha())
+        elif op == ERR:
+            raise VMError(arg)
+        else:
+            raise VMError(f"operação {op} não suportada")
+        return fp
+
+
+def run_code(texto, entrada=None, saida=None, buffer_saida=0):
+    """Monta e executa código EWVM. Devolve a máquina, com as estatísticas da execução."""
+    maquina = VirtualMachine(assemble(texto), entrada, saida, buffer_saida)
+    maquina.run()
+    return maquina
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Executa código EWVM (.vm)')
+    parser.add_argument('ficheiro', help='ficheiro .vm a executar')
+    parser.add_argument('--stats', action='store_true',
+                        help='mostrar no stderr as instruções executadas e o tempo de execução')
+    parser.add_argument('--buffer', type=int, nargs='?', const=BUFFER_SAIDA, default=0, metavar='N',
+                        help=f'acumular a saída e escrevê-la em blocos de N escritas (por omissão, {BUFFER_SAIDA})')
+    args = parser.parse_args(argv)
+
+    with open(args.ficheiro, encoding='utf-8') as ficheiro:
+        texto = ficheiro.read()
+    try:
+        maquina = VirtualMachine(assemble(texto), buffer_saida=args.buffer)
+        inicio = time.perf_counter()
+        maquina.run()
+        duracao = time.perf_counter() - inicio
+    except VMError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        sys.stdout.flush()
+
+    if args.stats:
+        print(f"{maquina.passos} instruções em {duracao:.3f}s "
+              f"({maquina.passos / max(duracao, 1e-9):,.0f} instruções/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())